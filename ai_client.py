@@ -0,0 +1,107 @@
+# ai_client.py - Shared OpenAI-compatible client for FactVerse
+# One pooled client per process with keep-alive connections. The key, endpoint
+# and model come from the environment, and the SDK is only imported on the
+# first request so local-only sessions never pay for it
+
+import os
+import atexit
+import threading
+import importlib.util
+from typing import Optional
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_POOL_SIZE = 16
+
+
+def sdk_available() -> bool:
+    """Whether the openai package is installed (without importing it)"""
+    return importlib.util.find_spec("openai") is not None
+
+
+def is_configured() -> bool:
+    return bool(os.getenv('OPENAI_API_KEY')) and sdk_available()
+
+
+class AIClient:
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 model: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = 20.0):
+        """
+        api_key/base_url default to OPENAI_API_KEY/OPENAI_BASE_URL and model to
+        FACTVERSE_AI_MODEL; pool_size bounds the kept-alive connections
+        """
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL') or None
+        self.model = model or os.getenv('FACTVERSE_AI_MODEL', DEFAULT_MODEL)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.requests = 0
+        self.errors = 0
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The SDK client, built (and openai imported) on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build()
+        return self._client
+
+    def _build(self):
+        import openai
+        try:
+            import httpx2 as httpx  # the HTTP stack of openai 3.x
+        except ImportError:
+            import httpx
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                              keepalive_expiry=60.0)
+        return openai.OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            # Retries and backoff belong to the circuit breaker, not the SDK
+            max_retries=0,
+            http_client=openai.DefaultHttpxClient(limits=limits, timeout=self.timeout)
+        )
+
+    def complete(self, messages: list, **params) -> str:
+        """One chat completion; returns the message text (raises on API errors)"""
+        self.requests += 1
+        try:
+            response = self.client.chat.completions.create(model=self.model, messages=messages, **params)
+        except Exception:
+            self.errors += 1
+            raise
+        return (response.choices[0].message.content or "").strip()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "base_url": self.base_url or "default",
+            "connected": self._client is not None,
+            "pool_size": self.pool_size,
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+# === Shared instance ===
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> AIClient:
+    """Process-wide client shared by every generator, closed at exit"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = AIClient()
+            atexit.register(_shared_client.close)
+        return _shared_client
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Micro-benchmarks
+Run: python bench_factverse.py <benchmark> [options]
+Regression gate: python bench_factverse.py suite --save baseline.json
+                 python bench_factverse.py suite --baseline baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import argparse
+import subprocess
+import tempfile
+import platform
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from fact_cache import FactCache
+from fact_corpus import compile_facts, compiled_path_for
+from fact_dedup import NearDuplicateIndex
+from fact_metrics import MetricsRegistry
+from fact_sampler import AliasTable
+from fact_store import FactStore
+from seen_filter import SeenFilter
+from fact_writer import SavedFactWriter, list_segments
+
+
+def per_call(func, calls: int) -> float:
+    """Average seconds per call of func over calls runs"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def best_per_call(func, calls: int, repeats: int = 5) -> float:
+    """Fastest of several per_call runs; the minimum is the least noisy estimate"""
+    return min(per_call(func, calls) for _ in range(repeats))
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:8.1f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.2f} µs"
+    return f"{seconds * 1e3:8.2f} ms"
+
+
+# === Weighted sampling ===
+def bench_sampler(sizes, draws: int, seed: int = 1):
+    """Vose alias table vs random.choices for one weighted draw at a time"""
+    rng = random.Random(seed)
+    print("📊 Weighted draw cost (one fact per request)")
+    print(f"{'facts':>10} | {'alias build':>11} | {'alias draw':>11} | {'choices(cum)':>12} | {'choices(weights)':>16}")
+    for size in sizes:
+        weights = [rng.uniform(0.1, 10.0) for _ in range(size)]
+        population = range(size)
+
+        start = time.perf_counter()
+        table = AliasTable(weights, random.Random(seed))
+        build = time.perf_counter() - start
+
+        alias_draw = per_call(table.draw, draws)
+        cum_weights = list(itertools.accumulate(weights))
+        cum_draw = per_call(lambda: random.choices(population, cum_weights=cum_weights), draws)
+        # weights= re-accumulates on every call, so a few calls are plenty
+        weights_draw = per_call(lambda: random.choices(population, weights=weights), max(3, draws // 10000))
+
+        print(f"{size:>10} | {format_time(build):>11} | {format_time(alias_draw):>11} | "
+              f"{format_time(cum_draw):>12} | {format_time(weights_draw):>16}")
+
+
+# === Saved facts log ===
+def bench_append(rounds: int, records: int, max_bytes: int):
+    """Append latency per batch as the saved history grows, with and without rotation"""
+    print(f"📊 Append latency per {records}-record batch as history grows")
+    print(f"{'history':>10} | {'rotating':>11} | {'one file':>11} | {'segments':>8}")
+    line = "[2026-01-01 00:00:00] [AI:fun] " + "x" * 120 + "\n"
+    batch = (line * records).encode('utf-8')
+    with tempfile.TemporaryDirectory() as directory:
+        rotating = SavedFactWriter(f"{directory}/rotating.txt", fsync="never", max_bytes=max_bytes)
+        single = SavedFactWriter(f"{directory}/single.txt", fsync="never", max_bytes=None)
+        history = 0
+        for round_number in range(rounds):
+            # Drive the write path directly so queueing doesn't blur the numbers
+            rotated = per_call(lambda: rotating._write_batch(batch, records), 10)
+            plain = per_call(lambda: single._write_batch(batch, records), 10)
+            history += len(batch) * 10
+            if round_number % max(1, rounds // 10) == 0 or round_number == rounds - 1:
+                segments = len(list_segments(rotating.path))
+                print(f"{history / 2 ** 20:>8.1f}MB | {format_time(rotated):>11} | "
+                      f"{format_time(plain):>11} | {segments:>8}")
+        rotating.close()
+        single.close()
+
+
+# === Batched completions ===
+class SimulatedBackend:
+    """Stand-in for AIClient: fixed per-request overhead plus per-fact generation time"""
+
+    def __init__(self, overhead: float, per_fact: float, malformed_rate: float, seed: int = 1):
+        self.overhead = overhead
+        self.per_fact = per_fact
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.serial = 0
+
+    def complete(self, messages: list, **params) -> str:
+        self.requests += 1
+        prompt = messages[-1]["content"]
+        batched = "JSON array" in prompt
+        count = int(prompt.split("Give ", 1)[1].split(" ", 1)[0]) if batched else 1
+        time.sleep(self.overhead + self.per_fact * count)
+        facts = []
+        for _ in range(count):
+            self.serial += 1
+            facts.append(f"Simulated fact number {self.serial} is long enough to pass validation.")
+        if not batched:
+            return facts[0]
+        answer = json.dumps(facts)
+        # Models sometimes cut the array short or wrap it in prose
+        if self.rng.random() < self.malformed_rate * count / 5:
+            answer = answer[:len(answer) // 2]
+        return answer
+
+
+def bench_batch(facts: int, overhead: float, per_fact: float, malformed_rate: float):
+    """Facts per second and per request: one fact per completion vs adaptive batches"""
+    from fact_ai_generator import AIFactGenerator
+
+    print(f"📊 {facts} AI facts, {overhead * 1000:.0f} ms overhead + {per_fact * 1000:.0f} ms per fact, "
+          f"{malformed_rate:.0%} malformed batches")
+    print(f"{'mode':>8} | {'requests':>8} | {'facts/request':>13} | {'facts/s':>8} | {'final K':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("single", "batch"):
+            backend = SimulatedBackend(overhead, per_fact, malformed_rate)
+            generator = AIFactGenerator(prefetch_workers=0, cache=FactCache(os.path.join(directory, f"{mode}.db")),
+                                        client=backend, batch=mode == "batch")
+            generator.openai_available = True
+            generator.seen = SeenFilter(os.path.join(directory, f"{mode}.bin"))
+            produced = 0
+            start = time.perf_counter()
+            while produced < facts:
+                if generator.batch:
+                    produced += len(generator.generate_ai_batch("fun"))
+                else:
+                    produced += bool(generator.generate_ai_fact("fun"))
+            elapsed = time.perf_counter() - start
+            final_k = generator.batch_sizer.size if generator.batch else 1
+            print(f"{mode:>8} | {backend.requests:>8} | {produced / backend.requests:>13.2f} | "
+                  f"{produced / elapsed:>8.1f} | {final_k:>7}")
+            generator.cache.close()
+
+
+# === Metrics ===
+def bench_metrics(calls: int):
+    """Hot-path cost of recording one event"""
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Benchmark events", ("category", "source"))
+    histogram = registry.histogram("bench_seconds", "Benchmark latency")
+    child = counter.labels("fun", "AI")
+    timed = histogram.timed(lambda: None)
+
+    def timer():
+        with histogram.time():
+            pass
+
+    print("📊 Metrics recording cost per event")
+    for name, func in (("counter child inc", child.inc),
+                       ("counter inc(labels)", lambda: counter.inc("fun", "AI")),
+                       ("histogram observe", lambda: histogram.observe(0.003)),
+                       ("timed() decorator", timed),
+                       ("with time()", timer),
+                       ("empty call", lambda: None)):
+        print(f"{name:>20} | {format_time(per_call(func, calls)):>11}")
+
+
+# === Regression suite ===
+SUITE_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+SUITE_CATEGORIES = ("hacking", "fun", "attitude", "lazy", "motivation")
+DEFAULT_THRESHOLD = 0.25
+
+
+def write_corpus(path: str, size: int) -> str:
+    """facts.json with size distinct facts spread over the usual categories"""
+    per_category = -(-size // len(SUITE_CATEGORIES))
+    corpus = {category: [f"Benchmark {category} fact number {i} is here to fill the corpus with text."
+                         for i in range(per_category)]
+              for category in SUITE_CATEGORIES}
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(corpus, file)
+    return path
+
+
+def time_load(path: str, repeats: int) -> tuple:
+    """(best seconds for a fresh FactStore to load path, the last store)"""
+    best, store = float("inf"), None
+    for _ in range(repeats):
+        store = FactStore(path, seed=1)
+        start = time.perf_counter()
+        store.counts()
+        best = min(best, time.perf_counter() - start)
+    return best, store
+
+
+def run_suite(sizes=SUITE_SIZES, draws: int = 20_000, saves: int = 20_000,
+              checks: int = 500, calls: int = 2_000) -> dict:
+    """
+    Time every workload and return {name: {"value", "unit", "better"}}
+    Latencies are best-of-several seconds per operation; throughputs are per second
+    """
+    results = {}
+
+    def record(name: str, value: float, unit: str = "s", better: str = "lower"):
+        results[name] = {"value": value, "unit": unit, "better": better}
+        shown = format_time(value) if unit == "s" else f"{value:>8.0f} {unit}"
+        print(f"{name:>28} | {shown:>14}")
+
+    print("📊 FactVerse benchmark suite")
+    with tempfile.TemporaryDirectory() as directory:
+        # Corpus loading and per-draw selection cost at each corpus size
+        for size in sizes:
+            json_path = write_corpus(os.path.join(directory, f"facts_{size}.json"), size)
+            repeats = max(1, min(5, 100_000 // size))
+            seconds, store = time_load(json_path, repeats)
+            record(f"load_json/{size}", seconds)
+            record(f"select/{size}", best_per_call(lambda: store.random_fact("fun"), draws))
+            seen = SeenFilter(os.path.join(directory, f"seen_{size}.bin"))
+            record(f"select_unseen/{size}", best_per_call(lambda: store.random_fact("fun", seen), draws, 3))
+
+            compile_facts(json_path)
+            os.remove(json_path)  # make FactStore map facts.bin
+            seconds, store = time_load(json_path, repeats)
+            record(f"load_compiled/{size}", seconds)
+            record(f"select_compiled/{size}", best_per_call(lambda: store.random_fact("fun"), draws))
+
+        # save_fact throughput through the batched writer, queueing to the write hitting the file
+        best = 0.0
+        for attempt in range(3):
+            writer = SavedFactWriter(os.path.join(directory, f"saved_facts_{attempt}.txt"), fsync="never")
+            start = time.perf_counter()
+            for i in range(saves):
+                writer.save(f"Benchmark saved fact number {i} with a realistic length of text.", "AI", category="fun")
+            writer.flush(timeout=60)
+            best = max(best, saves / (time.perf_counter() - start))
+            writer.close()
+        record("save_fact", best, "facts/s", "higher")
+
+        # Near-duplicate checks against a full generated_facts index
+        index = NearDuplicateIndex(threshold=0.6, max_entries=5000)
+        index.update(f"Generated fact {i} about octopus hearts and honey that never spoils." for i in range(5000))
+        probes = itertools.count()
+        record("dedup_check", best_per_call(
+            lambda: index.is_duplicate(f"A brand new fact {next(probes)} about the speed of light in glass."),
+            checks))
+        record("dedup_add", best_per_call(
+            lambda: index.add_if_new(f"Another unseen fact {next(probes)} on tardigrades surviving space."),
+            checks, 3))
+
+        # End to end: generate_fact against an instant fake backend, and the local fallback
+        from fact_ai_generator import AIFactGenerator
+        generator = AIFactGenerator(prefetch_workers=0, cache=FactCache(os.path.join(directory, "cache.db")),
+                                    client=SimulatedBackend(0.0, 0.0, 0.0))
+        generator.openai_available = True
+        generator.seen = SeenFilter(os.path.join(directory, "generator_seen.bin"))
+        generator.local_facts = FactStore(write_corpus(os.path.join(directory, "local.json"), 10_000), seed=1)
+        record("generate_fact_ai", best_per_call(lambda: generator.generate_fact("fun"), calls, 3))
+        record("generate_fact_local", best_per_call(lambda: generator.generate_fact("fun", prefer_ai=False), calls))
+        generator.cache.close()
+    return results
+
+
+def suite_report(results: dict, sizes) -> dict:
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "sizes": list(sizes)
+        },
+        "results": results
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Rows of (name, baseline, current, change, status) for metrics in both runs
+    change is the relative slowdown (positive = worse) whichever way the metric
+    points; status is "regression" past threshold, "improved" past it the other way
+    """
+    rows = []
+    base, now = baseline["results"], current["results"]
+    for name in sorted(set(base) & set(now)):
+        before, after = base[name]["value"], now[name]["value"]
+        if base[name].get("better", "lower") == "higher":
+            change = before / after - 1 if after else float("inf")
+        else:
+            change = after / before - 1 if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def print_comparison(rows: list, threshold: float) -> int:
+    """Print the comparison table; returns how many metrics regressed"""
+    print(f"📊 Compared with baseline (threshold {threshold:.0%})")
+    print(f"{'metric':>28} | {'baseline':>14} | {'current':>14} | {'change':>8} | status")
+    for name, before, after, change, status in rows:
+        icon = {"regression": "❌", "improved": "🚀", "ok": "✅"}[status]
+        print(f"{name:>28} | {before:>14.6g} | {after:>14.6g} | {change:>+8.1%} | {icon} {status}")
+    regressions = sum(status == "regression" for *_, status in rows)
+    if regressions:
+        print(f"❌ {regressions} metric(s) regressed by more than {threshold:.0%}")
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_report(report: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+    print(f"💾 Results saved to {path}")
+
+
+# === Pre-fork scaling ===
+def _drive_load(port: int, users: int, duration: float, seed: int) -> dict:
+    """One client process: closed-loop users hammering /facts with local facts"""
+    from load_generator import HTTPTarget, LoadGenerator
+    load = LoadGenerator(HTTPTarget(f"127.0.0.1:{port}", use_ai=False), users=users, duration=duration,
+                         think_ms=0, gets=5, save_rate=0, interval=duration, seed=seed)
+    return load.run()["summary"]["all"]
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _corpus_memory(supervisor_pid: int, corpus_path: str) -> tuple:
+    """(RSS, PSS) in bytes of the corpus mapping summed over the workers (Linux /proc only)"""
+    rss = pss = 0
+    try:
+        with open(f"/proc/{supervisor_pid}/task/{supervisor_pid}/children") as file:
+            pids = [int(pid) for pid in file.read().split()] or [supervisor_pid]
+        for pid in pids:
+            in_corpus = False
+            with open(f"/proc/{pid}/smaps") as file:
+                for line in file:
+                    fields = line.split()
+                    if "-" in fields[0] and len(fields) >= 5:  # a new mapping header
+                        in_corpus = fields[-1] == corpus_path
+                    elif in_corpus and fields[0] in ("Rss:", "Pss:"):
+                        if fields[0] == "Rss:":
+                            rss += int(fields[1]) * 1024
+                        else:
+                            pss += int(fields[1]) * 1024
+    except (OSError, ValueError):
+        return None, None
+    return rss, pss
+
+
+def bench_prefork(worker_counts, facts: int, clients: int, users: int, duration: float):
+    """Local-fact requests per second as pre-forked workers are added"""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"📊 /facts throughput vs workers ({facts} facts, {clients} client processes x {users} users, "
+          f"{cores} CPU cores)")
+    if max(worker_counts) + clients > cores:
+        print(f"⚠️ Warning: {max(worker_counts)} workers + {clients} clients share {cores} cores; "
+              f"scaling stops once the cores are busy")
+    print(f"{'workers':>7} | {'req/s':>9} | {'speedup':>7} | {'p99 ms':>8} | {'corpus RSS':>10} | {'corpus PSS':>10}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        facts_path = write_corpus(os.path.join(directory, "facts.json"), facts)
+        compile_facts(facts_path)
+        env = dict(os.environ, FACTVERSE_FACTS=facts_path, FACTVERSE_SEEN_FILE=os.path.join(directory, "seen.bin"))
+        env.pop("FACTVERSE_METRICS_FILE", None)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        for workers in worker_counts:
+            port = _free_port()
+            server = subprocess.Popen([sys.executable, script, "--serve", "--no-ai", "--workers", str(workers),
+                                       "--port", str(port)], cwd=directory, env=env, stdout=subprocess.PIPE,
+                                      stderr=subprocess.STDOUT, text=True, start_new_session=True)
+            try:
+                for line in server.stdout:
+                    if "listening on" in line:
+                        break
+                time.sleep(0.5)  # let every worker reach accept()
+                with ProcessPoolExecutor(clients) as pool:
+                    results = list(pool.map(_drive_load, [port] * clients, [users] * clients,
+                                            [duration] * clients, range(clients)))
+                rss, pss = _corpus_memory(server.pid, compiled_path_for(facts_path))
+            finally:
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait(timeout=10)
+            throughput = sum(result["throughput_rps"] for result in results)
+            p99 = max(result["p99_ms"] or 0 for result in results)
+            baseline = baseline or throughput
+            memory = (f"{rss / 2 ** 20:>8.1f}MB | {pss / 2 ** 20:>8.1f}MB" if rss is not None
+                      else f"{'-':>10} | {'-':>10}")
+            print(f"{workers:>7} | {throughput:>9.0f} | {throughput / baseline:>6.2f}x | {p99:>8.1f} | {memory}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FactVerse micro-benchmarks")
+    benchmarks = parser.add_subparsers(dest="benchmark", required=True)
+    sampler = benchmarks.add_parser("sampler", help="alias tables vs random.choices")
+    sampler.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    sampler.add_argument("--draws", type=int, default=100_000)
+    append = benchmarks.add_parser("append", help="saved facts append latency vs history size")
+    append.add_argument("--rounds", type=int, default=100)
+    append.add_argument("--records", type=int, default=64)
+    append.add_argument("--max-bytes", type=int, default=8 * 1024 * 1024)
+    batch = benchmarks.add_parser("batch", help="single-fact vs batched AI completions")
+    batch.add_argument("--facts", type=int, default=100)
+    batch.add_argument("--overhead", type=float, default=0.05, help="seconds per request")
+    batch.add_argument("--per-fact", type=float, default=0.005, help="seconds per generated fact")
+    batch.add_argument("--malformed", type=float, default=0.1, help="malformed-batch probability at K=5")
+    metrics = benchmarks.add_parser("metrics", help="cost of recording a metric event")
+    metrics.add_argument("--calls", type=int, default=1_000_000)
+    suite = benchmarks.add_parser("suite", help="timed workloads, saved as JSON and checked against a baseline")
+    suite.add_argument("--sizes", type=int, nargs="+", default=list(SUITE_SIZES), help="corpus sizes")
+    suite.add_argument("--quick", action="store_true", help="corpus sizes up to 10^4 only")
+    suite.add_argument("--save", metavar="PATH", help="write the results (e.g. a new baseline) here")
+    suite.add_argument("--baseline", metavar="PATH", help="fail if a metric regressed against this file")
+    suite.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown (0.25 = 25%%)")
+    prefork = benchmarks.add_parser("prefork", help="API throughput as pre-forked workers are added")
+    prefork.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    prefork.add_argument("--facts", type=int, default=200_000, help="corpus size")
+    prefork.add_argument("--clients", type=int, default=2, help="load generator processes")
+    prefork.add_argument("--users", type=int, default=16, help="virtual users per client process")
+    prefork.add_argument("--duration", type=float, default=5.0, help="seconds per worker count")
+    compare = benchmarks.add_parser("compare", help="compare two saved suite results")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "sampler":
+        bench_sampler(args.sizes, args.draws)
+    elif args.benchmark == "append":
+        bench_append(args.rounds, args.records, args.max_bytes)
+    elif args.benchmark == "batch":
+        bench_batch(args.facts, args.overhead, args.per_fact, args.malformed)
+    elif args.benchmark == "metrics":
+        bench_metrics(args.calls)
+    elif args.benchmark == "suite":
+        sizes = [size for size in args.sizes if size <= 10_000] if args.quick else args.sizes
+        report = suite_report(run_suite(sizes), sizes)
+        if args.save:
+            save_report(report, args.save)
+        if args.baseline:
+            rows = compare_results(load_report(args.baseline), report, args.threshold)
+            return 1 if print_comparison(rows, args.threshold) else 0
+    elif args.benchmark == "prefork":
+        bench_prefork(args.workers, args.facts, args.clients, args.users, args.duration)
+    elif args.benchmark == "compare":
+        rows = compare_results(load_report(args.baseline), load_report(args.current), args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# circuit_breaker.py - Circuit breaker for the FactVerse AI path
+# After failure_threshold consecutive failures the breaker opens and calls
+# short-circuit to local facts. Once a jittered, exponentially growing
+# cooldown passes, a half-open probe is let through. Success closes the
+# breaker; failure reopens it with a longer cooldown
+
+import time
+import random
+import threading
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised by CircuitBreaker.call while the breaker is open"""
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0,
+                  rng: Callable[[], float] = random.random) -> float:
+    """Exponential backoff with equal jitter: half the delay is fixed, half random"""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + rng() * delay / 2
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 half_open_probes: int = 1, clock: Callable[[], float] = time.monotonic,
+                 rng: Callable[[], float] = random.random):
+        """
+        The cooldown before the n-th consecutive reopening is backoff_delay(n)
+        from base_delay, capped at max_delay; half_open_probes calls may run
+        at once while half open
+        """
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self.rng = rng
+        self._state = CLOSED
+        self._failures = 0
+        self._reopenings = 0
+        self._open_until = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.transitions = {OPEN: 0, HALF_OPEN: 0, CLOSED: 0}
+        self.short_circuits = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            self._state = state
+            self.transitions[state] += 1
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and self.clock() >= self._open_until:
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+
+    def allow(self) -> bool:
+        """True if a call may go ahead; every True must be followed by record_success/record_failure"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.short_circuits += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._reopenings = 0
+            self._probes = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                cooldown = backoff_delay(self._reopenings, self.base_delay, self.max_delay, self.rng)
+                self._reopenings += 1
+                self._open_until = self.clock() + cooldown
+                self._probes = 0
+                self._set_state(OPEN)
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when calls may go ahead)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._open_until - self.clock())
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run func through the breaker; raises CircuitOpenError when short-circuited"""
+        if not self.allow():
+            raise CircuitOpenError(f"AI circuit open, retry in {self.retry_in():.1f}s")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_s": round(max(0.0, self._open_until - self.clock()), 2) if self._state == OPEN else 0.0,
+                "transitions": dict(self.transitions),
+                "short_circuits": self.short_circuits
+            }
+
+
+# === Shared instance ===
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """Process-wide breaker shared by every AI client"""
+    global _shared_breaker
+    with _shared_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
@@ -3,15 +3,29 @@
 # Secure AI integration with fallback to local facts
 
 import os
-import json
-import random
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Optional
 
+from ai_client import AIClient, get_client, sdk_available
+from circuit_breaker import OPEN, CircuitBreaker, get_breaker
+from fact_batch import AdaptiveBatchSize, batch_prompt, clean_batch, clean_fact
+from fact_cache import FactCache
+from fact_metrics import (AI_ERRORS, AI_FACT_SECONDS, FACTS_SERVED, LOCAL_FACT_SECONDS,
+                          get_metrics)
+from fact_store import get_store
+from seen_filter import get_seen_filter
+
 class AIFactGenerator:
-    def __init__(self):
+    def __init__(self, prefetch_depth: int = 3, prefetch_workers: int = 2,
+                 cache: Optional[FactCache] = None, breaker: Optional[CircuitBreaker] = None,
+                 client: Optional[AIClient] = None, batch: bool = False):
+        """batch=True makes prefetching (and bulk generation) ask for several facts per completion"""
         self.api_key = None
+        self.client = client
         self.openai_available = False
-        self.local_facts_file = "facts.json"
         self.category_prompts = {
             'hacking': "Generate a fascinating cybersecurity or hacking-related fact",
             'fun': "Generate an amazing and surprising fun fact",
@@ -19,98 +33,290 @@ class AIFactGenerator:
             'lazy': "Generate a humorous fact or quote about laziness",
             'motivation': "Generate an inspiring motivational quote or fact"
         }
+        # Background prefetch pool: a bounded queue of ready AI facts per category
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_workers = prefetch_workers
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self._prefetch_queues = {}
+        self._prefetch_inflight = {}
+        self._prefetch_lock = threading.Lock()
+        self._refill_needed = threading.Condition(self._prefetch_lock)
+        self._prefetch_stop = threading.Event()
+        self._prefetch_threads = []
+        # Deadline-bounded inline requests; late answers are kept for the next request
+        self.deadline_timeouts = 0
+        self.deadline_salvaged = 0
+        self._inline_executor = None
+        # Multi-fact completions, K adapting to how often answers fail to parse
+        self.batch = batch
+        self.batch_sizer = AdaptiveBatchSize()
+        self.batch_requests = 0
+        self.batch_facts = 0
+        # Two-tier response cache (memory LRU + SQLite) shared across runs
+        self.cache = cache if cache is not None else FactCache()
+        self.seen = get_seen_filter()
+        # Shared breaker: a failing API is skipped (local fallback) instead of retried per request
+        self.breaker = breaker if breaker is not None else get_breaker()
         self._setup_openai()
         self._load_local_facts()
+        self._register_metrics()
+        if self.openai_available:
+            self.start_prefetch()
     
     def _setup_openai(self):
-        """Setup OpenAI API with secure key handling"""
-        try:
-            # Check for API key in environment variable (secure method)
-            self.api_key = os.getenv('OPENAI_API_KEY')
-            
-            if self.api_key:
-                import openai
-                openai.api_key = self.api_key
-                self.openai_available = True
-                # Silent initialization for main app
-                # print("🤖 AI Mode: ACTIVE")
-            else:
-                # Silent initialization for main app
-                # print("🔒 AI Mode: DISABLED (No API key found)")
-                # print("💡 Tip: Set OPENAI_API_KEY environment variable to enable AI facts")
-                pass
-                
-        except ImportError:
-            # Silent initialization for main app
-            # print("📦 OpenAI library not installed. Using local facts only.")
-            # print("💡 Install with: pip install openai")
-            pass
+        """Setup OpenAI API with secure key handling (the SDK itself is imported on first use)"""
+        # Check for API key in environment variable (secure method)
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        if self.client is None and self.api_key:
+            self.client = get_client()
+        self.openai_available = self.client is not None and sdk_available()
+        # Silent initialization for main app
+        # print("💡 Tip: Set OPENAI_API_KEY and install openai (pip install openai) to enable AI facts")
     
     def _load_local_facts(self):
-        """Load local facts as fallback"""
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            facts_file = os.path.join(script_dir, self.local_facts_file)
-            
-            with open(facts_file, 'r', encoding='utf-8') as file:
-                self.local_facts = json.load(file)
-        except FileNotFoundError:
-            self.local_facts = {}
-            print("⚠️ Warning: Local facts file not found")
+        """Attach the shared fact store as fallback (parsed on first use)"""
+        self.local_facts = get_store()
+        if not self.local_facts.exists():
+            print("⚠️ Warning: Local facts file not found", file=sys.stderr)
     
+    def _register_metrics(self):
+        """Ratios sampled when metrics are rendered (the latest generator wins)"""
+        metrics = get_metrics()
+        metrics.gauge("factverse_ai_cache_hit_ratio", "AI response cache hit ratio",
+                      lambda: self.cache.stats()["hit_ratio"])
+        metrics.gauge("factverse_prefetch_hit_ratio", "Share of AI facts served from the prefetch queue",
+                      lambda: self.prefetch_hits / (self.prefetch_hits + self.prefetch_misses)
+                      if self.prefetch_hits + self.prefetch_misses else None)
+        metrics.gauge("factverse_ai_breaker_open", "1 while the AI circuit breaker is open",
+                      lambda: int(self.breaker.state == OPEN))
+    
+    @AI_FACT_SECONDS.timed
     def generate_ai_fact(self, category: str) -> Optional[str]:
-        """Generate a fact using OpenAI API"""
+        """Generate a fact using OpenAI API, serving from the cache when possible"""
         if not self.openai_available:
             return None
-            
+        
+        prompt = self._prompt(category) + " in one concise sentence. Make it unique and engaging."
+        
+        # A cached answer is only worth serving if the user hasn't seen it yet
+        cached, key = self.cache.get_pooled(category, prompt, lambda fact: self.seen.add(category, fact),
+                                            refresh=lambda: self._request_ai_fact(prompt))
+        if cached:
+            return cached
+        
+        fact = self._request_ai_fact(prompt)
+        if fact:
+            self.cache.put(category, key, fact)
+            self.seen.add(category, fact)
+        return fact
+    
+    def _prompt(self, category: str) -> str:
+        return self.category_prompts.get(category, f"Generate an interesting {category} fact")
+    
+    def generate_ai_batch(self, category: str, count: Optional[int] = None) -> list:
+        """
+        Several facts from one completion (count defaults to the adaptive batch size)
+        Returns only facts the user hasn't seen, marking them seen
+        """
+        if not self.openai_available or not self.breaker.allow():
+            return []
+        count = count or self.batch_sizer.size
         try:
-            import openai
-            
-            prompt = self.category_prompts.get(category, f"Generate an interesting {category} fact")
-            prompt += " in one concise sentence. Make it unique and engaging."
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            text = self.client.complete(
+                [
+                    {"role": "system", "content": "You are a fact generator. Provide accurate, interesting facts, one sentence each."},
+                    {"role": "user", "content": batch_prompt(self._prompt(category) + ".", count)}
+                ],
+                max_tokens=60 * count + 20,
+                temperature=0.8,
+            )
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            AI_ERRORS.inc()
+            print(f"🔥 AI Error: {str(e)}", file=sys.stderr)
+            return []
+        
+        facts, valid = clean_batch(text, count)
+        self.batch_sizer.record(count, valid)
+        fresh = [fact for fact in facts if self.seen.add(category, fact)]
+        with self._prefetch_lock:
+            self.batch_requests += 1
+            self.batch_facts += len(fresh)
+        return fresh
+    
+    def _request_ai_fact(self, prompt: str) -> Optional[str]:
+        """Ask the API for one fact (no caching); None when it fails or the breaker is open"""
+        if not self.breaker.allow():
+            return None
+        try:
+            fact = self.client.complete(
+                [
                     {"role": "system", "content": "You are a fact generator. Provide accurate, interesting facts in a single sentence."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=60,
                 temperature=0.8,
             )
-            
-            fact = response['choices'][0]['message']['content'].strip()
-            # Remove quotes if present
-            if fact.startswith('"') and fact.endswith('"'):
-                fact = fact[1:-1]
-            
-            return fact
+            self.breaker.record_success()
+            # Strip quotes; refusals and fragments ("Sure!") don't count as facts
+            return clean_fact(fact)
             
         except Exception as e:
-            print(f"🔥 AI Error: {str(e)}")
+            self.breaker.record_failure()
+            AI_ERRORS.inc()
+            print(f"🔥 AI Error: {str(e)}", file=sys.stderr)
             return None
     
+    @LOCAL_FACT_SECONDS.timed
     def get_local_fact(self, category: str) -> str:
         """Get a random fact from local JSON file"""
-        if category in self.local_facts and self.local_facts[category]:
-            return random.choice(self.local_facts[category])
+        fact = self.local_facts.random_fact(category, self.seen)
+        if fact:
+            return fact
         return f"No local facts available for category: {category}"
     
-    def generate_fact(self, category: str, prefer_ai: bool = True) -> tuple[str, str]:
+    def start_prefetch(self):
+        """Start the background workers that keep each category's queue topped up"""
+        if self._prefetch_threads or self.prefetch_workers <= 0 or self.prefetch_depth <= 0:
+            return
+        self._prefetch_stop.clear()
+        # Room for a whole batch on top of the refill threshold
+        capacity = self.prefetch_depth + (self.batch_sizer.maximum if self.batch else 0)
+        for category in self.category_prompts:
+            self._prefetch_queues[category] = queue.Queue(maxsize=capacity)
+            self._prefetch_inflight[category] = 0
+        for i in range(self.prefetch_workers):
+            worker = threading.Thread(target=self._prefetch_worker, name=f"fact-prefetch-{i}", daemon=True)
+            worker.start()
+            self._prefetch_threads.append(worker)
+    
+    def stop_prefetch(self, timeout: float = 1.0):
+        """Stop the prefetch workers (queued facts stay available)"""
+        self._prefetch_stop.set()
+        with self._refill_needed:
+            self._refill_needed.notify_all()
+        for worker in self._prefetch_threads:
+            worker.join(timeout)
+        self._prefetch_threads = []
+    
+    def _next_refill_category(self) -> Optional[str]:
+        """Pick the emptiest category that still has room (caller holds the lock)"""
+        best, best_level = None, self.prefetch_depth
+        for category, fact_queue in self._prefetch_queues.items():
+            level = fact_queue.qsize() + self._prefetch_inflight[category]
+            if level < best_level:
+                best, best_level = category, level
+        return best
+    
+    def _prefetch_worker(self):
+        """Refill category queues until stopped"""
+        while not self._prefetch_stop.is_set():
+            with self._refill_needed:
+                category = self._next_refill_category()
+                if category is None:
+                    self._refill_needed.wait(timeout=1.0)
+                    continue
+                self._prefetch_inflight[category] += 1
+            
+            facts = []
+            try:
+                if self.batch:
+                    facts = self.generate_ai_batch(category)
+                else:
+                    facts = [fact for fact in [self.generate_ai_fact(category)] if fact]
+            finally:
+                with self._prefetch_lock:
+                    self._prefetch_inflight[category] -= 1
+                    for fact in facts:
+                        try:
+                            self._prefetch_queues[category].put_nowait(fact)
+                        except queue.Full:
+                            break
+            
+            if not facts:
+                # Back off instead of hammering a failing API; an open breaker says how long
+                self._prefetch_stop.wait(self.breaker.retry_in() or 2.0)
+    
+    def _take_prefetched(self, category: str) -> Optional[str]:
+        """Pop a ready fact for the category and wake a worker to refill it"""
+        fact_queue = self._prefetch_queues.get(category)
+        if fact_queue is None:
+            return None
+        try:
+            fact = fact_queue.get_nowait()
+        except queue.Empty:
+            fact = None
+        with self._refill_needed:
+            if fact:
+                self.prefetch_hits += 1
+            else:
+                self.prefetch_misses += 1
+            self._refill_needed.notify()
+        return fact
+    
+    def _stash_late_fact(self, category: str, future):
+        """Done-callback for an AI request that missed its deadline: queue the answer for next time"""
+        try:
+            fact = future.result()
+        except Exception:
+            return
+        if not fact:
+            return
+        with self._prefetch_lock:
+            fact_queue = self._prefetch_queues.get(category)
+            if fact_queue is None:
+                fact_queue = self._prefetch_queues[category] = queue.Queue(maxsize=max(1, self.prefetch_depth))
+                self._prefetch_inflight.setdefault(category, 0)
+            try:
+                fact_queue.put_nowait(fact)
+                self.deadline_salvaged += 1
+            except queue.Full:
+                pass  # Still in the response cache
+    
+    def _generate_within(self, category: str, deadline_ms: float) -> Optional[str]:
+        """Run generate_ai_fact but give up after deadline_ms, salvaging a late answer"""
+        with self._prefetch_lock:
+            if self._inline_executor is None:
+                self._inline_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fact-inline")
+        future = self._inline_executor.submit(self.generate_ai_fact, category)
+        try:
+            return future.result(timeout=deadline_ms / 1000)
+        except FutureTimeout:
+            with self._prefetch_lock:
+                self.deadline_timeouts += 1
+            future.add_done_callback(lambda done: self._stash_late_fact(category, done))
+            return None
+    
+    def generate_fact(self, category: str, prefer_ai: bool = True,
+                      deadline_ms: Optional[float] = None) -> tuple[str, str]:
         """
         Generate a fact with AI fallback to local facts
+        With deadline_ms, a slow AI call is abandoned for a local fact once the
+        deadline passes and its answer is queued for the next request
         Returns: (fact_text, source_type)
         """
         source_type = "LOCAL"
         
         # Try AI first if preferred and available
         if prefer_ai and self.openai_available:
-            ai_fact = self.generate_ai_fact(category)
+            # Serve from the prefetch queue, only hitting the API inline on a miss
+            prefetched = self._take_prefetched(category)
+            if prefetched:
+                FACTS_SERVED.inc(category, "AI")
+                return prefetched, "AI"
+            if deadline_ms is None:
+                ai_fact = self.generate_ai_fact(category)
+            else:
+                ai_fact = self._generate_within(category, deadline_ms)
             if ai_fact:
+                FACTS_SERVED.inc(category, "AI")
                 return ai_fact, "AI"
         
         # Fallback to local facts
         local_fact = self.get_local_fact(category)
+        FACTS_SERVED.inc(category, "LOCAL")
         return local_fact, "LOCAL"
     
     def get_status(self) -> dict:
@@ -119,7 +325,25 @@ class AIFactGenerator:
             "ai_available": self.openai_available,
             "api_key_set": bool(self.api_key),
             "local_facts_loaded": bool(self.local_facts),
-            "categories": list(self.category_prompts.keys())
+            "categories": list(self.category_prompts.keys()),
+            "prefetch": {
+                "workers": len(self._prefetch_threads),
+                "depth": self.prefetch_depth,
+                "hits": self.prefetch_hits,
+                "misses": self.prefetch_misses,
+                "queued": {category: fact_queue.qsize() for category, fact_queue in self._prefetch_queues.items()}
+            },
+            "deadline": {
+                "timeouts": self.deadline_timeouts,
+                "salvaged": self.deadline_salvaged
+            },
+            "client": self.client.stats() if self.client else None,
+            "batch": dict(self.batch_sizer.stats(), enabled=self.batch, requests=self.batch_requests,
+                          facts=self.batch_facts),
+            "breaker": self.breaker.stats(),
+            "cache": self.cache.stats(),
+            "seen": self.seen.stats(),
+            "store": self.local_facts.stats()
         }
 
 # === Standalone Demo ===
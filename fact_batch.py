@@ -0,0 +1,86 @@
+# fact_batch.py - Multi-fact completions for FactVerse
+# Asks for K facts per chat completion as a JSON array, validates each item
+# with the same cleanup as single facts, and adapts K to how often the
+# model's output fails to parse
+
+import re
+import json
+from typing import Optional
+
+MIN_FACT_LENGTH = 15
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def clean_fact(text, min_length: int = MIN_FACT_LENGTH) -> Optional[str]:
+    """Strip whitespace and wrapping quotes; None for non-strings and too-short answers"""
+    if not isinstance(text, str):
+        return None
+    fact = " ".join(text.split())
+    if fact.startswith('"') and fact.endswith('"'):
+        fact = fact[1:-1].strip()
+    return fact if len(fact) > min_length else None
+
+
+def batch_prompt(prompt: str, count: int) -> str:
+    """Turn a single-fact prompt into a request for `count` facts in a fixed format"""
+    return (f"{prompt} Give {count} different facts, each one concise sentence. "
+            f"Respond with only a JSON array of {count} strings.")
+
+
+def parse_fact_batch(text: str) -> list:
+    """Raw items from a JSON-array answer (code fences tolerated); [] if it doesn't parse"""
+    text = _FENCE.sub("", (text or "").strip())
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return []
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return []
+    return items if isinstance(items, list) else []
+
+
+def clean_batch(text: str, count: int) -> tuple:
+    """
+    (facts, valid) for one batched answer: facts are the cleaned items with
+    in-batch repeats dropped; valid counts usable items (for the failure rate)
+    """
+    facts, seen = [], set()
+    valid = 0
+    for item in parse_fact_batch(text)[:count]:
+        fact = clean_fact(item)
+        if fact is None:
+            continue
+        valid += 1
+        if fact.lower() not in seen:
+            seen.add(fact.lower())
+            facts.append(fact)
+    return facts, valid
+
+
+class AdaptiveBatchSize:
+    def __init__(self, initial: int = 5, minimum: int = 1, maximum: int = 10,
+                 target_failure_rate: float = 0.2, smoothing: float = 0.3):
+        """
+        Additive increase while batches come back clean, halving while the
+        smoothed share of unusable items stays above target_failure_rate
+        """
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_failure_rate = target_failure_rate
+        self.smoothing = smoothing
+        self.failure_rate = 0.0
+        self.batches = 0
+
+    def record(self, requested: int, valid: int):
+        failed = 1.0 - min(valid, requested) / requested if requested else 0.0
+        self.failure_rate += self.smoothing * (failed - self.failure_rate)
+        self.batches += 1
+        if failed and self.failure_rate > self.target_failure_rate:
+            self.size = max(self.minimum, self.size // 2)
+        elif not failed and self.failure_rate <= self.target_failure_rate:
+            self.size = min(self.maximum, self.size + 1)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "failure_rate": round(self.failure_rate, 3), "batches": self.batches}
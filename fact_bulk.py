@@ -0,0 +1,87 @@
+# fact_bulk.py - Headless bulk fact generation for FactVerse
+# Streams facts as JSONL (one record per line, no animations) with AI calls
+# running concurrently; memory stays constant regardless of the count
+
+import sys
+import json
+import time
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+from fact_store import FactStore, get_store
+
+
+def _record(fact: str, category: str, source: str, started: float) -> str:
+    return json.dumps({
+        "fact": fact,
+        "category": category,
+        "source": source,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }, ensure_ascii=False) + "\n"
+
+
+def generate(category: str, count: int, output: str = "-", parallel: int = 8,
+             generator=None, store: Optional[FactStore] = None) -> dict:
+    """
+    Write count facts for category ('all' cycles through every category) to
+    output ('-' = stdout); AI generation runs with up to `parallel` requests
+    in flight and records are written in completion order; a generator in
+    batch mode gets several facts per request
+    Returns a summary of counts per source
+    """
+    store = store or get_store()
+    categories = store.categories() if category == "all" else [category]
+    if not categories or any(name not in store for name in categories):
+        raise ValueError(f"Unknown category: {category}")
+    category_cycle = itertools.cycle(categories)
+    summary = {"count": 0, "sources": {}, "elapsed_s": 0.0}
+    started_all = time.perf_counter()
+
+    out = sys.stdout if output == "-" else open(output, 'w', encoding='utf-8')
+    try:
+        def emit(line: str, source: str):
+            out.write(line)
+            summary["count"] += 1
+            summary["sources"][source] = summary["sources"].get(source, 0) + 1
+
+        if generator is None or not generator.openai_available:
+            # Local draws are in-memory; threads would only add overhead
+            for _ in range(count):
+                name = next(category_cycle)
+                started = time.perf_counter()
+                emit(_record(store.random_fact(name), name, "LOCAL", started), "LOCAL")
+        else:
+            def produce(name: str) -> list:
+                started = time.perf_counter()
+                if generator.batch:
+                    facts = generator.generate_ai_batch(name)
+                    if facts:
+                        return [(_record(fact, name, "AI", started), "AI") for fact in facts]
+                fact, source = generator.generate_fact(name)
+                return [(_record(fact, name, source, started), source)]
+
+            # Keep a bounded window of futures in flight so memory doesn't grow with count;
+            # with batching, each request is expected to cover several facts
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="fact-bulk") as executor:
+                pending = set()
+                while summary["count"] < count:
+                    per_request = generator.batch_sizer.size if generator.batch else 1
+                    while (len(pending) < parallel * 2
+                           and len(pending) * per_request < count - summary["count"]):
+                        pending.add(executor.submit(produce, next(category_cycle)))
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for line, source in future.result():
+                            if summary["count"] < count:
+                                emit(line, source)
+                for future in pending:
+                    future.cancel()
+        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    summary["elapsed_s"] = round(time.perf_counter() - started_all, 3)
+    return summary
@@ -0,0 +1,334 @@
+# fact_cache.py - Two-tier AI response cache for FactVerse
+# In-memory LRU in front of a local SQLite file, keyed by category and prompt
+# Survives restarts and is shared between terminals running side by side.
+# A prompt keeps a small pool of answers so a repeated prompt isn't stuck
+# serving one fact until it expires
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+DEFAULT_CACHE_FILE = "fact_cache.db"
+DEFAULT_POOL_SIZE = 8
+_RESPONSE_BYTES = "LENGTH(CAST(response AS BLOB))"
+
+
+def default_cache_path() -> str:
+    """Cache file next to the scripts, overridable with FACTVERSE_CACHE_DB"""
+    env_path = os.getenv('FACTVERSE_CACHE_DB')
+    if env_path:
+        return env_path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, DEFAULT_CACHE_FILE)
+
+
+class FactCache:
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 256,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = 3600.0,
+                 serve_stale: bool = True):
+        """
+        max_entries / max_bytes bound the in-memory LRU (None = unbounded)
+        ttl is the freshness window in seconds (None = never expires)
+        serve_stale returns an expired entry while a background refresh runs
+        """
+        self.db_path = db_path or default_cache_path()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.serve_stale = serve_stale
+
+        self._memory = OrderedDict()  # (category, prompt) -> (response, created_at, size)
+        self._memory_bytes = 0
+        self._disk_entries = 0  # running totals so stats() never scans the table;
+        self._disk_bytes = 0    # other processes' writes show up on the next open
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._pool_next = {}  # (category, prompt) -> slot to overwrite once a pool is used up
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "expired": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "writes": 0
+        }
+        self._db = self._open_db()
+
+    def _open_db(self) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite tier; fall back to memory-only on failure"""
+        try:
+            db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS ai_cache (
+                    category TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (category, prompt)
+                )
+            """)
+            db.commit()
+            self._disk_entries, self._disk_bytes = db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM({_RESPONSE_BYTES}), 0) FROM ai_cache"
+            ).fetchone()
+            return db
+        except sqlite3.Error:
+            return None
+
+    # === Memory tier ===
+    def _remember(self, key: tuple, response: str, created_at: float):
+        """Insert into the LRU and evict from the cold end until within bounds"""
+        size = len(response.encode('utf-8'))
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_bytes -= old[2]
+        self._memory[key] = (response, created_at, size)
+        self._memory_bytes += size
+
+        while self._memory and (
+            (self.max_entries is not None and len(self._memory) > self.max_entries) or
+            (self.max_bytes is not None and self._memory_bytes > self.max_bytes)
+        ):
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl is None or (time.time() - created_at) <= self.ttl
+
+    # === Public API ===
+    def get(self, category: str, prompt: str,
+            refresh: Optional[Callable[[], Optional[str]]] = None) -> Optional[str]:
+        """
+        Look up a cached response
+        Expired entries are served (and refreshed in the background) only when
+        serve_stale is on and a refresh callable is given
+        """
+        return self._get((category, prompt), refresh, (category, prompt))
+
+    def _get(self, key: tuple, refresh: Optional[Callable[[], Optional[str]]],
+             refresh_key: tuple) -> Optional[str]:
+        category, prompt = key
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+                response, created_at, _ = entry
+                tier = "memory_hits"
+            else:
+                row = self._load_row(category, prompt)
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                response, created_at = row
+                self._remember(key, response, created_at)
+                tier = "disk_hits"
+
+            if self._is_fresh(created_at):
+                self._stats[tier] += 1
+                return response
+
+            if self.serve_stale and refresh is not None:
+                self._stats["stale_served"] += 1
+                self._start_refresh(key, refresh, refresh_key)
+                return response
+
+            self._stats["expired"] += 1
+            return None
+
+    @staticmethod
+    def pool_key(prompt: str, slot: int) -> str:
+        """Cache prompt for one pool slot (slot 0 is the bare prompt)"""
+        return prompt if slot == 0 else f"{prompt} #{slot}"
+
+    def get_pooled(self, category: str, prompt: str, accept: Callable[[str], bool],
+                   pool_size: int = DEFAULT_POOL_SIZE,
+                   refresh: Optional[Callable[[], Optional[str]]] = None) -> tuple:
+        """
+        First pooled answer for the prompt that accept() takes, as (response, key)
+        On a miss returns (None, key) where key is the slot to put() a fresh
+        answer in: the first empty slot, or the oldest-written once all are taken
+        Stale slots share one background refresh per prompt
+        """
+        for slot in range(pool_size):
+            key = self.pool_key(prompt, slot)
+            response = self._get((category, key), refresh, (category, prompt))
+            if response is None:
+                return None, key
+            if accept(response):
+                return response, key
+        with self._lock:
+            slot = self._pool_next.get((category, prompt), 0)
+            self._pool_next[(category, prompt)] = (slot + 1) % pool_size
+        return None, self.pool_key(prompt, slot)
+
+    def put(self, category: str, prompt: str, response: str):
+        """Store a response in both tiers"""
+        created_at = time.time()
+        with self._lock:
+            self._remember((category, prompt), response, created_at)
+            self._stats["writes"] += 1
+            if self._db is not None:
+                try:
+                    old = self._db.execute(
+                        f"SELECT {_RESPONSE_BYTES} FROM ai_cache WHERE category = ? AND prompt = ?",
+                        (category, prompt)
+                    ).fetchone()
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO ai_cache (category, prompt, response, created_at) VALUES (?, ?, ?, ?)",
+                        (category, prompt, response, created_at)
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    return
+                if old:
+                    self._disk_entries -= 1
+                    self._disk_bytes -= old[0]
+                self._disk_entries += 1
+                self._disk_bytes += len(response.encode('utf-8'))
+
+    def _load_row(self, category: str, prompt: str) -> Optional[tuple]:
+        if self._db is None:
+            return None
+        try:
+            return self._db.execute(
+                "SELECT response, created_at FROM ai_cache WHERE category = ? AND prompt = ?",
+                (category, prompt)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def _start_refresh(self, key: tuple, refresh: Callable[[], Optional[str]], refresh_key: tuple):
+        """Run one background refresh per refresh_key at a time (caller holds the lock)"""
+        if refresh_key in self._refreshing:
+            return
+        self._refreshing.add(refresh_key)
+
+        def run():
+            try:
+                response = refresh()
+                if response:
+                    self.put(key[0], key[1], response)
+                    with self._lock:
+                        self._stats["refreshes"] += 1
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(refresh_key)
+
+        threading.Thread(target=run, name="fact-cache-refresh", daemon=True).start()
+
+    def prune(self, expired_only: bool = True, category: Optional[str] = None) -> int:
+        """Drop expired (or all) entries from both tiers; returns rows removed on disk"""
+        with self._lock:
+            cutoff = None if not expired_only or self.ttl is None else time.time() - self.ttl
+            if expired_only and cutoff is None:
+                return 0
+
+            for key in list(self._memory):
+                if category and key[0] != category:
+                    continue
+                if cutoff is None or self._memory[key][1] < cutoff:
+                    self._memory_bytes -= self._memory.pop(key)[2]
+
+            if self._db is None:
+                return 0
+            where = " WHERE 1 = 1"
+            params = []
+            if cutoff is not None:
+                where += " AND created_at < ?"
+                params.append(cutoff)
+            if category:
+                where += " AND category = ?"
+                params.append(category)
+            _, size = self._db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM({_RESPONSE_BYTES}), 0) FROM ai_cache" + where, params
+            ).fetchone()
+            removed = self._db.execute("DELETE FROM ai_cache" + where, params).rowcount
+            self._db.commit()
+            self._disk_entries -= removed
+            self._disk_bytes -= size
+            return removed
+
+    def entries(self, category: Optional[str] = None) -> list:
+        """List on-disk entries as (category, prompt, response, age_seconds)"""
+        if self._db is None:
+            return []
+        query = "SELECT category, prompt, response, created_at FROM ai_cache"
+        params = []
+        if category:
+            query += " WHERE category = ?"
+            params.append(category)
+        query += " ORDER BY created_at DESC"
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [(c, p, r, now - created) for c, p, r, created in rows]
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters plus tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            stats["disk_entries"] = self._disk_entries if self._db is not None else 0
+            stats["disk_bytes"] = self._disk_bytes if self._db is not None else 0
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["stale_served"] + stats["misses"] + stats["expired"]
+        stats["hit_ratio"] = (lookups - stats["misses"] - stats["expired"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# === Cache CLI ===
+def main(argv=None):
+    """Inspect and prune the on-disk AI cache"""
+    parser = argparse.ArgumentParser(description="FactVerse AI cache tool")
+    parser.add_argument("--db", default=None, help="cache file (default: fact_cache.db next to the scripts)")
+    parser.add_argument("--ttl", type=float, default=3600.0, help="freshness window in seconds")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show entry counts and sizes")
+    show = commands.add_parser("show", help="list cached responses")
+    show.add_argument("--category", default=None)
+    prune = commands.add_parser("prune", help="remove expired entries")
+    prune.add_argument("--all", action="store_true", help="remove every entry, not just expired ones")
+    prune.add_argument("--category", default=None)
+    args = parser.parse_args(argv)
+
+    cache = FactCache(db_path=args.db, ttl=args.ttl)
+    if cache._db is None:
+        print(f"❌ Could not open cache file: {cache.db_path}")
+        return 1
+
+    if args.command == "stats":
+        stats = cache.stats()
+        expired = sum(1 for entry in cache.entries() if entry[3] > args.ttl)
+        print(f"🗄️ Cache file: {cache.db_path}")
+        print(f"📦 Entries: {stats['disk_entries']} ({stats['disk_bytes']} bytes)")
+        print(f"⌛ Expired: {expired}")
+    elif args.command == "show":
+        for category, prompt, response, age in cache.entries(args.category):
+            print(f"[{category}] ({int(age)}s) {prompt}")
+            print(f"   >> {response}")
+    elif args.command == "prune":
+        removed = cache.prune(expired_only=not args.all, category=args.category)
+        print(f"🧹 Removed {removed} cached responses")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
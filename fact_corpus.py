@@ -0,0 +1,233 @@
+# fact_corpus.py - Compiled, memory-mapped fact corpus for FactVerse
+# Turns facts.json into a compact binary file (category table + offset array +
+# UTF-8 blob) and reads single facts straight out of an mmap
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+from collections.abc import Mapping, Sequence
+from typing import Optional, Union
+
+COMPILED_SUFFIX = ".bin"
+_MAGIC = b"FVCP"
+_VERSION = 2
+# magic, version, reserved, category count, fact count, table/offsets/blob/weights positions
+_HEADER = struct.Struct("<4sHHIQQQQQ")
+_CATEGORY = struct.Struct("<HQQ")  # name length, first fact index, fact count
+_OFFSET = struct.Struct("<Q")
+_WEIGHT = struct.Struct("<d")
+
+
+class FactList(list):
+    """List of fact texts with optional per-fact weights (None = uniform)"""
+
+    def __init__(self, texts=(), weights: Optional[list] = None):
+        super().__init__(texts)
+        self.weights = weights
+
+
+def parse_entries(entries) -> FactList:
+    """
+    Normalize a category's JSON entries; each is either a string or
+    {"text": "...", "weight": 2.0} (weight defaults to 1)
+    """
+    texts, weights = [], []
+    for entry in entries:
+        if isinstance(entry, dict):
+            texts.append(entry["text"])
+            weights.append(float(entry.get("weight", 1.0)))
+        else:
+            texts.append(entry)
+            weights.append(1.0)
+    return FactList(texts, weights if any(weight != 1.0 for weight in weights) else None)
+
+
+def read_json_corpus(json_path: str) -> dict:
+    """Parse facts.json into category -> FactList"""
+    with open(json_path, 'r', encoding='utf-8') as file:
+        corpus = json.load(file)
+    return {category: parse_entries(entries) for category, entries in corpus.items()}
+
+
+def compiled_path_for(json_path: str) -> str:
+    """facts.json -> facts.bin"""
+    return os.path.splitext(json_path)[0] + COMPILED_SUFFIX
+
+
+def compile_facts(json_path: str, out_path: Optional[str] = None) -> str:
+    """Compile a facts.json file into the binary corpus format; returns the output path"""
+    out_path = out_path or compiled_path_for(json_path)
+    corpus = read_json_corpus(json_path)
+
+    table = bytearray()
+    offsets = bytearray()
+    weights = bytearray()
+    weighted = any(facts.weights for facts in corpus.values())
+    blob_len = 0
+    blobs = []
+    first = 0
+    for category, facts in corpus.items():
+        name = category.encode('utf-8')
+        table += _CATEGORY.pack(len(name), first, len(facts)) + name
+        for i, fact in enumerate(facts):
+            encoded = fact.encode('utf-8')
+            offsets += _OFFSET.pack(blob_len)
+            blobs.append(encoded)
+            blob_len += len(encoded)
+            if weighted:
+                weights += _WEIGHT.pack(facts.weights[i] if facts.weights else 1.0)
+        first += len(facts)
+    offsets += _OFFSET.pack(blob_len)
+
+    table_pos = _HEADER.size
+    offsets_pos = table_pos + len(table)
+    blob_pos = offsets_pos + len(offsets)
+    weights_pos = blob_pos + blob_len if weighted else 0
+    header = _HEADER.pack(_MAGIC, _VERSION, 0, len(corpus), first, table_pos, offsets_pos, blob_pos, weights_pos)
+
+    # Write beside the target and rename so readers never map a half-written file
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(header)
+        file.write(table)
+        file.write(offsets)
+        for encoded in blobs:
+            file.write(encoded)
+        file.write(weights)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class CategoryView(Sequence):
+    """Read-only list-like view of one category; facts are decoded on access"""
+
+    def __init__(self, corpus: "CompiledCorpus", first: int, count: int):
+        self._corpus = corpus
+        self._first = first
+        self._count = count
+        self._weights = None
+
+    @property
+    def weights(self) -> Optional[list]:
+        """Per-fact weights read from the weights section (None = uniform)"""
+        if self._weights is None and self._corpus._weights_pos:
+            pos = self._corpus._weights_pos + self._first * _WEIGHT.size
+            weights = list(struct.unpack_from(f"<{self._count}d", self._corpus._mm, pos))
+            self._weights = weights if any(weight != 1.0 for weight in weights) else []
+        return self._weights or None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("fact index out of range")
+        return self._corpus._fact_at(self._first + index)
+
+
+class CompiledCorpus(Mapping):
+    """Mapping of category -> CategoryView backed by an mmap of a compiled corpus"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size or self._mm[:6] != _MAGIC + struct.pack("<H", _VERSION):
+            self._mm.close()
+            raise ValueError(f"Not a compiled FactVerse corpus (version {_VERSION}): {path}")
+        _, _, _, num_categories, self.total_facts, table_pos, self._offsets_pos, self._blob_pos, \
+            self._weights_pos = _HEADER.unpack_from(self._mm, 0)
+
+        # The category table is tiny, so it is parsed eagerly
+        self._categories = {}
+        pos = table_pos
+        for _ in range(num_categories):
+            name_len, first, count = _CATEGORY.unpack_from(self._mm, pos)
+            pos += _CATEGORY.size
+            name = self._mm[pos:pos + name_len].decode('utf-8')
+            pos += name_len
+            self._categories[name] = (first, count)
+
+    def _fact_at(self, index: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_pos + index * _OFFSET.size)
+        return self._mm[self._blob_pos + start:self._blob_pos + end].decode('utf-8')
+
+    def fact(self, category: str, index: int) -> str:
+        """Fetch the index-th fact of a category without touching the rest"""
+        return self[category][index]
+
+    def __getitem__(self, category: str) -> CategoryView:
+        first, count = self._categories[category]
+        return CategoryView(self, first, count)
+
+    def __iter__(self):
+        return iter(self._categories)
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def counts(self) -> dict:
+        return {name: count for name, (_, count) in self._categories.items()}
+
+    def close(self):
+        self._mm.close()
+
+
+def load_corpus(json_path: str) -> Union[CompiledCorpus, dict]:
+    """
+    Open the compiled corpus next to json_path when it is up to date,
+    otherwise fall back to parsing the JSON (raises FileNotFoundError if neither exists)
+    """
+    bin_path = compiled_path_for(json_path)
+    try:
+        bin_mtime = os.path.getmtime(bin_path)
+        json_mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else 0
+        if bin_mtime >= json_mtime:
+            return CompiledCorpus(bin_path)
+    except (OSError, ValueError):
+        pass
+    return read_json_corpus(json_path)
+
+
+# === Corpus CLI ===
+def main(argv=None):
+    """Compile facts.json and inspect the result"""
+    parser = argparse.ArgumentParser(description="FactVerse corpus compiler")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = commands.add_parser("compile", help="compile facts.json into a binary corpus")
+    compile_cmd.add_argument("source", nargs="?", default="facts.json")
+    compile_cmd.add_argument("output", nargs="?", default=None)
+    info = commands.add_parser("info", help="show categories and counts")
+    info.add_argument("corpus", nargs="?", default="facts" + COMPILED_SUFFIX)
+    get = commands.add_parser("get", help="print one fact")
+    get.add_argument("category")
+    get.add_argument("index", type=int)
+    get.add_argument("--corpus", default="facts" + COMPILED_SUFFIX)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "compile":
+            out_path = compile_facts(args.source, args.output)
+            print(f"✅ Compiled {args.source} -> {out_path} ({os.path.getsize(out_path)} bytes)")
+        elif args.command == "info":
+            corpus = CompiledCorpus(args.corpus)
+            print(f"📚 {args.corpus}: {corpus.total_facts} facts")
+            for category, count in corpus.counts().items():
+                print(f"   {category}: {count}")
+        elif args.command == "get":
+            print(CompiledCorpus(args.corpus).fact(args.category, args.index))
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# fact_dedup.py - Near-duplicate detection for FactVerse
+# Character-shingle MinHash with LSH banding, so paraphrased repeats are caught
+# without comparing a new fact against every fact already shown.
+# LazyCorpusIndex indexes a corpus one category at a time, in the background
+
+import re
+import zlib
+import random
+import threading
+from collections import OrderedDict
+from typing import Iterable, Mapping, Optional, Sequence
+
+from fact_corpus import read_json_corpus
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", text.lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.6, num_perm: int = 32, bands: int = 8,
+                 shingle_size: int = 4, seed: int = 1, max_entries: Optional[int] = None):
+        """
+        threshold is the Jaccard similarity (over character shingles) at or
+        above which two facts count as duplicates
+        max_entries bounds memory by forgetting the oldest facts first
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets = [{} for _ in range(bands)]  # band -> {band_hash: [entry ids]}
+        self._entries = OrderedDict()  # entry id -> (text, shingles, band keys), oldest first
+        self._next_id = 0
+
+    def _shingle(self, text: str) -> frozenset:
+        norm = normalize(text)
+        k = self.shingle_size
+        if len(norm) <= k:
+            return frozenset([zlib.crc32(norm.encode('utf-8'))])
+        return frozenset(zlib.crc32(norm[i:i + k].encode('utf-8')) for i in range(len(norm) - k + 1))
+
+    def _signature(self, shingles: frozenset) -> list:
+        return [min((a * h + b) % _MERSENNE_PRIME for h in shingles) for a, b in self._perms]
+
+    def _band_keys(self, signature: list) -> list:
+        rows = self.rows
+        return [hash(tuple(signature[i * rows:(i + 1) * rows])) for i in range(self.bands)]
+
+    def _candidates(self, band_keys: list) -> set:
+        found = set()
+        for band, key in enumerate(band_keys):
+            found.update(self._buckets[band].get(key, ()))
+        return found
+
+    @staticmethod
+    def jaccard(a: frozenset, b: frozenset) -> float:
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+    def _match(self, shingles: frozenset, band_keys: list) -> Optional[int]:
+        best, best_score = None, self.threshold
+        for entry_id in self._candidates(band_keys):
+            score = self.jaccard(shingles, self._entries[entry_id][1])
+            if score >= best_score:
+                best, best_score = entry_id, score
+        return best
+
+    def find_duplicate(self, text: str) -> Optional[str]:
+        """Return the indexed fact that text nearly duplicates, if any"""
+        shingles = self._shingle(text)
+        match = self._match(shingles, self._band_keys(self._signature(shingles)))
+        return None if match is None else self._entries[match][0]
+
+    def is_duplicate(self, text: str) -> bool:
+        return self.find_duplicate(text) is not None
+
+    def add(self, text: str):
+        """Index a fact unconditionally"""
+        shingles = self._shingle(text)
+        self._insert(text, shingles, self._band_keys(self._signature(shingles)))
+
+    def add_if_new(self, text: str) -> bool:
+        """Index text unless it nearly duplicates a known fact; True if added"""
+        shingles = self._shingle(text)
+        band_keys = self._band_keys(self._signature(shingles))
+        if self._match(shingles, band_keys) is not None:
+            return False
+        self._insert(text, shingles, band_keys)
+        return True
+
+    def _insert(self, text: str, shingles: frozenset, band_keys: list):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (text, shingles, band_keys)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        entry_id, (_, _, band_keys) = self._entries.popitem(last=False)
+        for band, key in enumerate(band_keys):
+            bucket = self._buckets[band][key]
+            bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def update(self, texts: Iterable[str]):
+        for text in texts:
+            self.add(text)
+
+    def load_corpus(self, path: str) -> int:
+        """Index every fact in a facts.json-style file; returns facts added"""
+        try:
+            corpus = read_json_corpus(path)
+        except (FileNotFoundError, ValueError, KeyError):
+            return 0
+        before = len(self)
+        for facts in corpus.values():
+            self.update(facts)
+        return len(self) - before
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, text: str) -> bool:
+        return self.is_duplicate(text)
+
+
+class LazyCorpusIndex:
+    """
+    Near-duplicate lookups against a fact corpus (any category -> facts mapping,
+    e.g. a FactStore). A category is indexed on a background thread after its
+    first lookup, so neither startup nor that lookup waits on the corpus;
+    lookups in a category find nothing until its index is ready
+    """
+
+    def __init__(self, corpus: Mapping, threshold: float = 0.6, max_facts: Optional[int] = 50_000,
+                 background: bool = True):
+        """
+        max_facts caps the facts indexed per category (an evenly spaced sample
+        of larger ones): MinHashing costs about 0.5 ms and a few KB per fact
+        """
+        self.corpus = corpus
+        self.threshold = threshold
+        self.max_facts = max_facts
+        self.background = background
+        self._indexes = {}  # category -> finished index
+        self._building = {}  # category -> Event set once its index is finished
+        self._lock = threading.Lock()
+
+    def _sample(self, category: str) -> Sequence[str]:
+        facts = self.corpus[category]
+        if self.max_facts is not None and len(facts) > self.max_facts:
+            return facts[::-(-len(facts) // self.max_facts)]
+        return facts
+
+    def _build(self, category: str, done: threading.Event):
+        index = NearDuplicateIndex(threshold=self.threshold)
+        try:
+            if category in self.corpus:
+                index.update(self._sample(category))
+        finally:
+            self._indexes[category] = index
+            done.set()
+
+    def _index(self, category: str) -> Optional[NearDuplicateIndex]:
+        """The category's index, or None while it is still being built"""
+        index = self._indexes.get(category)
+        if index is None:
+            with self._lock:
+                if category not in self._building:
+                    done = self._building[category] = threading.Event()
+                    if self.background:
+                        threading.Thread(target=self._build, args=(category, done),
+                                         name="fact-dedup-index", daemon=True).start()
+                    else:
+                        self._build(category, done)
+            index = self._indexes.get(category)
+        return index
+
+    def wait(self, category: str, timeout: Optional[float] = None) -> bool:
+        """Start indexing the category if needed and wait for it; True once ready"""
+        self._index(category)
+        return self._building[category].wait(timeout)
+
+    def find_duplicate(self, category: str, text: str) -> Optional[str]:
+        """The category's corpus fact that text nearly duplicates, if any (None while indexing)"""
+        index = self._index(category)
+        return None if index is None else index.find_duplicate(text)
+
+    def is_duplicate(self, category: str, text: str) -> bool:
+        return self.find_duplicate(category, text) is not None
+
+    def indexed_categories(self) -> list:
+        return list(self._indexes)
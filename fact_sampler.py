@@ -0,0 +1,217 @@
+# fact_sampler.py - Non-repeating and weighted fact selection for FactVerse
+# Shuffle bags deal every fact of a category once before any repeats,
+# with O(1) work per draw (incremental Fisher-Yates); weighted categories
+# use Vose alias tables, also O(1) per draw, that absorb single weight
+# changes without an O(n) rebuild
+
+import math
+import random
+import threading
+from typing import Callable, Optional, Sequence
+
+
+class ShuffleBag:
+    def __init__(self, size: int, rng: Optional[random.Random] = None,
+                 no_repeat_across_boundary: bool = True):
+        """
+        Deals indexes 0..size-1 in random order, each once per round
+        no_repeat_across_boundary stops a new round starting with the index
+        that ended the previous one
+        """
+        if size <= 0:
+            raise ValueError("ShuffleBag needs at least one item")
+        self.size = size
+        self.no_repeat_across_boundary = no_repeat_across_boundary
+        self.rounds = 0
+        self._rng = rng or random.Random()
+        self._order = list(range(size))
+        self._remaining = size
+        self._last = None
+
+    def draw(self) -> int:
+        rng = self._rng
+        order = self._order
+        new_round = self._remaining == 0
+        if new_round:
+            # Any permutation is a valid starting point, so a refill is O(1)
+            self._remaining = self.size
+            self.rounds += 1
+
+        # Move a random undealt slot to the end of the undealt region and deal it
+        last = self._remaining - 1
+        j = rng.randrange(self._remaining)
+        order[j], order[last] = order[last], order[j]
+
+        if new_round and self.no_repeat_across_boundary and order[last] == self._last and last > 0:
+            k = rng.randrange(last)
+            order[k], order[last] = order[last], order[k]
+
+        self._remaining = last
+        self._last = order[last]
+        return self._last
+
+
+class AliasTable:
+    def __init__(self, weights: Sequence[float], rng: Optional[random.Random] = None):
+        """Vose's alias method: O(n) build, O(1) weighted draw"""
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("AliasTable needs non-negative weights with a positive sum")
+        self.size = n
+        self._rng = rng or random.Random()
+
+        prob = [weight * n / total for weight in weights]
+        alias = [0] * n
+        small = [i for i, p in enumerate(prob) if p < 1.0]
+        large = [i for i, p in enumerate(prob) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            alias[less] = more
+            prob[more] = prob[more] + prob[less] - 1.0
+            (small if prob[more] < 1.0 else large).append(more)
+        # Leftovers are 1.0 up to floating-point error
+        for i in large + small:
+            prob[i] = 1.0
+        self._prob = prob
+        self._alias = alias
+
+    def draw(self) -> int:
+        rng = self._rng
+        i = int(rng.random() * self.size)
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+
+class DynamicAliasTable:
+    """
+    Weighted draws that stay O(1) while individual weights change
+    Draws come from an alias table over the weights it was built with: a
+    lowered weight is rejected part of the time, and raised weights add a
+    small alias table over just the increases. set() costs O(1) plus an
+    O(changes) rebuild of that small table; the full O(n) rebuild waits
+    until about sqrt(n) weights have changed or half the base mass is lost
+    """
+
+    def __init__(self, weights: list, rng: Optional[random.Random] = None):
+        """weights is used (and updated by set) in place"""
+        self._rng = rng or random.Random()
+        self.weights = weights
+        self.rebuilds = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        self._base = AliasTable(self.weights, self._rng)
+        self._base_weights = list(self.weights)
+        self._base_total = float(sum(self.weights))
+        self._accept = {}  # index -> share of its base weight still drawn (lowered weights)
+        self._extra = {}  # index -> weight above its base weight (raised weights)
+        self._extra_total = 0.0
+        self._extra_table = None
+        self._lost = 0.0  # base mass rejected away
+        self.rebuilds += 1
+
+    def set(self, index: int, weight: float) -> bool:
+        """Change one weight; True if that triggered a full rebuild"""
+        if weight < 0:
+            raise ValueError("weights must be non-negative")
+        base, previous = self._base_weights[index], self.weights[index]
+        self.weights[index] = weight
+        kept = min(weight, base)
+        self._lost += min(previous, base) - kept
+        if kept < base:
+            self._accept[index] = kept / base
+        else:
+            self._accept.pop(index, None)
+        self._extra_total += max(0.0, weight - base) - max(0.0, previous - base)
+        if weight > base:
+            self._extra[index] = weight - base
+        else:
+            self._extra.pop(index, None)
+        self._extra_table = None
+
+        changed = len(self._accept) + len(self._extra)
+        if changed > max(16, math.isqrt(len(self.weights))) or self._lost > self._base_total / 2:
+            self._rebuild()
+            return True
+        return False
+
+    def draw(self) -> int:
+        rng = self._rng
+        while True:
+            if self._extra and rng.random() * (self._base_total + self._extra_total) >= self._base_total:
+                if self._extra_table is None:
+                    self._extra_table = (list(self._extra), AliasTable(list(self._extra.values()), rng))
+                keys, table = self._extra_table
+                return keys[table.draw()]
+            i = self._base.draw()
+            accept = self._accept.get(i)
+            if accept is None or rng.random() < accept:
+                return i
+
+
+class FactSampler:
+    def __init__(self, seed: Optional[int] = None, no_repeat_across_boundary: bool = True):
+        """
+        One shuffle bag per uniform category, one alias table per weighted
+        category; pass a seed for reproducible draws
+        """
+        self.no_repeat_across_boundary = no_repeat_across_boundary
+        self.table_builds = 0
+        self._rng = random.Random(seed)
+        self._bags = {}  # category -> (facts object, bag)
+        self._tables = {}  # category -> [facts object, weights, alias table or None until first draw]
+        self._lock = threading.Lock()
+
+    def _bag_for(self, category: str, facts: Sequence[str]) -> ShuffleBag:
+        entry = self._bags.get(category)
+        # A reloaded or resized category starts a fresh bag (equal lists rebuilt
+        # on every call, like a prompt table, keep theirs)
+        if entry is None or entry[1].size != len(facts) or (entry[0] is not facts and entry[0] != facts):
+            entry = (facts, ShuffleBag(len(facts), self._rng, self.no_repeat_across_boundary))
+            self._bags[category] = entry
+        return entry[1]
+
+    def _weights_entry(self, category: str, facts: Sequence[str], create: bool) -> Optional[list]:
+        entry = self._tables.get(category)
+        if entry is not None and entry[0] is facts:
+            return entry
+        weights = getattr(facts, 'weights', None)
+        if not weights and not create:
+            self._tables.pop(category, None)
+            return None
+        entry = [facts, list(weights) if weights else [1.0] * len(facts), None]
+        self._tables[category] = entry
+        return entry
+
+    def choose(self, category: str, facts: Sequence[str]) -> str:
+        """Next fact: weighted draw if the category has weights, else from its bag"""
+        with self._lock:
+            entry = self._weights_entry(category, facts, create=False)
+            if entry is None:
+                return facts[self._bag_for(category, facts).draw()]
+            if entry[2] is None:
+                entry[2] = DynamicAliasTable(entry[1], self._rng)
+                self.table_builds += 1
+            return facts[entry[2].draw()]
+
+    def set_weight(self, category: str, facts: Sequence[str], index: int, weight: float):
+        """Change one fact's weight in place (see DynamicAliasTable for the cost)"""
+        with self._lock:
+            entry = self._weights_entry(category, facts, create=True)
+            if entry[2] is None:
+                entry[1][index] = float(weight)
+            elif entry[2].set(index, float(weight)):
+                self.table_builds += 1
+
+    def chooser(self, category: str) -> Callable[[Sequence[str]], str]:
+        """A random.choice-compatible callable bound to one category"""
+        return lambda facts: self.choose(category, facts)
+
+    def reset(self, category: Optional[str] = None):
+        with self._lock:
+            if category is None:
+                self._bags.clear()
+                self._tables.clear()
+            else:
+                self._bags.pop(category, None)
+                self._tables.pop(category, None)
@@ -0,0 +1,244 @@
+# fact_server.py - Async HTTP API for FactVerse
+# Serves facts from the shared FactStore (inline, O(1) per fact) and the AI
+# generator (offloaded to a thread pool so the event loop never blocks)
+#
+#   GET /facts/{category}        -> one fact
+#   GET /facts/{category}?n=K    -> K facts
+#   POST /saved                  -> save {"fact", "category", "source"} to saved_facts.txt
+#   GET /status                  -> generator + store status
+#   GET /metrics                 -> Prometheus text exposition format
+
+import os
+import sys
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from fact_metrics import FACTS_SERVED, LOCAL_FACT_SECONDS, SAVE_FACT_SECONDS, get_metrics
+from fact_store import FactStore, get_store
+from fact_writer import SavedFactWriter, get_writer
+
+MAX_FACTS_PER_REQUEST = 100
+MAX_BODY_BYTES = 64 * 1024  # a saved fact is a few hundred bytes
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class FactServer:
+    def __init__(self, store: Optional[FactStore] = None, generator=None, ai_workers: int = 4,
+                 writer: Optional[SavedFactWriter] = None, metrics: Optional[Callable[[], str]] = None):
+        """
+        generator is an AIFactGenerator (or None for local facts only); writer
+        defaults to get_writer() and metrics (the /metrics text) to this process's registry
+        """
+        self.store = store or get_store()
+        self.generator = generator
+        self.writer = writer
+        self.metrics = metrics or get_metrics().render
+        self.started_at = time.time()
+        self.requests = 0
+        self.responses = {}
+        self._executor = ThreadPoolExecutor(max_workers=ai_workers, thread_name_prefix="fact-ai")
+        self._server = None
+
+    @property
+    def ai_enabled(self) -> bool:
+        return bool(self.generator and self.generator.openai_available)
+
+    # === Fact handlers ===
+    async def _facts(self, category: str, query: dict) -> tuple:
+        if category not in self.store:
+            return 404, {"error": f"Unknown category: {category}"}
+        try:
+            count = int(query.get("n", ["1"])[0])
+        except ValueError:
+            return 400, {"error": "n must be an integer"}
+        if not 1 <= count <= MAX_FACTS_PER_REQUEST:
+            return 400, {"error": f"n must be between 1 and {MAX_FACTS_PER_REQUEST}"}
+        use_ai = self.ai_enabled and query.get("source", ["ai"])[0] != "local"
+
+        if use_ai:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, self.generator.generate_fact, category)
+                for _ in range(count)
+            ))
+        else:
+            # Local draws are in-memory and O(1), cheaper than a thread hop
+            with LOCAL_FACT_SECONDS.time():
+                results = [(self.store.random_fact(category), "LOCAL") for _ in range(count)]
+            FACTS_SERVED.labels(category, "LOCAL").inc(count)
+
+        facts = [{"fact": fact, "source": source} for fact, source in results]
+        if "n" not in query:
+            return 200, dict(category=category, **facts[0])
+        return 200, {"category": category, "count": len(facts), "facts": facts}
+
+    def _save(self, body: bytes) -> tuple:
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "Body must be JSON"}
+        fact = request.get("fact") if isinstance(request, dict) else None
+        if not isinstance(fact, str) or not fact.strip():
+            return 400, {"error": "fact is required"}
+        source = "AI" if request.get("source") == "AI" else "DB"
+        with SAVE_FACT_SECONDS.time():
+            (self.writer or get_writer()).save(fact.strip(), source, category=request.get("category"))
+        return 200, {"saved": True}
+
+    def status(self) -> dict:
+        status = self.generator.get_status() if self.generator else {
+            "ai_available": False,
+            "categories": self.store.categories(),
+            "store": self.store.stats()
+        }
+        status["server"] = {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "responses": {str(code): count for code, count in self.responses.items()}
+        }
+        return status
+
+    async def dispatch(self, method: str, target: str, body: bytes = b"") -> tuple:
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/")
+        if path == "/saved":
+            if method != "POST":
+                return 405, {"error": "Use POST to save a fact"}
+            return self._save(body)
+        if method != "GET":
+            return 405, {"error": "Only GET is supported"}
+        if path.startswith("/facts/"):
+            return await self._facts(path[len("/facts/"):], parse_qs(url.query))
+        if path == "/status":
+            return 200, self.status()
+        if path == "/metrics":
+            return 200, self.metrics()
+        return 404, {"error": f"No route for {path or '/'}"}
+
+    # === HTTP plumbing ===
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip().lower()
+                try:
+                    body_length = int(headers.get("content-length", "0") or 0)
+                    if body_length < 0:
+                        raise ValueError(body_length)
+                except ValueError:
+                    # Without a usable length the rest of the stream can't be framed
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, keep_alive=False)
+                    break
+                if body_length > MAX_BODY_BYTES:
+                    # Refuse before reading so a huge body is never buffered
+                    await self._respond(writer, 413, {"error": f"Body exceeds {MAX_BODY_BYTES} bytes"},
+                                        keep_alive=False)
+                    break
+                try:
+                    body = await reader.readexactly(body_length) if body_length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                connection = headers.get("connection", "")
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                self.requests += 1
+                try:
+                    code, payload = await self.dispatch(method, target, body)
+                except Exception as e:
+                    code, payload = 500, {"error": str(e)}
+                await self._respond(writer, code, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, code: int, payload, keep_alive: bool):
+        """payload is a dict (sent as JSON) or already-rendered text"""
+        self.responses[code] = self.responses.get(code, 0) + 1
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8"
+        writer.write(
+            f"HTTP/1.1 {code} {_REASONS.get(code, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080, sock=None):
+        """Start listening (on host/port, or on an already-bound socket)"""
+        if sock is not None:
+            self._server = await asyncio.start_server(self.handle_connection, sock=sock)
+        else:
+            self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> Optional[int]:
+        if not self._server or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080, sock=None):
+        server = await self.start(host, port, sock)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self._server:
+            self._server.close()
+        self._executor.shutdown(wait=False)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, use_ai: bool = True):
+    """Run the API server until interrupted"""
+    generator = None
+    if use_ai:
+        try:
+            from fact_ai_generator import AIFactGenerator
+            generator = AIFactGenerator()
+        except ImportError:
+            generator = None
+
+    store = get_store()
+    if not store.exists():
+        print("❌ Error: facts.json file not found!")
+        sys.exit(1)
+    store.start_watching()
+
+    server = FactServer(store, generator)
+    mode = "AI + local" if server.ai_enabled else "local"
+    print(f"📡 FactVerse API listening on http://{host}:{port} ({mode} facts)")
+    print("   GET /facts/{category}[?n=K]   POST /saved   GET /status   GET /metrics")
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        print("\n👋 FactVerse API stopped.")
+    finally:
+        server.close()
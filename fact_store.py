@@ -0,0 +1,225 @@
+# fact_store.py - Process-wide fact store for FactVerse
+# One lazily-loaded copy of the corpus shared by FactVerse, AIFactGenerator
+# and main_simple, instead of each of them parsing facts.json on its own
+
+import os
+import time
+import hashlib
+import threading
+from collections import deque
+from typing import Optional, Sequence
+
+from fact_corpus import compiled_path_for, load_corpus
+from fact_sampler import FactSampler
+
+DEFAULT_FACTS_FILE = "facts.json"
+
+
+def default_facts_path() -> str:
+    """facts.json next to the scripts, overridable with FACTVERSE_FACTS"""
+    env_path = os.getenv('FACTVERSE_FACTS')
+    if env_path:
+        return env_path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, DEFAULT_FACTS_FILE)
+
+
+class FactStore:
+    def __init__(self, path: Optional[str] = None, seed: Optional[int] = None):
+        self.path = path or default_facts_path()
+        self.sampler = FactSampler(seed)
+        self.load_count = 0
+        self.reload_count = 0
+        self.reload_times = deque(maxlen=20)  # seconds per reload, newest last
+        self._snapshot = None  # category -> facts; replaced wholesale, never mutated
+        self._signature = None
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher = None
+
+    def exists(self) -> bool:
+        """True if a corpus file is present (does not parse it)"""
+        return os.path.exists(self.path) or os.path.exists(compiled_path_for(self.path))
+
+    def _file_signature(self) -> tuple:
+        """mtime/size of facts.json and facts.bin, used to notice edits"""
+        signature = []
+        for path in (self.path, compiled_path_for(self.path)):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_corpus(self):
+        try:
+            return load_corpus(self.path)
+        except FileNotFoundError:
+            return {}
+
+    def _loaded(self) -> dict:
+        """Parse (or map) the corpus on first access; a missing file reads as empty"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    signature = self._file_signature()
+                    corpus = self._read_corpus()
+                    self._snapshot = {category: corpus[category] for category in corpus}
+                    self._signature = signature
+                    self.load_count += 1
+                snapshot = self._snapshot
+        return snapshot
+
+    # === Hot reload ===
+    @staticmethod
+    def _fingerprint(facts: Sequence[str]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for fact in facts:
+            digest.update(fact.encode('utf-8'))
+            digest.update(b"\0")
+        weights = getattr(facts, 'weights', None)
+        if weights:
+            digest.update(repr(weights).encode('ascii'))
+        return digest.digest()
+
+    def reload(self, force: bool = False) -> list:
+        """
+        Re-read the corpus if its files changed and swap in a new snapshot
+        Unchanged categories keep their existing objects; returns the changed ones
+        """
+        with self._reload_lock:
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return []
+            started = time.perf_counter()
+            current = self._loaded()
+            try:
+                fresh = self._read_corpus()
+            except ValueError:
+                return []  # half-written file; retried on the next poll
+
+            snapshot, fingerprints, changed = {}, {}, []
+            for category in fresh:
+                facts = fresh[category]
+                fingerprint = fingerprints[category] = self._fingerprint(facts)
+                previous = self._fingerprints.get(category)
+                if previous is None and category in current:
+                    previous = self._fingerprint(current[category])
+                if category in current and fingerprint == previous:
+                    snapshot[category] = current[category]
+                else:
+                    snapshot[category] = facts
+                    changed.append(category)
+            changed.extend(category for category in current if category not in fresh)
+
+            # A single reference assignment: readers see the old or the new dict, never a mix
+            self._snapshot = snapshot
+            self._fingerprints = fingerprints
+            self._signature = signature
+            self.reload_count += 1
+            self.reload_times.append(time.perf_counter() - started)
+            return changed
+
+    def start_watching(self, interval: float = 1.0):
+        """Poll the corpus files in a background thread and reload on change"""
+        if self._watcher is not None:
+            return
+        self._watch_stop.clear()
+
+        def watch():
+            while not self._watch_stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    pass
+
+        self._watcher = threading.Thread(target=watch, name="fact-store-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(1.0)
+            self._watcher = None
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.load_count,
+            "reloads": self.reload_count,
+            "reload_ms": [round(seconds * 1000, 2) for seconds in self.reload_times],
+            "watching": self._watcher is not None
+        }
+
+    # === Category access ===
+    def categories(self) -> list:
+        return list(self._loaded())
+
+    def facts(self, category: str) -> Sequence[str]:
+        """All facts of a category (a lazy view for compiled corpora); KeyError if unknown"""
+        return self._loaded()[category]
+
+    def count(self, category: str) -> int:
+        facts = self._loaded().get(category)
+        return len(facts) if facts is not None else 0
+
+    def counts(self) -> dict:
+        return {category: len(facts) for category, facts in self._loaded().items()}
+
+    def get(self, category: str, index: int) -> str:
+        return self.facts(category)[index]
+
+    def random_fact(self, category: str, seen=None) -> Optional[str]:
+        """
+        Next fact from the category's shuffle bag, or None for an unknown or
+        empty category; with a SeenFilter, facts seen in earlier runs are skipped
+        """
+        facts = self._loaded().get(category)
+        if not facts:
+            return None
+        chooser = self.sampler.chooser(category)
+        if seen is not None:
+            return seen.pick_unseen(category, facts, chooser=chooser)
+        return chooser(facts)
+
+    def set_weight(self, category: str, index: int, weight: float):
+        """Boost or demote one fact for this process (facts.json weights are the persistent form)"""
+        self.sampler.set_weight(category, self.facts(category), index, weight)
+
+    # === Mapping-style helpers so the store drops in where a dict was used ===
+    def __contains__(self, category: str) -> bool:
+        return category in self._loaded()
+
+    def __getitem__(self, category: str) -> Sequence[str]:
+        return self.facts(category)
+
+    def __iter__(self):
+        return iter(self.categories())
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+
+# === Shared instance ===
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_store() -> FactStore:
+    """The process-wide store"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = FactStore()
+        return _shared_store
+
+
+def reset_store(path: Optional[str] = None) -> FactStore:
+    """Replace the process-wide store (used by tests and when switching corpora)"""
+    global _shared_store
+    with _shared_lock:
+        _shared_store = FactStore(path)
+        return _shared_store
@@ -0,0 +1,318 @@
+# fact_workers.py - Pre-fork multi-process API server for FactVerse
+# The supervisor compiles and maps the corpus once, binds one listening
+# socket and forks K FactServer workers that accept from it. Workers share
+# the corpus pages through the page cache instead of each holding a parsed
+# copy. Crashed workers are restarted (with backoff if they keep crashing),
+# and /metrics in any worker answers for all of them. When facts.json changes
+# the supervisor recompiles it once and sends RELOAD_SIGNAL to every worker,
+# which re-maps facts.bin instead of parsing the JSON itself
+
+import os
+import sys
+import glob
+import atexit
+import time
+import signal
+import shutil
+import socket
+import asyncio
+import tempfile
+import threading
+import traceback
+from typing import Optional
+
+from circuit_breaker import backoff_delay
+from fact_corpus import compile_facts, compiled_path_for
+from fact_metrics import MetricsRegistry, get_metrics, merge_metrics
+from fact_sampler import FactSampler
+from fact_server import FactServer
+from fact_store import FactStore, get_store
+from fact_writer import get_writer
+
+QUICK_CRASH_SECONDS = 5.0  # a worker dying sooner than this counts toward restart backoff
+CORPUS_CHECK_SECONDS = 1.0  # how often the supervisor looks for an edited facts.json
+RELOAD_SIGNAL = getattr(signal, "SIGUSR1", None)  # not SIGHUP: a terminal hangup should still stop workers
+
+
+def prepare_corpus(store: FactStore) -> bool:
+    """Compile facts.json into facts.bin if it is missing or stale; False if that isn't possible"""
+    json_path, bin_path = store.path, compiled_path_for(store.path)
+    try:
+        if os.path.exists(json_path) and (not os.path.exists(bin_path)
+                                          or os.path.getmtime(bin_path) < os.path.getmtime(json_path)):
+            compile_facts(json_path)
+            print(f"📦 Compiled {os.path.basename(json_path)} -> {os.path.basename(bin_path)} for shared mapping")
+        return os.path.exists(bin_path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: could not compile the corpus ({e}); each worker parses its own copy")
+        return False
+
+
+class WorkerSupervisor:
+    def __init__(self, workers: Optional[int] = None, host: str = "127.0.0.1", port: int = 8080,
+                 use_ai: bool = True, store: Optional[FactStore] = None, metrics_interval: float = 1.0):
+        """workers defaults to one per CPU; port 0 picks a free port (see .port)"""
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.requested_port = port
+        self.use_ai = use_ai
+        self.store = store or get_store()
+        self.metrics_interval = metrics_interval
+        self.registry = MetricsRegistry()
+        self.restarts = self.registry.counter("factverse_worker_restarts_total", "Worker processes restarted")
+        self.registry.gauge("factverse_workers_alive", "Worker processes running", lambda: len(self._children))
+        self.sock = None
+        self.run_dir = None
+        self._children = {}  # pid -> slot
+        self._started = {}  # slot -> monotonic start time
+        self._crashes = {}  # slot -> consecutive quick crashes
+        self._pending = {}  # slot -> monotonic time to restart it
+        self._corpus_checked = 0.0
+        self._stopping = threading.Event()
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.sock.getsockname()[1] if self.sock else None
+
+    def worker_pids(self) -> list:
+        return sorted(self._children)
+
+    # === Setup ===
+    def prepare(self):
+        """Map the corpus and bind the shared socket (before any fork)"""
+        prepare_corpus(self.store)
+        self.store.counts()  # map facts.bin here so every worker inherits the mapping
+        self.sock = socket.create_server((self.host, self.requested_port), backlog=1024)
+        self.sock.setblocking(False)
+        self.run_dir = tempfile.mkdtemp(prefix="factverse-workers-")
+
+    def _metrics_path(self, name: str) -> str:
+        return os.path.join(self.run_dir, f"{name}.prom")
+
+    def aggregate_metrics(self) -> str:
+        """Metrics summed over every worker (live and retired) plus the supervisor's own"""
+        sources = {}
+        for path in sorted(glob.glob(os.path.join(self.run_dir, "*.prom"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    sources[os.path.basename(path)[:-len(".prom")]] = file.read()
+            except OSError:
+                continue  # a worker that just exited and was retired
+        return merge_metrics(sources)
+
+    # === Worker side ===
+    def _spawn(self, slot: int):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Held until the worker has its handler, so a reload sent mid-fork isn't lost (or fatal)
+        signal.pthread_sigmask(signal.SIG_BLOCK, {RELOAD_SIGNAL})
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                self._run_worker(slot)
+                status = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(status)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {RELOAD_SIGNAL})
+        self._children[pid] = slot
+        self._started[slot] = time.monotonic()
+
+    def _run_worker(self, slot: int):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the supervisor, which stops us
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Forked copies of one RNG would hand every client the same sequence
+        self.store.sampler = FactSampler()
+        generator = None
+        if self.use_ai:
+            try:
+                from fact_ai_generator import AIFactGenerator
+                generator = AIFactGenerator()
+            except ImportError:
+                generator = None
+        writer = get_writer()
+        own_metrics = self._metrics_path(f"worker-{slot}")
+
+        def metrics() -> str:
+            get_metrics().write(own_metrics)
+            return self.aggregate_metrics()
+
+        server = FactServer(self.store, generator, writer=writer, metrics=metrics)
+        try:
+            asyncio.run(self._serve_worker(server, own_metrics))
+        finally:
+            # A second SIGTERM (e.g. one sent to the whole process group, then
+            # the supervisor's) must not cut the final flush short
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            server.close()
+            writer.close()
+            if generator is not None:
+                generator.stop_prefetch()
+                generator.seen.save()
+            get_metrics().write(own_metrics)
+
+    async def _serve_worker(self, server: FactServer, own_metrics: str):
+        await server.start(sock=self.sock)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+        # The supervisor has already compiled facts.bin, so this only re-maps it
+        loop.add_signal_handler(RELOAD_SIGNAL, lambda: loop.run_in_executor(None, self.store.reload))
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {RELOAD_SIGNAL})
+        while not stop.is_set():
+            get_metrics().write(own_metrics)
+            try:
+                await asyncio.wait_for(stop.wait(), self.metrics_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # === Supervisor side ===
+    def _retire(self, slot: int):
+        """Fold an exited worker's counters into the retired totals so sums never go backwards"""
+        path = self._metrics_path(f"worker-{slot}")
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                final = file.read()
+        except OSError:
+            return
+        retired_path = self._metrics_path("retired")
+        retired = ""
+        if os.path.exists(retired_path):
+            with open(retired_path, 'r', encoding='utf-8') as file:
+                retired = file.read()
+        temporary = f"{retired_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(merge_metrics({"retired": retired, "exited": final}, gauge_label=None))
+        os.replace(temporary, retired_path)
+        os.remove(path)
+
+    def _reap(self) -> list:
+        """(pid, slot, exit code) for every worker that has exited"""
+        exited = []
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            slot = self._children.pop(pid, None)
+            if slot is not None:
+                exited.append((pid, slot, os.waitstatus_to_exitcode(status)))
+        return exited
+
+    def _handle_exits(self):
+        now = time.monotonic()
+        for pid, slot, code in self._reap():
+            self._retire(slot)
+            if self._stopping.is_set():
+                continue
+            quick = now - self._started.get(slot, now) < QUICK_CRASH_SECONDS
+            self._crashes[slot] = self._crashes.get(slot, 0) + 1 if quick else 0
+            delay = backoff_delay(self._crashes[slot] - 1, 0.5, 30.0) if self._crashes[slot] else 0.0
+            reason = f"signal {-code}" if code < 0 else f"status {code}"
+            print(f"⚠️ Worker {slot} (pid {pid}) exited with {reason}; restarting in {delay:.1f}s")
+            self._pending[slot] = now + delay
+        for slot, due in list(self._pending.items()):
+            if due <= now and not self._stopping.is_set():
+                del self._pending[slot]
+                self.restarts.inc()
+                self._spawn(slot)
+
+    def _check_corpus(self):
+        """Recompile an edited facts.json once and have every worker re-map the result"""
+        now = time.monotonic()
+        if now - self._corpus_checked < CORPUS_CHECK_SECONDS:
+            return
+        self._corpus_checked = now
+        prepare_corpus(self.store)
+        if not self.store.reload():
+            return
+        # Reloaded here too, so workers restarted from now on inherit the new mapping
+        print(f"🔄 Corpus changed; reloading {len(self._children)} workers")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, RELOAD_SIGNAL)
+            except ProcessLookupError:
+                pass
+
+    def start(self):
+        """Prepare and fork the workers; call supervise() (or serve_forever) afterwards"""
+        self.prepare()
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+    def supervise(self):
+        """Restart crashed workers, reload edited corpora and export the supervisor's metrics until stop()"""
+        while not self._stopping.wait(min(0.2, self.metrics_interval)):
+            self._handle_exits()
+            self._check_corpus()
+            self.registry.write(self._metrics_path("supervisor"))
+
+    def stop(self, timeout: float = 5.0):
+        """SIGTERM every worker, SIGKILL stragglers, then clean up"""
+        self._stopping.set()
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self._children and time.monotonic() < deadline:
+            self._handle_exits()
+            time.sleep(0.05)
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self._children:
+            time.sleep(0.05)
+            self._handle_exits()
+        self.registry.write(self._metrics_path("supervisor"))
+
+        metrics_file = os.getenv('FACTVERSE_METRICS_FILE')
+        if metrics_file:
+            # The totals of every worker, instead of this process's idle registry
+            text = self.aggregate_metrics()
+            with open(metrics_file, 'w', encoding='utf-8') as file:
+                file.write(text)
+            atexit.unregister(get_metrics().write)
+        if self.sock:
+            self.sock.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+    def serve_forever(self):
+        """Start (unless already started), supervise until SIGINT/SIGTERM, stop"""
+        if self.sock is None:
+            self.start()
+
+        def request_stop(signum, frame):
+            self._stopping.set()
+        previous = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            self.supervise()
+        finally:
+            self.stop()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+
+def serve_workers(host: str = "127.0.0.1", port: int = 8080, workers: Optional[int] = None, use_ai: bool = True):
+    """Run the API with pre-forked workers until interrupted"""
+    if not hasattr(os, "fork"):
+        print("❌ Error: --workers needs os.fork (Linux, macOS, Termux); use --serve without it")
+        sys.exit(1)
+    store = get_store()
+    if not store.exists():
+        print("❌ Error: facts.json file not found!")
+        sys.exit(1)
+    supervisor = WorkerSupervisor(workers, host, port, use_ai, store)
+    supervisor.start()
+    mode = "AI + local" if use_ai else "local"
+    print(f"📡 FactVerse API listening on http://{host}:{supervisor.port} ({supervisor.workers} workers, {mode} facts)")
+    print("   GET /facts/{category}[?n=K]   POST /saved   GET /status   GET /metrics", flush=True)
+    supervisor.serve_forever()
+    print("\n👋 FactVerse API stopped.")
@@ -0,0 +1,370 @@
+# fact_writer.py - Batched writer for saved_facts.txt
+# Saves are queued and written by a background thread in batches (by size or
+# interval) as single O_APPEND writes under an advisory lock, so several
+# processes can share the file without interleaving lines. The active file is
+# rotated by size or age into numbered segments (saved_facts.txt.000001, ...)
+# that are compressed in the background
+
+import os
+import re
+import gzip
+import time
+import queue
+import atexit
+import shutil
+import threading
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND alone keeps writes whole
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_SAVED_FILE = "saved_facts.txt"
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+FSYNC_POLICIES = ("never", "batch", "interval")
+COMPRESSIONS = ("gzip", "zstd", "none")
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def format_saved_fact(fact: str, source: str = "DB", timestamp: Optional[str] = None,
+                      category: Optional[str] = None) -> str:
+    """One saved_facts.txt line: [YYYY-MM-DD HH:MM:SS] [AI|DB] fact, or [AI:category] when known"""
+    timestamp = timestamp or time.strftime("%Y-%m-%d %H:%M:%S")
+    tag = f"{source}:{category}" if category else source
+    # Newlines inside a fact would split the record on read-back
+    fact = " ".join(fact.splitlines())
+    return f"[{timestamp}] [{tag}] {fact}\n"
+
+
+# === Segments ===
+def list_segments(path: str = DEFAULT_SAVED_FILE) -> list:
+    """Rotated segments of a saved-facts log as (number, file) pairs, oldest first"""
+    directory, base = os.path.split(os.path.abspath(path))
+    pattern = re.compile(re.escape(base) + r"\.(\d+)(\.gz|\.zst)?$")
+    found = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            number = int(match.group(1))
+            # Mid-compression both copies exist; the plain one is always complete
+            if number not in found or not match.group(2):
+                found[number] = os.path.join(os.path.dirname(path), name)
+    return sorted(found.items())
+
+
+def _segment_file(name: str) -> str:
+    """A segment may have been compressed since it was listed"""
+    if os.path.exists(name):
+        return name
+    for suffix in _SUFFIXES.values():
+        if os.path.exists(name + suffix):
+            return name + suffix
+    raise FileNotFoundError(name)
+
+
+def _open_binary(name: str):
+    if name.endswith(".gz"):
+        return gzip.open(name, 'rb')
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{name} is zstd-compressed; install zstandard to read it")
+        return zstandard.open(name, 'rb')
+    return open(name, 'rb')
+
+
+def _reverse_plain_lines(file, block: int = 1 << 16) -> Iterator[bytes]:
+    """Lines of an uncompressed file from the end, reading backwards a block at a time"""
+    position = file.seek(0, os.SEEK_END)
+    tail = b""
+    while position > 0:
+        step = min(block, position)
+        position -= step
+        file.seek(position)
+        lines = (file.read(step) + tail).split(b"\n")
+        tail = lines.pop(0)
+        for line in reversed(lines):
+            if line:
+                yield line
+    if tail:
+        yield tail
+
+
+def read_segment(name: str, reverse: bool = False) -> Iterator[str]:
+    """
+    Lines (without newlines) of one log file or segment, compressed or not
+    Reversed plain files are read backwards in blocks; a reversed compressed
+    segment is decompressed in memory, which rotation keeps bounded
+    """
+    name = _segment_file(name)
+    with _open_binary(name) as file:
+        if not reverse:
+            lines = (line.rstrip(b"\r\n") for line in file)
+        elif name.endswith(tuple(_SUFFIXES.values())):
+            lines = reversed(file.read().splitlines())
+        else:
+            lines = (line.rstrip(b"\r") for line in _reverse_plain_lines(file))
+        for line in lines:
+            if line:
+                yield line.decode('utf-8', errors='replace')
+
+
+def iter_saved_lines(path: str = DEFAULT_SAVED_FILE, newest_first: bool = True) -> Iterator[str]:
+    """Every saved line across the active file and all segments as one stream"""
+    files = [name for _, name in list_segments(path)]
+    if os.path.exists(path):
+        files.append(path)
+    if newest_first:
+        files.reverse()
+    for name in files:
+        try:
+            yield from read_segment(name, reverse=newest_first)
+        except FileNotFoundError:
+            continue
+
+
+def compress_segment(name: str, compression: str = "gzip") -> str:
+    """Compress a closed segment next to itself and remove the original"""
+    target = name + _SUFFIXES[compression]
+    temporary = f"{target}.{os.getpid()}.tmp"
+    if compression == "zstd":
+        output = zstandard.open(temporary, 'wb')
+    else:
+        output = gzip.open(temporary, 'wb', compresslevel=6)
+    with open(name, 'rb') as source, output:
+        shutil.copyfileobj(source, output, 1 << 20)
+    os.replace(temporary, target)
+    try:
+        os.remove(name)
+    except FileNotFoundError:  # another process compressed it too
+        pass
+    return target
+
+
+class SavedFactWriter:
+    def __init__(self, path: str = DEFAULT_SAVED_FILE, batch_size: int = 64,
+                 flush_interval: float = 0.5, fsync: str = "batch", fsync_interval: float = 5.0,
+                 max_bytes: Optional[int] = DEFAULT_SEGMENT_BYTES, rotate_interval: Optional[float] = None,
+                 compression: Optional[str] = None):
+        """
+        Records are written once batch_size are queued or flush_interval
+        seconds after the first one arrived, whichever is sooner
+        fsync: "never" (leave it to the OS), "batch" (after every write) or
+        "interval" (at most once per fsync_interval seconds)
+        The active file is rotated into a segment once it would exceed
+        max_bytes or its first record is rotate_interval seconds old (None
+        disables either); compression defaults to zstd when installed, else gzip
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        compression = compression or ("zstd" if zstandard else "gzip")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {COMPRESSIONS}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+        self.stats = {"records": 0, "batches": 0, "bytes": 0, "fsyncs": 0, "errors": 0,
+                      "rotations": 0, "compressed": 0}
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._fd = None
+        self._started = (None, None)
+        self._compressor = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="saved-fact-writer", daemon=True)
+        self._thread.start()
+
+    # === Producer side ===
+    def save(self, fact: str, source: str = "DB", timestamp: Optional[str] = None,
+             category: Optional[str] = None):
+        """Queue a fact; returns immediately"""
+        self.write_line(format_saved_fact(fact, source, timestamp, category))
+
+    def write_line(self, line: str):
+        if self._closed:
+            raise RuntimeError("SavedFactWriter is closed")
+        self._queue.put(line)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until everything queued so far is written; False on timeout"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush, stop the writer thread and close the file"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        compressor = self._compressor
+        if compressor is not None:
+            compressor.join(timeout)
+
+    # === Writer thread ===
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            lines, waiters, stop = [], [], False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                lines.append(item)
+                if len(lines) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if lines:
+                self._write_batch("".join(lines).encode('utf-8'), len(lines))
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._close_fd()
+                return
+
+    def _open(self) -> int:
+        if self._fd is None:
+            flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self._fd = os.open(self.path, flags, 0o644)
+        return self._fd
+
+    def _lock(self) -> int:
+        """Open and lock the active file, following rotations done by other processes"""
+        while True:
+            fd = self._open()
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            # Our descriptor points at a file that has since become a segment
+            self._close_fd()
+
+    def _should_rotate(self, fd: int, incoming: int) -> bool:
+        stat = os.fstat(fd)
+        if not stat.st_size:
+            return False
+        if self.max_bytes and stat.st_size + incoming > self.max_bytes:
+            return True
+        if self.rotate_interval:
+            inode, started = self._started
+            if inode != stat.st_ino:
+                # Age comes from the first record's timestamp, so every process agrees
+                started = stat.st_mtime
+                try:
+                    head = os.pread(fd, 21, 0).decode('ascii')
+                    started = time.mktime(time.strptime(head[1:20], "%Y-%m-%d %H:%M:%S"))
+                except (AttributeError, ValueError, UnicodeDecodeError):
+                    pass
+                self._started = (stat.st_ino, started)
+            return time.time() - started >= self.rotate_interval
+        return False
+
+    def _rotate(self) -> int:
+        """Rename the locked active file to the next segment; returns the new active file, locked"""
+        number = max((number for number, _ in list_segments(self.path)), default=0) + 1
+        os.rename(self.path, f"{self.path}.{number:06d}")
+        self.stats["rotations"] += 1
+        self._close_fd()
+        if self.compression != "none":
+            self._start_compressor()
+        return self._lock()
+
+    def _start_compressor(self):
+        if self._compressor is None or not self._compressor.is_alive():
+            self._compressor = threading.Thread(target=self._compress_segments,
+                                                name="saved-fact-compressor", daemon=True)
+            self._compressor.start()
+
+    def _compress_segments(self):
+        """Compress every closed, still-plain segment (including ones left by a crash)"""
+        for _, name in list_segments(self.path):
+            if name.endswith(tuple(_SUFFIXES.values())):
+                continue
+            try:
+                compress_segment(name, self.compression)
+                self.stats["compressed"] += 1
+            except (OSError, EOFError) as e:
+                self.last_error = e
+
+    def _write_batch(self, data: bytes, records: int):
+        try:
+            fd = self._lock()
+            if self._should_rotate(fd, len(data)):
+                fd = self._rotate()
+            try:
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+                if self.fsync == "batch" or (
+                    self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+                ):
+                    os.fsync(fd)
+                    self._last_fsync = time.monotonic()
+                    self.stats["fsyncs"] += 1
+            finally:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            self.stats["records"] += records
+            self.stats["batches"] += 1
+            self.stats["bytes"] += len(data)
+        except OSError as e:
+            self.stats["errors"] += 1
+            self.last_error = e
+            self._close_fd()
+
+    def _close_fd(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+# === Shared instance ===
+_shared_writer = None
+_shared_lock = threading.Lock()
+
+
+def get_writer() -> SavedFactWriter:
+    """Process-wide writer for saved_facts.txt (rotating every 8 MiB), flushed and closed at exit"""
+    global _shared_writer
+    with _shared_lock:
+        if _shared_writer is None:
+            _shared_writer = SavedFactWriter()
+            atexit.register(_shared_writer.close)
+        return _shared_writer
@@ -5,20 +5,61 @@ Made by w7nx_z
 Uses OpenAI API exclusively - no static files
 """
 
-from openai import OpenAI
+import os
 import time
 import sys
-import random
 
-# OpenRouter API Configuration (using OpenAI-compatible client)
-client = OpenAI(
-    api_key="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",
-    base_url="https://openrouter.ai/api/v1"
-)
+from ai_client import get_client, is_configured
+from circuit_breaker import OPEN, backoff_delay, get_breaker
+from fact_batch import clean_fact
+from fact_cache import FactCache
+from fact_dedup import LazyCorpusIndex, NearDuplicateIndex
+from fact_metrics import AI_DUPLICATES, AI_ERRORS, AI_FACT_SECONDS, AI_RETRIES, FACTS_SERVED, get_metrics
+from fact_sampler import FactSampler
+from fact_store import get_store
+from seen_filter import get_seen_filter
 
-# Track generated facts to avoid duplicates
-generated_facts = set()
+# Shared OpenAI-compatible client: OPENAI_API_KEY, OPENAI_BASE_URL (e.g. OpenRouter)
+# and FACTVERSE_AI_MODEL come from the environment; the SDK loads on first request
+client = get_client()
 
+# Track generated facts to avoid near-duplicates (paraphrases included);
+# the index is bounded, and seen_facts remembers exact repeats across sessions
+DUPLICATE_THRESHOLD = float(os.getenv('FACTVERSE_DUP_THRESHOLD', '0.6'))
+generated_facts = NearDuplicateIndex(threshold=DUPLICATE_THRESHOLD, max_entries=5000)
+seen_facts = get_seen_filter()
+
+# The local database gets its own unbounded index so AI restatements of known
+# facts stay rejected however many facts the session evicts from generated_facts.
+# A category is indexed on its first lookup, so importing this stays cheap
+corpus_facts = LazyCorpusIndex(get_store(), threshold=DUPLICATE_THRESHOLD)
+
+# Rotate through each category's prompts instead of picking at random
+prompt_sampler = FactSampler()
+
+# Persistent response cache so a restarted session starts warm
+response_cache = FactCache()
+get_metrics().gauge("factverse_ai_cache_hit_ratio", "AI response cache hit ratio",
+                    lambda: response_cache.stats()["hit_ratio"])
+
+# While the API is failing, skip it and serve local facts instead of waiting on retries
+breaker = get_breaker()
+
+def is_new_fact(category: str, fact: str) -> bool:
+    """Accept a fact only if no session or earlier run has shown it; records it if so"""
+    if (seen_facts.seen(category, fact) or corpus_facts.is_duplicate(category, fact)
+            or not generated_facts.add_if_new(fact)):
+        return False
+    seen_facts.add(category, fact)
+    return True
+
+def get_local_fact(category: str) -> str:
+    """Local database fact, used while the AI circuit is open"""
+    store = get_store()
+    fact = store.random_fact(category, seen_facts) if category in store else None
+    return fact or f"AI is unavailable and there are no local {category} facts. Please try again later."
+
+@AI_FACT_SECONDS.timed
 def generate_ai_fact(category: str, max_retries: int = 3) -> str:
     """
     Generate a unique fact using OpenAI API with retry logic and uniqueness checking
@@ -59,52 +100,69 @@ def generate_ai_fact(category: str, max_retries: int = 3) -> str:
     category_prompts = prompts.get(category, [f"Generate one interesting {category} fact."])
     
     for attempt in range(max_retries):
+        if attempt:
+            AI_RETRIES.inc(category)
         try:
             print(f"🤖 Generating {category} fact... (attempt {attempt + 1})")
             
             # Randomize prompt selection and add uniqueness request
-            selected_prompt = random.choice(category_prompts)
+            selected_prompt = prompt_sampler.choose(category, category_prompts)
             unique_request = f"{selected_prompt} Make it unique and different from common knowledge. Respond in exactly one sentence."
             
-            response = client.chat.completions.create(
-                model="openai/gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a creative fact generator. Always provide fresh, unique, and interesting facts. Never repeat the same information. Be engaging and educational."},
-                    {"role": "user", "content": unique_request}
-                ],
-                max_tokens=80,
-                temperature=0.9,  # Increased for more creativity
-                top_p=0.95,       # Add randomness
-                frequency_penalty=0.5,  # Reduce repetition
-                presence_penalty=0.3    # Encourage new topics
-            )
+            # Reuse a cached answer for this prompt if this session hasn't shown it yet
+            cached, cache_key = response_cache.get_pooled(category, unique_request,
+                                                          lambda fact: is_new_fact(category, fact))
+            if cached:
+                FACTS_SERVED.inc(category, "AI")
+                return cached
             
-            fact = response.choices[0].message.content.strip()
+            if not breaker.allow():
+                print(f"⚡ AI unavailable, serving a local fact (retrying the API in {breaker.retry_in():.0f}s)")
+                FACTS_SERVED.inc(category, "LOCAL")
+                return get_local_fact(category)
+            try:
+                fact = client.complete(
+                    [
+                        {"role": "system", "content": "You are a creative fact generator. Always provide fresh, unique, and interesting facts. Never repeat the same information. Be engaging and educational."},
+                        {"role": "user", "content": unique_request}
+                    ],
+                    max_tokens=80,
+                    temperature=0.9,  # Increased for more creativity
+                    top_p=0.95,       # Add randomness
+                    frequency_penalty=0.5,  # Reduce repetition
+                    presence_penalty=0.3    # Encourage new topics
+                )
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
             
-            # Validate fact is not empty and meaningful
-            if fact and len(fact) > 15:
-                # Clean up quotes if present
-                if fact.startswith('"') and fact.endswith('"'):
-                    fact = fact[1:-1]
-                
-                # Check for uniqueness
-                fact_key = fact.lower().strip()
-                if fact_key not in generated_facts:
-                    generated_facts.add(fact_key)
+            # Validate fact is not empty and meaningful, cleaning up quotes
+            fact = clean_fact(fact)
+            if fact:
+                # Check for uniqueness; only facts that pass are worth caching
+                if is_new_fact(category, fact):
+                    response_cache.put(category, cache_key, fact)
+                    FACTS_SERVED.inc(category, "AI")
                     return fact
                 else:
+                    AI_DUPLICATES.inc(category)
                     print(f"🔄 Duplicate fact detected, generating new one...")
                     continue
             else:
                 print(f"⚠️ Empty or invalid fact received, retrying...")
                 
         except Exception as e:
+            AI_ERRORS.inc()
             print(f"🔥 API Error (attempt {attempt + 1}): {str(e)}")
-            if attempt < max_retries - 1:
-                print("🔄 Retrying in 2 seconds...")
-                time.sleep(2)
+            # No wait once the breaker has opened; the next attempt short-circuits
+            if attempt < max_retries - 1 and breaker.state != OPEN:
+                delay = backoff_delay(attempt)
+                print(f"🔄 Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
     
     # If all retries failed, return error message
+    FACTS_SERVED.inc(category, "ERROR")
     return f"Failed to generate unique {category} fact after {max_retries} attempts. Please try again."
 
 def show_banner():
@@ -135,6 +193,10 @@ def get_category_name(choice: str) -> str:
 
 def main():
     """Main application loop"""
+    if not is_configured():
+        print("🔒 AI Mode: DISABLED (set OPENAI_API_KEY and install openai)")
+        print("💡 Tip: point OPENAI_BASE_URL at any OpenAI-compatible endpoint, e.g. https://openrouter.ai/api/v1")
+        sys.exit(1)
     show_banner()
     
     while True:
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# fake_ai_server.py - Offline OpenAI-compatible stand-in for FactVerse
+# Answers chat completions on localhost with configurable latency, server
+# errors, 429 rate limiting, duplicate and malformed answers, so the AI paths
+# can be load-tested without a provider. Seeded runs are reproducible
+#
+#   POST /v1/chat/completions    -> one fact (or a JSON array for batch prompts)
+#   GET  /v1/models              -> the fake model
+#   GET  /stats                  -> what was served so far
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+FAKE_MODEL = "factverse-fake"
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            429: "Too Many Requests", 500: "Internal Server Error"}
+_BATCH_COUNT = re.compile(r"Give (\d+) different facts")
+_TOPICS = ("hacking", "fun", "attitude", "lazy", "motivation")
+
+_ADJECTIVES = ("tiny", "ancient", "sleepy", "electric", "stubborn", "curious", "invisible", "polite",
+               "frozen", "gigantic", "noisy", "patient")
+_SUBJECTS = ("octopus", "honeybee", "glacier", "router", "pianist", "comet", "librarian", "tardigrade",
+             "volcano", "compiler", "hedgehog", "satellite", "sloth", "lighthouse", "firewall", "cactus")
+_VERBS = ("can outlast", "quietly rewires", "was once mistaken for", "hums louder than", "remembers",
+          "doubles the speed of", "is older than", "outnumbers", "can be powered by", "secretly inspired")
+_OBJECTS = ("every pyramid in Egypt", "a thousand sleeping cats", "the first email ever sent",
+            "most desert sunsets", "an entire marathon", "the moon's slow wobble", "old dial-up modems",
+            "a spoonful of neutron star", "seventeen library cards", "the loudest thunderstorm on record")
+_LINKS = ("while", "because", "and yet", "just as", "even though", "so")
+_MALFORMED = ("", "Sure!", "Here is a fact:", "```", "I'm sorry, I can't help with that.")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency distribution from a spec in milliseconds; returns rng -> seconds
+    fixed:MS  uniform:LOW,HIGH  exponential:MEAN  lognormal:MEDIAN,SIGMA
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(value) for value in args.split(",")] if args else []
+    except ValueError:
+        raise ValueError(f"Bad latency spec: {spec}")
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(*values) / 1000
+    if kind == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) / 1000 if values[0] else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+    raise ValueError(f"Bad latency spec: {spec} (fixed:MS, uniform:LOW,HIGH, exponential:MEAN, lognormal:MEDIAN,SIGMA)")
+
+
+class FakeAIServer:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 max_rps: Optional[float] = None, duplicate_rate: float = 0.0, malformed_rate: float = 0.0,
+                 seed: Optional[int] = None, retry_after: float = 1.0):
+        """
+        Rates are per-request probabilities. Requests beyond max_rps in one
+        second are also answered 429 with a Retry-After of retry_after seconds
+        With a seed, the same request sequence gets the same answers
+        """
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rps = max_rps
+        self.duplicate_rate = duplicate_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0,
+                      "duplicates": 0, "malformed": 0, "facts": 0}
+        self._served = deque(maxlen=100)  # recent facts, the pool duplicates come from
+        self._window = (0, 0)  # (second, requests in it) for max_rps
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    # === Answers ===
+    def new_fact(self, prompt: str) -> str:
+        topic = next((topic for topic in _TOPICS if topic in prompt.lower()), "trivia")
+        self.stats["facts"] += 1
+        rng = self.rng
+        # Two random clauses: enough variety that fresh facts are rarely near-duplicates
+        clauses = [f"a {rng.choice(_ADJECTIVES)} {rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+                   for _ in range(2)]
+        return f"Fake {topic} fact {self.stats['facts']}: {clauses[0]} {rng.choice(_LINKS)} {clauses[1]}."
+
+    def _fact(self, prompt: str) -> str:
+        if self._served and self.rng.random() < self.duplicate_rate:
+            self.stats["duplicates"] += 1
+            return self.rng.choice(self._served)
+        fact = self.new_fact(prompt)
+        self._served.append(fact)
+        return fact
+
+    def answer(self, prompt: str) -> str:
+        """Message content for one prompt: a sentence, or a JSON array when a batch is asked for"""
+        match = _BATCH_COUNT.search(prompt)
+        count = int(match.group(1)) if match else 1
+        facts = [self._fact(prompt) for _ in range(count)]
+        malformed = self.rng.random() < self.malformed_rate
+        if malformed:
+            self.stats["malformed"] += 1
+        if not match:
+            return self.rng.choice(_MALFORMED) if malformed else facts[0]
+        answer = json.dumps(facts)
+        # Cut off mid-array, like a completion that ran out of tokens
+        return answer[:len(answer) // 2] if malformed else answer
+
+    def _rate_limited(self) -> bool:
+        if self.rng.random() < self.rate_limit_rate:
+            return True
+        if self.max_rps is None:
+            return False
+        second = int(time.monotonic())
+        started, count = self._window
+        count = count + 1 if second == started else 1
+        self._window = (second, count)
+        return count > self.max_rps
+
+    async def completion(self, request: dict) -> tuple:
+        """(status, payload, extra headers) for one chat completion request"""
+        if request.get("stream"):
+            return 400, {"error": {"message": "Streaming is not supported by the fake server",
+                                   "type": "invalid_request_error"}}, {}
+        if self._rate_limited():
+            self.stats["rate_limited"] += 1
+            return 429, {"error": {"message": "Rate limit reached (fake server)", "type": "requests",
+                                   "code": "rate_limit_exceeded"}}, {"Retry-After": f"{self.retry_after:g}"}
+        # Every random draw happens before the sleep, so a seeded run doesn't
+        # depend on which of several concurrent requests wakes up first
+        delay = max(0.0, self.latency(self.rng))
+        failed = self.rng.random() < self.error_rate
+        messages = request.get("messages") or [{}]
+        prompt = str(messages[-1].get("content", ""))
+        content = None if failed else self.answer(prompt)
+        serial = self.stats["requests"]
+        await asyncio.sleep(delay)
+        if failed:
+            self.stats["errors"] += 1
+            return 500, {"error": {"message": "The server had an error (fake server)", "type": "server_error"}}, {}
+
+        self.stats["ok"] += 1
+        return 200, {
+            "id": f"chatcmpl-fake-{serial}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", FAKE_MODEL),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                      "total_tokens": len(prompt.split()) + len(content.split())}
+        }, {}
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        path = urlsplit(target).path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            if method != "POST":
+                return 405, {"error": {"message": "Use POST", "type": "invalid_request_error"}}, {}
+            self.stats["requests"] += 1
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": {"message": "Body is not JSON", "type": "invalid_request_error"}}, {}
+            return await self.completion(request)
+        if path.endswith("/models"):
+            return 200, {"object": "list", "data": [{"id": FAKE_MODEL, "object": "model", "owned_by": "factverse"}]}, {}
+        if path == "/stats":
+            return 200, dict(self.stats, latency=self.latency_spec), {}
+        return 404, {"error": {"message": f"No route for {path or '/'}", "type": "invalid_request_error"}}, {}
+
+    # === HTTP plumbing ===
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection (HTTP/1.1 keep-alive, like the real APIs)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": {"message": "Malformed request line"}}, {}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip().lower()
+                try:
+                    body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                connection = headers.get("connection", "")
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                try:
+                    code, payload, extra = await self.dispatch(method, target, body)
+                except Exception as e:
+                    code, payload, extra = 500, {"error": {"message": str(e), "type": "server_error"}}, {}
+                await self._respond(writer, code, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, code: int, payload: dict, extra: dict, keep_alive: bool):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {code} {_REASONS.get(code, 'OK')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        head += "".join(f"{name}: {value}\r\n" for name, value in extra.items())
+        writer.write((head + "\r\n").encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8400):
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> Optional[int]:
+        if not self._server or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def base_url(self) -> str:
+        """The value for OPENAI_BASE_URL"""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8400):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    # === Background mode (tests, benchmarks, load tests) ===
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a daemon thread with its own event loop; returns base_url"""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-ai-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def close(self):
+        if self._loop is not None:
+            async def shutdown():
+                self._server.close()
+                # Kept-alive connections would otherwise outlive the loop
+                connections = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+                for task in connections:
+                    task.cancel()
+                await asyncio.gather(*connections, return_exceptions=True)
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+        elif self._server:
+            self._server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in for FactVerse load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--latency", default="lognormal:300,0.5",
+                        help="fixed:MS, uniform:LOW,HIGH, exponential:MEAN or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429")
+    parser.add_argument("--max-rps", type=float, default=None, help="429 every request past this many per second")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--duplicate", type=float, default=0.0, help="probability an answer repeats a recent one")
+    parser.add_argument("--malformed", type=float, default=0.0, help="probability of an unusable answer")
+    parser.add_argument("--seed", type=int, default=None, help="make the answer sequence reproducible")
+    args = parser.parse_args(argv)
+
+    try:
+        server = FakeAIServer(args.latency, args.error_rate, args.rate_limit, args.max_rps,
+                              args.duplicate, args.malformed, args.seed, args.retry_after)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 2
+    print(f"🧪 Fake AI server on http://{args.host}:{args.port}/v1 (latency {args.latency})")
+    print(f"   export OPENAI_BASE_URL=http://{args.host}:{args.port}/v1 OPENAI_API_KEY=fake")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n👋 Fake AI server stopped. {json.dumps(server.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
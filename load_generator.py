@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# load_generator.py - Concurrent-session load generator for FactVerse
+# Virtual users replay the terminal workflow (pick a category, "Get Another"
+# a few times, save some facts) against the HTTP API or in-process, with a
+# closed loop (N users, think time) or an open loop (sessions arriving at a
+# fixed rate), and report p50/p95/p99 latency, throughput and errors over time
+
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import quote, urlsplit
+
+DEFAULT_CATEGORIES = ("hacking", "fun", "attitude", "lazy", "motivation")
+OPERATIONS = ("fact", "save")
+
+
+def percentile(values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values (None when empty)"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+# === Targets ===
+class HTTPTarget:
+    """The --serve API; one keep-alive connection per virtual user thread"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, use_ai: bool = True):
+        url = urlsplit(base_url if "://" in base_url else f"http://{base_url}")
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.query = "" if use_ai else "?source=local"
+        self.name = f"http://{self.host}:{self.port}"
+        self._local = threading.local()
+
+    def _request(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            payload = json.dumps(body) if body is not None else None
+            conn.request(method, path, payload, {"Content-Type": "application/json"} if payload else {})
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.status >= 400:
+            raise RuntimeError(f"HTTP {response.status} for {method} {path}")
+        return json.loads(data)
+
+    def categories(self) -> list:
+        try:
+            return self._request("GET", "/status").get("categories") or list(DEFAULT_CATEGORIES)
+        except (OSError, RuntimeError, ValueError, http.client.HTTPException):
+            return list(DEFAULT_CATEGORIES)
+
+    def get_fact(self, category: str) -> tuple:
+        answer = self._request("GET", f"/facts/{quote(category)}{self.query}")
+        return answer["fact"], answer["source"]
+
+    def save(self, fact: str, source: str, category: str):
+        self._request("POST", "/saved", {"fact": fact, "source": source, "category": category})
+
+
+class LocalTarget:
+    """The terminal app's code path (generator + batched writer) without the terminal"""
+
+    def __init__(self, generator=None, writer=None, store=None):
+        from fact_store import get_store
+        from fact_writer import SavedFactWriter
+        self.store = store or get_store()
+        self.generator = generator
+        # Saves go to a scratch file unless a writer is given, not the user's saved_facts.txt
+        self.writer = writer or SavedFactWriter(f"{tempfile.mkdtemp(prefix='factverse-load-')}/saved_facts.txt",
+                                                fsync="never")
+        self.name = "in-process" + (" (AI + local)" if generator and generator.openai_available else " (local)")
+
+    def categories(self) -> list:
+        return self.store.categories() or list(DEFAULT_CATEGORIES)
+
+    def get_fact(self, category: str) -> tuple:
+        if self.generator is not None:
+            return self.generator.generate_fact(category)
+        fact = self.store.random_fact(category)
+        if fact is None:
+            raise RuntimeError(f"No facts for {category}")
+        return fact, "LOCAL"
+
+    def save(self, fact: str, source: str, category: str):
+        self.writer.save(fact, "AI" if source == "AI" else "DB", category=category)
+
+
+# === Results ===
+class LoadResults:
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.samples = []  # (seconds since start, operation, latency seconds, ok); list.append is atomic
+        self.sessions = 0
+        self.sessions_dropped = 0
+
+    def record(self, operation: str, latency: float, ok: bool):
+        self.samples.append((time.perf_counter() - self.started, operation, latency, ok))
+
+    @staticmethod
+    def summarize(samples: list, seconds: float) -> dict:
+        latencies = sorted(latency for _, _, latency, _ in samples)
+        errors = sum(not ok for *_, ok in samples)
+
+        def ms(pct):
+            value = percentile(latencies, pct)
+            return round(value * 1000, 3) if value is not None else None
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "throughput_rps": round(len(samples) / seconds, 2) if seconds > 0 else 0.0,
+            "p50_ms": ms(50), "p95_ms": ms(95), "p99_ms": ms(99)
+        }
+
+    def windows(self, until: Optional[float] = None, first: int = 0, operations=("all",) + OPERATIONS) -> list:
+        """One row per interval and operation, for windows first.. up to until seconds"""
+        samples = list(self.samples)
+        end = until if until is not None else max((t for t, *_ in samples), default=0.0)
+        count = int(math.ceil(end / self.interval - 1e-9))
+        buckets = [[] for _ in range(max(0, count - first))]
+        for sample in samples:
+            index = int(sample[0] / self.interval) - first
+            if 0 <= index < len(buckets):
+                buckets[index].append(sample)
+        rows = []
+        for index, window in enumerate(buckets, first):
+            for operation in operations:
+                picked = window if operation == "all" else [sample for sample in window if sample[1] == operation]
+                rows.append(dict(window_start_s=round(index * self.interval, 3), operation=operation,
+                                 **self.summarize(picked, self.interval)))
+        return rows
+
+    def summary(self, elapsed: float) -> dict:
+        samples = list(self.samples)
+        summary = {operation: self.summarize([s for s in samples if s[1] == operation], elapsed)
+                   for operation in OPERATIONS}
+        summary["all"] = self.summarize(samples, elapsed)
+        summary["sessions"] = self.sessions
+        summary["sessions_dropped"] = self.sessions_dropped
+        summary["elapsed_s"] = round(elapsed, 3)
+        return summary
+
+
+# === Virtual users ===
+class LoadGenerator:
+    def __init__(self, target, users: int = 10, rate: Optional[float] = None, duration: float = 30.0,
+                 think_ms: float = 500.0, gets: float = 3.0, save_rate: float = 0.3,
+                 interval: float = 1.0, seed: Optional[int] = None):
+        """
+        Closed loop (rate=None): users virtual users each run sessions back to
+        back. Open loop: sessions arrive as a Poisson process of rate per
+        second, with at most users running at once (later arrivals wait, and
+        their wait counts toward their first request's latency)
+        A session draws facts 1 + Geometric(gets - 1) times on average gets,
+        saving each with probability save_rate, with exponential think time
+        """
+        self.target = target
+        self.users = users
+        self.rate = rate
+        self.duration = duration
+        self.think = think_ms / 1000
+        self.gets = gets
+        self.save_rate = save_rate
+        self.seed = seed
+        self.results = LoadResults(interval)
+        self.categories = target.categories()
+        self._stop = threading.Event()
+        self._rng_lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def _session_rng(self) -> random.Random:
+        """An independent stream per session, derived from the seed"""
+        with self._rng_lock:
+            return random.Random(self._rng.random())
+
+    def _timed(self, operation: str, func, *args, started: Optional[float] = None):
+        started = started if started is not None else time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception:
+            self.results.record(operation, time.perf_counter() - started, False)
+            return None
+        self.results.record(operation, time.perf_counter() - started, True)
+        return result
+
+    def _pause(self, rng: random.Random):
+        if self.think > 0:
+            self._stop.wait(rng.expovariate(1 / self.think))
+
+    def run_session(self, arrived: Optional[float] = None):
+        """One user visit: pick a category, draw a few facts, save some of them"""
+        rng = self._session_rng()
+        with self._rng_lock:
+            self.results.sessions += 1
+        category = rng.choice(self.categories)
+        draws = 1
+        while self.gets > 1 and rng.random() < 1 - 1 / self.gets:
+            draws += 1
+        for draw in range(draws):
+            if self._stop.is_set():
+                return
+            answer = self._timed("fact", self.target.get_fact, category, started=arrived if draw == 0 else None)
+            if answer and rng.random() < self.save_rate:
+                self._timed("save", self.target.save, answer[0], answer[1], category)
+            self._pause(rng)
+
+    def _closed_loop_user(self):
+        while not self._stop.is_set():
+            self.run_session()
+
+    def _open_loop(self, executor: ThreadPoolExecutor):
+        rng = self._session_rng()
+        inflight = threading.Semaphore(self.users * 10)  # backlog bound so an overloaded run can't exhaust memory
+        next_arrival = time.perf_counter()
+        while not self._stop.is_set():
+            next_arrival += rng.expovariate(self.rate)
+            delay = next_arrival - time.perf_counter()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            if not inflight.acquire(blocking=False):
+                self.results.sessions_dropped += 1
+                continue
+            future = executor.submit(self.run_session, next_arrival)
+            future.add_done_callback(lambda _: inflight.release())
+
+    def run(self, progress=None) -> dict:
+        """Drive load for duration seconds; progress(row) gets each finished window's "all" row"""
+        self.results = LoadResults(self.results.interval)
+        self._stop.clear()
+        executor = ThreadPoolExecutor(max_workers=self.users, thread_name_prefix="virtual-user")
+        if self.rate is None:
+            for _ in range(self.users):
+                executor.submit(self._closed_loop_user)
+        else:
+            threading.Thread(target=self._open_loop, args=(executor,), name="load-arrivals", daemon=True).start()
+
+        reported = 0
+        deadline = self.results.started + self.duration
+        while time.perf_counter() < deadline:
+            time.sleep(min(self.results.interval, max(0.0, deadline - time.perf_counter())))
+            finished = int((time.perf_counter() - self.results.started) / self.results.interval)
+            if progress and finished > reported:
+                for row in self.results.windows(finished * self.results.interval, reported, ("all",)):
+                    progress(row)
+                reported = finished
+        self._stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Measured after in-flight requests finish, so every sample falls in a window
+        elapsed = time.perf_counter() - self.results.started
+        return {
+            "config": {
+                "target": self.target.name,
+                "mode": "closed" if self.rate is None else "open",
+                "users": self.users,
+                "rate": self.rate,
+                "duration_s": self.duration,
+                "think_ms": self.think * 1000,
+                "gets": self.gets,
+                "save_rate": self.save_rate,
+                "seed": self.seed
+            },
+            "summary": self.results.summary(elapsed),
+            "windows": self.results.windows(until=elapsed)
+        }
+
+
+def write_csv(report: dict, path: str):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=list(report["windows"][0]) if report["windows"] else ["window_start_s"])
+        writer.writeheader()
+        writer.writerows(report["windows"])
+
+
+def write_json(report: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def format_row(label: str, row: dict) -> str:
+    def ms(value):
+        return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+    return (f"{label:>8} | {row['throughput_rps']:>8.1f} | {row['error_rate']:>6.1%} | "
+            f"{ms(row['p50_ms'])} | {ms(row['p95_ms'])} | {ms(row['p99_ms'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FactVerse concurrent-session load generator")
+    parser.add_argument("target", help="API base URL (python main.py --serve), or 'local' to run in-process")
+    parser.add_argument("-u", "--users", type=int, default=10, help="virtual users (open loop: max concurrent)")
+    parser.add_argument("-r", "--rate", type=float, default=None, help="open loop: new sessions per second")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean think time between actions")
+    parser.add_argument("--gets", type=float, default=3.0, help="mean facts drawn per session (Get Another)")
+    parser.add_argument("--save-rate", type=float, default=0.3, help="share of facts saved")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds per reporting window")
+    parser.add_argument("--no-ai", action="store_true", help="local facts only")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--csv", metavar="PATH", help="write per-window rows as CSV")
+    parser.add_argument("--json", metavar="PATH", help="write config, summary and windows as JSON")
+    args = parser.parse_args(argv)
+
+    if args.target == "local":
+        from fact_store import get_store
+        if not get_store().exists():
+            print("❌ Error: facts.json file not found!")
+            return 1
+        generator = None
+        if not args.no_ai:
+            from fact_ai_generator import AIFactGenerator
+            generator = AIFactGenerator(prefetch_workers=0)
+        target = LocalTarget(generator)
+    else:
+        target = HTTPTarget(args.target, use_ai=not args.no_ai)
+
+    load = LoadGenerator(target, args.users, args.rate, args.duration, args.think_ms, args.gets,
+                         args.save_rate, args.interval, args.seed)
+    mode = f"open loop, {args.rate:g} sessions/s" if args.rate else f"closed loop, {args.users} users"
+    print(f"📈 Load test against {target.name} ({mode}) for {args.duration:g}s")
+    print(f"{'window':>8} | {'req/s':>8} | {'errors':>6} | {'p50 ms':>9} | {'p95 ms':>9} | {'p99 ms':>9}")
+    report = load.run(progress=lambda row: print(format_row(f"{row['window_start_s']:.1f}s", row)))
+
+    summary = report["summary"]
+    print("-" * 64)
+    print(format_row("total", summary["all"]))
+    for operation in OPERATIONS:
+        print(f"   {operation}: {summary[operation]['requests']} requests, p99 {summary[operation]['p99_ms']} ms")
+    print(f"📊 {summary['sessions']} sessions, {summary['sessions_dropped']} dropped")
+    if args.csv:
+        write_csv(report, args.csv)
+        print(f"💾 Windows written to {args.csv}")
+    if args.json:
+        write_json(report, args.json)
+        print(f"💾 Report written to {args.json}")
+    if isinstance(target, LocalTarget):
+        target.writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,13 @@ Made by w7nx_z
 Version 2.0 with AI Integration
 """
 
-import json
-import random
 import os
 import sys
 import time
+import argparse
+
+LAUNCHED_AT = time.perf_counter()  # time-to-first-menu is measured from here
+AI_DEADLINE_MS = int(os.getenv('FACTVERSE_AI_DEADLINE_MS', '2500'))  # longest wait for an AI fact
 
 # AI Integration
 try:
@@ -18,10 +20,18 @@ try:
 except ImportError:
     AI_AVAILABLE = False
 
+from fact_metrics import FACTS_SERVED, LOCAL_FACT_SECONDS, SAVE_FACT_SECONDS
+from fact_store import get_store
+from fact_writer import DEFAULT_SAVED_FILE, get_writer, list_segments
+from seen_filter import get_seen_filter
+from startup import StartupTasks
+from terminal_renderer import typing_animation
+
 class FactVerse:
     def __init__(self):
-        """Initialize FactVerse with AI capabilities"""
+        """Initialize FactVerse; the slow setup runs in the background during the banner"""
         self.facts = self.load_facts()
+        self.seen = None
         self.categories = {
             '1': 'hacking',
             '2': 'fun',
@@ -37,61 +47,60 @@ class FactVerse:
             'motivation': '🚀 Motivation Doses'
         }
         
-        # Initialize AI if available
+        # AI is set up by the startup tasks if available
         self.ai_generator = None
         self.ai_mode = False
+        self.startup = StartupTasks([
+            ("facts", self.facts.counts),
+            ("seen", self.load_seen_filter),
+            ("ai", self.init_ai)
+        ]).start()
+    
+    def load_seen_filter(self):
+        self.seen = get_seen_filter()
+    
+    def init_ai(self):
+        """Build the AI generator (imports the OpenAI client)"""
         if AI_AVAILABLE:
             try:
                 self.ai_generator = AIFactGenerator()
                 if self.ai_generator.openai_available:
                     self.ai_mode = True
-            except:
-                pass  # Silent fallback to local facts
+            except Exception:
+                self.ai_generator = None  # Silent fallback to local facts
     
     def load_facts(self):
-        """Load facts from JSON file"""
-        try:
-            with open('facts.json', 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
+        """Get the shared fact store (parsed lazily, once per process)"""
+        store = get_store()
+        if not store.exists():
             print("❌ Error: facts.json file not found!")
             sys.exit(1)
+        store.start_watching()  # pick up facts.json edits without a restart
+        return store  # parsed by the startup tasks
     
-    def typing_animation(self, text, delay=0.02):
-        """Simulate typing animation"""
-        for char in text:
-            print(char, end='', flush=True)
-            time.sleep(delay)
-        print()
-    
-    def show_progress_bar(self, duration=1.5):
-        """Show loading progress bar"""
-        print("[ Loading tool... ] ", end='', flush=True)
+    def show_progress_bar(self):
+        """Show loading progress as the startup tasks actually finish"""
         bar_length = 20
-        for i in range(bar_length + 1):
-            percent = int((i / bar_length) * 100)
-            filled = '█' * i
-            empty = '▒' * (bar_length - i)
-            print(f'\\r[ Loading tool... ] {filled}{empty} {percent}%', end='', flush=True)
-            time.sleep(duration / bar_length)
+        total = len(self.startup.tasks)
+        completed = -1
+        while completed < total:
+            completed = self.startup.wait_for_progress(completed)
+            filled = completed * bar_length // total
+            percent = completed * 100 // total
+            print(f'\r[ Loading tool... ] {"█" * filled}{"▒" * (bar_length - filled)} {percent}%', end='', flush=True)
         print()
+        for task, error in self.startup.errors.items():
+            print(f"⚠️ Warning: startup task '{task}' failed: {error}")
     
     def show_banner(self):
-        """Display hacker-style startup banner"""
+        """Display hacker-style startup banner (paced by the startup work, not fixed sleeps)"""
         print("🟢 Initializing... ⏳")
-        time.sleep(0.5)
+        self.startup.wait(0.5)
         print("🔐 Launching: FactVerse – AI-Enhanced Fact Generator")
-        time.sleep(0.5)
+        self.startup.wait(0.5)
         print("👨‍💻 Creator: w7nx_z")
-        time.sleep(0.5)
+        self.startup.wait(0.5)
         print("🧬 Terminal Interface Active...")
-        
-        # Show AI status
-        if self.ai_mode:
-            print("🤖 AI Fact Generator: ONLINE")
-        else:
-            print("📚 Local Fact Database: ACTIVE")
-        
         print()
         
         # Show ASCII banner
@@ -107,6 +116,12 @@ class FactVerse:
         
         print()
         self.show_progress_bar()
+        
+        # Show AI status
+        if self.ai_mode:
+            print("🤖 AI Fact Generator: ONLINE")
+        else:
+            print("📚 Local Fact Database: ACTIVE")
         print()
     
     def show_menu(self):
@@ -133,14 +148,19 @@ class FactVerse:
         # Try AI first if enabled
         if self.ai_mode and self.ai_generator:
             try:
-                fact, source = self.ai_generator.generate_fact(category, prefer_ai=True)
+                fact, source = self.ai_generator.generate_fact(category, prefer_ai=True,
+                                                               deadline_ms=AI_DEADLINE_MS)
                 return fact, source
             except:
                 pass  # Fallback to local
         
         # Use local facts
         if category in self.facts:
-            return random.choice(self.facts[category]), "LOCAL"
+            with LOCAL_FACT_SECONDS.time():
+                fact = self.facts.random_fact(category, self.seen)
+            FACTS_SERVED.inc(category, "LOCAL")
+            return fact, "LOCAL"
+        FACTS_SERVED.inc(category, "ERROR")
         return "No facts available.", "ERROR"
     
     def show_fact(self, category_key):
@@ -152,16 +172,16 @@ class FactVerse:
         time.sleep(0.5)
         
         if self.ai_mode:
-            self.typing_animation(f"[🤖] Generating AI fact for: {category_display}...")
+            typing_animation(f"[🤖] Generating AI fact for: {category_display}...")
         else:
-            self.typing_animation(f"[🧠] Fetching random entry from: {category_display}...")
+            typing_animation(f"[🧠] Fetching random entry from: {category_display}...")
         print()
         
         fact, source = self.get_fact(category_key)
         
         print("📄 Terminal Output:")
         print(">> ", end='')
-        self.typing_animation(f'"{fact}"', delay=0.015)
+        typing_animation(f'"{fact}"', delay=0.015)
         
         # Show source
         if source == "AI":
@@ -173,13 +193,11 @@ class FactVerse:
         print()
         return fact, source
     
-    def save_fact(self, fact, source):
-        """Save fact to file with source tag"""
+    def save_fact(self, fact, source, category=None):
+        """Queue fact for the batched saved_facts.txt writer with source and category tag"""
         try:
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            source_tag = "[AI]" if source == "AI" else "[DB]"
-            with open("saved_facts.txt", 'a', encoding='utf-8') as file:
-                file.write(f"[{timestamp}] {source_tag} {fact}\\n")
+            with SAVE_FACT_SECONDS.time():
+                get_writer().save(fact, "AI" if source == "AI" else "DB", category=category)
             print("✅ Fact saved successfully!")
         except Exception as e:
             print(f"❌ Error saving fact: {e}")
@@ -201,6 +219,7 @@ class FactVerse:
         print("📴 Disconnecting from FactVerse Terminal...")
         time.sleep(0.5)
         print("💾 Saving session data...")
+        get_writer().flush()
         time.sleep(0.5)
         print("🔒 Encrypting your activity logs...")
         time.sleep(0.5)
@@ -223,7 +242,10 @@ class FactVerse:
         print()
         print("✅ Logout successful.")
         print()
-        if os.path.exists("saved_facts.txt"):
+        segments = list_segments(DEFAULT_SAVED_FILE)
+        if segments:
+            print(f"📁 Your saved facts are in: saved_facts.txt (+{len(segments)} archived segments)")
+        elif os.path.exists(DEFAULT_SAVED_FILE):
             print("📁 Your saved facts are in: saved_facts.txt")
         print("🕶️ Stay anonymous, stay curious.")
         print("👋 Goodbye, hacker.")
@@ -236,6 +258,9 @@ class FactVerse:
         """Main application loop"""
         # Show startup
         self.show_banner()
+        print(f"⚡ Ready in {time.perf_counter() - LAUNCHED_AT:.2f}s "
+              f"(startup work {self.startup.elapsed:.2f}s)")
+        print()
         
         while True:
             self.show_menu()
@@ -264,7 +289,7 @@ class FactVerse:
                 save_choice = input("💾 Save this fact to `saved_facts.txt`? [Y/n]: ").lower()
                 
                 if save_choice in ['y', 'yes', '']:
-                    self.save_fact(fact, source)
+                    self.save_fact(fact, source, self.categories[choice])
                 print()
                 
                 # Fact action loop
@@ -279,7 +304,7 @@ class FactVerse:
                         save_choice = input("💾 Save this fact to `saved_facts.txt`? [Y/n]: ").lower()
                         
                         if save_choice in ['y', 'yes', '']:
-                            self.save_fact(fact, source)
+                            self.save_fact(fact, source, self.categories[choice])
                         print()
                     elif action == '2':
                         self.clear_screen()
@@ -297,6 +322,47 @@ class FactVerse:
 
 def main():
     """Entry point"""
+    parser = argparse.ArgumentParser(description="FactVerse - AI-Enhanced Hacker-Style Fact Generator")
+    parser.add_argument("--serve", action="store_true", help="serve facts over HTTP instead of the terminal UI")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on with --serve")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on with --serve")
+    parser.add_argument("--no-ai", action="store_true", help="local facts only (with --serve or generate)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="pre-forked worker processes for --serve sharing one corpus (0 = one per CPU)")
+    commands = parser.add_subparsers(dest="command")
+    bulk = commands.add_parser("generate", help="write facts as JSONL without the terminal UI")
+    bulk.add_argument("category", help="category name, or 'all' to cycle through every category")
+    bulk.add_argument("-n", "--count", type=int, default=10, help="number of facts")
+    bulk.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    bulk.add_argument("-p", "--parallel", type=int, default=8, help="concurrent AI requests")
+    bulk.add_argument("--batch", action="store_true", help="ask the AI for several facts per request")
+    args = parser.parse_args()
+    
+    if args.serve:
+        if args.workers != 1:
+            from fact_workers import serve_workers
+            serve_workers(args.host, args.port, args.workers or None, use_ai=not args.no_ai)
+            return
+        from fact_server import serve
+        serve(args.host, args.port, use_ai=not args.no_ai)
+        return
+    
+    if args.command == "generate":
+        from fact_bulk import generate
+        if not get_store().exists():
+            print("❌ Error: facts.json file not found!", file=sys.stderr)
+            sys.exit(1)
+        # The bulk runner is already concurrent, so no background prefetch
+        generator = AIFactGenerator(prefetch_workers=0, batch=args.batch) if AI_AVAILABLE and not args.no_ai else None
+        try:
+            summary = generate(args.category, args.count, args.output, args.parallel, generator)
+        except ValueError as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sources = ", ".join(f"{source}: {n}" for source, n in summary["sources"].items())
+        print(f"✅ {summary['count']} facts in {summary['elapsed_s']}s ({sources})", file=sys.stderr)
+        return
+    
     try:
         app = FactVerse()
         app.run()
@@ -4,27 +4,24 @@ FactVerse - AI-Enhanced Hacker-Style Fact Generator
 Made by w7nx_z
 """
 
-import json
-import random
 import os
 import sys
 import time
 
+from fact_metrics import FACTS_SERVED, LOCAL_FACT_SECONDS, SAVE_FACT_SECONDS
+from fact_store import get_store
+from fact_writer import get_writer
+from seen_filter import get_seen_filter
+from terminal_renderer import typing_animation
+
 def load_facts():
-    """Load facts from JSON file"""
-    try:
-        with open('facts.json', 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
+    """Get the shared fact store (parsed lazily, once per process)"""
+    store = get_store()
+    if not store.exists():
         print("❌ Error: facts.json file not found!")
         sys.exit(1)
-
-def typing_animation(text, delay=0.02):
-    """Simulate typing animation"""
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
+    store.start_watching()  # pick up facts.json edits without a restart
+    return store
 
 def show_banner():
     """Display hacker-style banner"""
@@ -74,7 +71,11 @@ def get_random_fact(facts, category):
     
     category_key = categories.get(category)
     if category_key and category_key in facts:
-        return random.choice(facts[category_key]), category_key
+        with LOCAL_FACT_SECONDS.time():
+            fact = facts.random_fact(category_key, get_seen_filter())
+        FACTS_SERVED.inc(category_key, "LOCAL")
+        return fact, category_key
+    FACTS_SERVED.inc(category_key or "unknown", "ERROR")
     return "No facts available.", "unknown"
 
 def show_fact(fact, category):
@@ -99,12 +100,11 @@ def show_fact(fact, category):
     print("-" * 60)
     print()
 
-def save_fact(fact):
-    """Save fact to file"""
+def save_fact(fact, category=None):
+    """Queue fact for the batched saved_facts.txt writer"""
     try:
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        with open("saved_facts.txt", 'a', encoding='utf-8') as file:
-            file.write(f"[{timestamp}] [DB] {fact}\n")
+        with SAVE_FACT_SECONDS.time():
+            get_writer().save(fact, "DB", category=category)
         print("✅ Fact saved successfully!")
     except Exception as e:
         print(f"❌ Error saving fact: {e}")
@@ -114,6 +114,7 @@ def show_exit():
     print("📴 Disconnecting from FactVerse Terminal...")
     time.sleep(0.5)
     print("💾 Saving session data...")
+    get_writer().flush()
     time.sleep(0.5)
     print("🔒 Encrypting your activity logs...")
     time.sleep(0.5)
@@ -147,7 +148,7 @@ def main():
             save_choice = input("💾 Save this fact to `saved_facts.txt`? [Y/n]: ").lower()
             
             if save_choice in ['y', 'yes', '']:
-                save_fact(fact)
+                save_fact(fact, category)
             print()
             
             while True:
@@ -162,7 +163,7 @@ def main():
                     save_choice = input("💾 Save this fact to `saved_facts.txt`? [Y/n]: ").lower()
                     
                     if save_choice in ['y', 'yes', '']:
-                        save_fact(fact)
+                        save_fact(fact, category)
                     print()
                 elif action == '2':
                     os.system('cls' if os.name == 'nt' else 'clear')
@@ -0,0 +1,299 @@
+# saved_store.py - Indexed saved-facts store for FactVerse
+# SQLite table with an FTS5 index over the fact text plus indexes on time,
+# source and category, kept in sync with the saved_facts.txt log
+
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from typing import Iterable, Iterator, Optional
+
+from fact_writer import DEFAULT_SAVED_FILE, list_segments, read_segment
+
+DEFAULT_STORE_FILE = "saved_facts.db"
+
+# [2025-07-31 23:15:37] [DB] fact / [AI:fun] fact / no tag at all (oldest format)
+_RECORD = re.compile(
+    r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]\s*"
+    r"(?:\[(AI|DB)(?::([^\]]+))?\]\s*)?"
+    r"(.*?)\s*$"
+)
+# Older builds wrote a literal backslash-n instead of a newline, gluing records together
+_GLUED = re.compile(r"\\n(?=\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\])|\\n$")
+
+
+def parse_saved_lines(lines: Iterable[str]) -> Iterator[tuple]:
+    """Yield (saved_at, source, category, fact) from every historical line format"""
+    for line in lines:
+        for chunk in _GLUED.split(line.rstrip("\r\n")):
+            match = _RECORD.match(chunk)
+            if match and match.group(4):
+                yield match.group(1), match.group(2), match.group(3), match.group(4)
+
+
+class SavedFactStore:
+    def __init__(self, db_path: str = DEFAULT_STORE_FILE, log_path: str = DEFAULT_SAVED_FILE):
+        self.db_path = db_path
+        self.log_path = log_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS saved_facts (
+                id INTEGER PRIMARY KEY,
+                saved_at TEXT NOT NULL,
+                source TEXT,
+                category TEXT,
+                fact TEXT NOT NULL,
+                UNIQUE (saved_at, fact)
+            );
+            CREATE INDEX IF NOT EXISTS idx_saved_at ON saved_facts (saved_at);
+            CREATE INDEX IF NOT EXISTS idx_source ON saved_facts (source, saved_at);
+            CREATE INDEX IF NOT EXISTS idx_category ON saved_facts (category, saved_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS saved_facts_fts USING fts5 (
+                fact, content='saved_facts', content_rowid='id'
+            );
+            -- Running totals so stats stay O(groups) instead of scanning every row
+            CREATE TABLE IF NOT EXISTS saved_counts (
+                source TEXT NOT NULL,
+                category TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (source, category)
+            );
+            CREATE TRIGGER IF NOT EXISTS saved_facts_ai AFTER INSERT ON saved_facts BEGIN
+                INSERT INTO saved_facts_fts (rowid, fact) VALUES (new.id, new.fact);
+                INSERT INTO saved_counts (source, category, count)
+                    VALUES (COALESCE(new.source, ''), COALESCE(new.category, ''), 1)
+                    ON CONFLICT (source, category) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS saved_facts_ad AFTER DELETE ON saved_facts BEGIN
+                INSERT INTO saved_facts_fts (saved_facts_fts, rowid, fact) VALUES ('delete', old.id, old.fact);
+                UPDATE saved_counts SET count = count - 1
+                    WHERE source = COALESCE(old.source, '') AND category = COALESCE(old.category, '');
+            END;
+            CREATE TABLE IF NOT EXISTS import_state (
+                path TEXT PRIMARY KEY,
+                inode INTEGER NOT NULL,
+                offset INTEGER NOT NULL
+            );
+        """)
+        self.db.commit()
+        self._category_lookup = None
+
+    # === Import ===
+    def _infer_category(self, fact: str) -> Optional[str]:
+        """Database facts saved without a category tag can be matched against the corpus"""
+        if self._category_lookup is None:
+            self._category_lookup = {}
+            try:
+                from fact_store import get_store
+                store = get_store()
+                for category in store.categories():
+                    for known in store.facts(category):
+                        self._category_lookup.setdefault(known, category)
+            except Exception:
+                pass
+        return self._category_lookup.get(fact)
+
+    def insert(self, records: Iterable[tuple]) -> int:
+        """Insert (saved_at, source, category, fact) rows, skipping ones already stored"""
+        cursor = self.db.executemany(
+            "INSERT OR IGNORE INTO saved_facts (saved_at, source, category, fact) VALUES (?, ?, ?, ?)",
+            ((saved_at, source, category or (self._infer_category(fact) if source != "AI" else None), fact)
+             for saved_at, source, category, fact in records)
+        )
+        self.db.commit()
+        return max(cursor.rowcount, 0)
+
+    def import_file(self, path: Optional[str] = None) -> int:
+        """
+        Import new lines from a saved-facts log, resuming from the last offset
+        A replaced or truncated file is re-read from the start (duplicates are ignored)
+        Returns the number of new rows
+        """
+        path = path or self.log_path
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0
+        row = self.db.execute("SELECT inode, offset FROM import_state WHERE path = ?", (path,)).fetchone()
+        offset = row[1] if row and row[0] == stat.st_ino and row[1] <= stat.st_size else 0
+        if offset == stat.st_size:
+            return 0
+
+        consumed = [offset]
+
+        def complete_lines(file):
+            # Only consume complete lines; a partial last line is picked up next time.
+            # Legacy records ended in a literal backslash-n, which also marks them complete
+            for raw in file:
+                if not raw.endswith(b"\n") and not raw.endswith(b"\\n"):
+                    break
+                consumed[0] += len(raw)
+                yield raw.decode('utf-8', errors='replace')
+
+        # Streamed straight into executemany, so memory stays flat for huge logs
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            added = self.insert(parse_saved_lines(complete_lines(file)))
+        self.db.execute(
+            "INSERT OR REPLACE INTO import_state (path, inode, offset) VALUES (?, ?, ?)",
+            (path, stat.st_ino, consumed[0])
+        )
+        self.db.commit()
+        return added
+
+    def import_segments(self, path: Optional[str] = None) -> int:
+        """
+        Import rotated segments of a log that haven't been imported yet
+        Segments are keyed by number, so compressing one later doesn't re-import it
+        """
+        path = path or self.log_path
+        added = 0
+        for number, name in list_segments(path):
+            key = f"{path}.{number:06d}"
+            if self.db.execute("SELECT 1 FROM import_state WHERE path = ?", (key,)).fetchone():
+                continue
+            try:
+                added += self.insert(parse_saved_lines(read_segment(name)))
+            except FileNotFoundError:
+                continue
+            # Segments are immutable; inode 0 marks one as fully imported
+            self.db.execute("INSERT OR REPLACE INTO import_state (path, inode, offset) VALUES (?, 0, 0)", (key,))
+            self.db.commit()
+        return added
+
+    def sync(self, path: Optional[str] = None) -> int:
+        """
+        Catch up with the log and its segments. Lines appended just before a
+        rotation land in the newest segment; re-reading it is safe since
+        duplicates are ignored
+        """
+        return self.import_segments(path) + self.import_file(path)
+
+    # === Queries ===
+    @staticmethod
+    def _match_query(text: str) -> str:
+        """
+        User text as an FTS5 query: every word quoted so punctuation (I'm,
+        two-factor, 99.9%) is matched literally; a trailing * keeps prefix search
+        """
+        terms = []
+        for word in text.split():
+            prefix = word.endswith("*") and len(word) > 1
+            word = word.rstrip("*") if prefix else word
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+        return " ".join(terms)
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Full-text search (all words must match), best matches first"""
+        query = self._match_query(query)
+        if not query:
+            return []
+        return self.db.execute("""
+            SELECT s.saved_at, s.source, s.category, s.fact
+            FROM saved_facts_fts f JOIN saved_facts s ON s.id = f.rowid
+            WHERE saved_facts_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """, (query, limit)).fetchall()
+
+    def list(self, since: Optional[str] = None, source: Optional[str] = None,
+             category: Optional[str] = None, limit: int = 50) -> list:
+        """Newest first, optionally since a timestamp prefix like 2025-07-31"""
+        query = "SELECT saved_at, source, category, fact FROM saved_facts WHERE 1 = 1"
+        params = []
+        if since:
+            query += " AND saved_at >= ?"
+            params.append(since)
+        if source:
+            query += " AND source = ?"
+            params.append(source.upper())
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        query += " ORDER BY saved_at DESC LIMIT ?"
+        params.append(limit)
+        return self.db.execute(query, params).fetchall()
+
+    def stats(self) -> dict:
+        # Separate MIN/MAX queries so each one is a single index probe
+        first = self.db.execute("SELECT MIN(saved_at) FROM saved_facts").fetchone()[0]
+        last = self.db.execute("SELECT MAX(saved_at) FROM saved_facts").fetchone()[0]
+        by_source, by_category = {}, {}
+        for source, category, count in self.db.execute("SELECT source, category, count FROM saved_counts"):
+            source, category = source or "untagged", category or "unknown"
+            by_source[source] = by_source.get(source, 0) + count
+            by_category[category] = by_category.get(category, 0) + count
+        return {
+            "total": sum(by_source.values()),
+            "first": first,
+            "last": last,
+            "by_source": by_source,
+            "by_category": by_category
+        }
+
+    def close(self):
+        self.db.close()
+
+
+def _print_rows(rows: list):
+    if not rows:
+        print("📭 No saved facts found.")
+    for saved_at, source, category, fact in rows:
+        tag = f"{source or '--'}:{category}" if category else (source or "--")
+        print(f"[{saved_at}] [{tag}] {fact}")
+
+
+# === Saved facts CLI ===
+def main(argv=None):
+    """Search and summarize saved facts"""
+    parser = argparse.ArgumentParser(description="FactVerse saved facts")
+    parser.add_argument("--db", default=DEFAULT_STORE_FILE, help="index database (default: %(default)s)")
+    parser.add_argument("--log", default=DEFAULT_SAVED_FILE, help="saved facts log (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="import a saved facts file (any historical format)")
+    import_cmd.add_argument("files", nargs="*")
+    search = commands.add_parser("search", help="full-text search")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    list_cmd = commands.add_parser("list", help="newest saved facts")
+    list_cmd.add_argument("--since", default=None, help="e.g. 2025-07-31 or '2025-07-31 23:00'")
+    list_cmd.add_argument("--source", choices=["AI", "DB", "ai", "db"], default=None)
+    list_cmd.add_argument("--category", default=None)
+    list_cmd.add_argument("--limit", type=int, default=50)
+    commands.add_parser("stats", help="counts by source and category")
+    args = parser.parse_args(argv)
+
+    store = SavedFactStore(args.db, args.log)
+    try:
+        if args.command == "import":
+            if not args.files:
+                print(f"📥 {args.log}: {store.sync()} new saved facts (including rotated segments)")
+            for path in args.files:
+                print(f"📥 {path}: {store.import_file(path)} new saved facts")
+            return 0
+
+        store.sync()
+        if args.command == "search":
+            _print_rows(store.search(args.query, args.limit))
+        elif args.command == "list":
+            _print_rows(store.list(args.since, args.source, args.category, args.limit))
+        elif args.command == "stats":
+            stats = store.stats()
+            print(f"💾 Saved facts: {stats['total']} ({stats['first']} .. {stats['last']})")
+            for name, count in stats["by_source"].items():
+                print(f"   [{name}] {count}")
+            for name, count in stats["by_category"].items():
+                print(f"   {name}: {count}")
+    except sqlite3.OperationalError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
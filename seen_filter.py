@@ -0,0 +1,285 @@
+# seen_filter.py - Cross-session "already seen" filter for FactVerse
+# Scalable Bloom filter with a cap on the number of slices (oldest slice is
+# dropped when the cap is hit), persisted to disk between runs. Processes
+# sharing one file (pre-forked workers, side-by-side terminals) merge their
+# filters on save instead of overwriting each other
+
+import os
+import json
+import math
+import atexit
+import random
+import struct
+import hashlib
+import threading
+from typing import Optional, Sequence
+
+from fact_dedup import normalize
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are atomic but not merged across processes
+    fcntl = None
+
+DEFAULT_SEEN_FILE = "seen_facts.bin"
+_MAGIC = b"FVSF"
+_VERSION = 1
+
+
+def default_seen_path() -> str:
+    """Filter file next to the scripts, overridable with FACTVERSE_SEEN_FILE"""
+    env_path = os.getenv('FACTVERSE_SEEN_FILE')
+    if env_path:
+        return env_path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, DEFAULT_SEEN_FILE)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for a capacity and false-positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal sizing: m = -n ln p / (ln 2)^2, k = (m / n) ln 2
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+        self.added = 0  # items added since the filter was last loaded or saved
+
+    def _positions(self, digest: bytes):
+        h1, h2 = struct.unpack_from("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def contains(self, digest: bytes) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+    def add(self, digest: bytes):
+        bits = self.bits
+        for pos in self._positions(digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        self.added += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class SeenFilter:
+    def __init__(self, path: Optional[str] = None, error_rate: float = 0.001,
+                 initial_capacity: int = 1000, max_slices: int = 8, growth: int = 2):
+        """
+        error_rate is the overall false-positive target; each new slice gets a
+        tighter share of it so the compound rate stays under the target
+        max_slices bounds memory: when exceeded the oldest slice is forgotten
+        """
+        self.path = path or default_seen_path()
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.max_slices = max_slices
+        self.growth = growth
+        self.category_counts = {}
+        self._category_added = {}  # category -> items added since the last load or save
+        self._slices = []
+        self._generation = 0
+        self._exhausted = {}  # category -> corpus size when every fact was already seen
+        self._dirty = False
+        self._cleared = False  # the next save replaces the file instead of merging it
+        self._lock = threading.Lock()
+        self.load()
+
+    # === Hashing ===
+    @staticmethod
+    def _digest(category: str, fact: str) -> bytes:
+        key = f"{category}\x1f{normalize(fact)}".encode('utf-8')
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _new_slice(self) -> BloomFilter:
+        # Slice i gets growth^i capacity and error_rate * 0.5^(i+1); sizes stop
+        # growing once the slice cap is reached so total memory stays bounded
+        tier = min(self._generation, self.max_slices - 1)
+        self._generation += 1
+        capacity = self.initial_capacity * (self.growth ** tier)
+        return BloomFilter(capacity, self.error_rate * (0.5 ** (tier + 1)))
+
+    # === Public API ===
+    def seen(self, category: str, fact: str) -> bool:
+        digest = self._digest(category, fact)
+        with self._lock:
+            return any(bloom.contains(digest) for bloom in self._slices)
+
+    def add(self, category: str, fact: str) -> bool:
+        """Mark a fact as seen; returns False if it (probably) already was"""
+        digest = self._digest(category, fact)
+        with self._lock:
+            if any(bloom.contains(digest) for bloom in self._slices):
+                return False
+            if not self._slices or self._slices[-1].full:
+                self._slices.append(self._new_slice())
+                if len(self._slices) > self.max_slices:
+                    self._slices.pop(0)
+            self._slices[-1].add(digest)
+            self.category_counts[category] = self.category_counts.get(category, 0) + 1
+            self._category_added[category] = self._category_added.get(category, 0) + 1
+            self._dirty = True
+            return True
+
+    def pick_unseen(self, category: str, facts: Sequence[str], tries: int = 16,
+                    chooser=random.choice) -> str:
+        """
+        Draw facts until an unseen one turns up (bounded tries), then mark it seen
+        Once a category is exhausted the chooser's own order is used as-is; the
+        exhausting call returns its last draw, so a shuffle bag's next round
+        still can't open with the same fact
+        """
+        if self._exhausted.get(category) == len(facts):
+            return chooser(facts)
+        fact = chooser(facts)
+        for _ in range(min(tries, len(facts)) - 1):
+            if not self.seen(category, fact):
+                break
+            fact = chooser(facts)
+        else:
+            if self.seen(category, fact):
+                self._exhausted[category] = len(facts)
+        self.add(category, fact)
+        return fact
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slices": len(self._slices),
+                "items": sum(bloom.count for bloom in self._slices),
+                "bytes": sum(len(bloom.bits) for bloom in self._slices),
+                "error_rate": self.error_rate,
+                "category_counts": dict(self.category_counts)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._slices = []
+            self._generation = 0
+            self._exhausted = {}
+            self.category_counts = {}
+            self._category_added = {}
+            self._dirty = True
+            self._cleared = True
+
+    # === Persistence ===
+    def save(self):
+        """
+        Write the filter atomically (temp file + rename); no-op if unchanged
+        Under a lock on the file, whatever another process saved meanwhile is
+        merged in first (bitwise OR of the slices from the same generation)
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            lock_fd = None
+            try:
+                if fcntl:
+                    lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                saved = None if self._cleared else self._read()
+                if saved is not None:
+                    self._merge(*saved)
+                header = json.dumps({
+                    "error_rate": self.error_rate,
+                    "generation": self._generation,
+                    "category_counts": self.category_counts,
+                    "slices": [[bloom.capacity, bloom.error_rate, bloom.count] for bloom in self._slices]
+                }).encode('utf-8')
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as file:
+                    file.write(_MAGIC + struct.pack("<HI", _VERSION, len(header)) + header)
+                    for bloom in self._slices:
+                        file.write(bloom.bits)
+                os.replace(tmp_path, self.path)
+                self._dirty = self._cleared = False
+                for bloom in self._slices:
+                    bloom.added = 0
+                self._category_added = {}
+            except OSError:
+                pass
+            finally:
+                if lock_fd is not None:
+                    os.close(lock_fd)  # releases the lock
+
+    def _merge(self, generation: int, category_counts: dict, slices: list):
+        """
+        OR a saved filter into this one (caller holds the lock)
+        The file already holds everything saved so far, this process's earlier
+        saves included, so counts take the file's value plus only what was
+        added here since the last load or save
+        """
+        # Slices are kept in generation order, so each one's generation follows from its position
+        merged = {self._generation - len(self._slices) + i: bloom for i, bloom in enumerate(self._slices)}
+        for i, theirs in enumerate(slices):
+            slice_generation = generation - len(slices) + i
+            ours = merged.get(slice_generation)
+            if ours is None:
+                merged[slice_generation] = theirs
+            elif (ours.capacity, ours.error_rate, len(ours.bits)) == (theirs.capacity, theirs.error_rate,
+                                                                        len(theirs.bits)):
+                ours.bits = bytearray(a | b for a, b in zip(ours.bits, theirs.bits))
+                ours.count = min(ours.capacity, theirs.count + ours.added)
+        self._generation = max(self._generation, generation)
+        self._slices = [merged[key] for key in sorted(merged)][-self.max_slices:]
+        merged_counts = dict(category_counts)
+        for category, added in self._category_added.items():
+            merged_counts[category] = merged_counts.get(category, 0) + added
+        self.category_counts = merged_counts
+
+    def _read(self) -> Optional[tuple]:
+        """(generation, category counts, slices) from the file; None if missing or corrupt"""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        try:
+            if data[:4] != _MAGIC:
+                return None
+            version, header_len = struct.unpack_from("<HI", data, 4)
+            if version != _VERSION:
+                return None
+            offset = 10
+            header = json.loads(data[offset:offset + header_len].decode('utf-8'))
+            offset += header_len
+            slices = []
+            for capacity, error_rate, count in header["slices"]:
+                bloom = BloomFilter(capacity, error_rate, count=count)
+                size = len(bloom.bits)
+                bloom.bits = bytearray(data[offset:offset + size])
+                if len(bloom.bits) != size:
+                    return None
+                offset += size
+                slices.append(bloom)
+        except (ValueError, KeyError, struct.error):
+            return None
+        return header.get("generation", len(slices)), header.get("category_counts", {}), slices
+
+    def load(self):
+        """Restore a saved filter; a missing or corrupt file starts empty"""
+        saved = self._read()
+        if saved is not None:
+            self._generation, self.category_counts, self._slices = saved
+
+
+# === Shared instance ===
+_shared_filter = None
+_shared_lock = threading.Lock()
+
+
+def get_seen_filter() -> SeenFilter:
+    """Process-wide filter, saved automatically at exit"""
+    global _shared_filter
+    with _shared_lock:
+        if _shared_filter is None:
+            _shared_filter = SeenFilter()
+            atexit.register(_shared_filter.save)
+        return _shared_filter
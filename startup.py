@@ -0,0 +1,71 @@
+# startup.py - Background startup tasks for FactVerse
+# Runs the slow parts of startup (fact loading, AI client setup) on a thread
+# while the banner plays, and reports real progress for the loading bar
+
+import time
+import threading
+from typing import Optional
+
+
+class StartupTasks:
+    def __init__(self, tasks: list):
+        """tasks: (label, callable) pairs, run in order on one background thread"""
+        self.tasks = tasks
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.completed = 0
+        self.current = None
+        self.started_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+        self._thread = None
+
+    def start(self) -> "StartupTasks":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="factverse-startup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        for label, task in self.tasks:
+            with self._changed:
+                self.current = label
+            started = time.perf_counter()
+            try:
+                self.results[label] = task()
+            except Exception as e:
+                self.errors[label] = e
+            with self._changed:
+                self.timings[label] = time.perf_counter() - started
+                self.completed += 1
+                self._changed.notify_all()
+        with self._changed:
+            self.current = None
+            self.finished_at = time.perf_counter()
+            self._changed.notify_all()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def progress(self) -> float:
+        return self.completed / len(self.tasks) if self.tasks else 1.0
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every task has finished (or timeout); True when done"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.done, timeout)
+
+    def wait_for_progress(self, completed: int, timeout: Optional[float] = None) -> int:
+        """Block until more than `completed` tasks have finished (or timeout); returns the count"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.completed > completed or self.done, timeout)
+            return self.completed
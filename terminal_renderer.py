@@ -0,0 +1,67 @@
+# terminal_renderer.py - Frame-buffered typing animation for FactVerse
+# Text is written a frame at a time at a fixed frame rate instead of one
+# flushed print per character, and every message finishes within a fixed
+# time budget however long it is. Without a TTY the text is written at once
+
+import sys
+import math
+import time
+from typing import Optional
+
+DEFAULT_FPS = 30
+DEFAULT_MAX_DURATION = 1.0
+
+
+class TerminalRenderer:
+    def __init__(self, stream=None, fps: int = DEFAULT_FPS, max_duration: float = DEFAULT_MAX_DURATION,
+                 enabled: Optional[bool] = None, sleep=time.sleep, clock=time.monotonic):
+        """
+        stream defaults to sys.stdout at call time; enabled=None animates only
+        when the stream is a TTY
+        """
+        self.stream = stream
+        self.fps = fps
+        self.max_duration = max_duration
+        self.enabled = enabled
+        self.sleep = sleep
+        self.clock = clock
+
+    def animated(self, stream) -> bool:
+        if self.enabled is not None:
+            return self.enabled
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def type(self, text: str, delay: float = 0.02, end: str = "\n"):
+        """Reveal text at roughly delay seconds per character, capped at max_duration"""
+        stream = self.stream or sys.stdout
+        if not text or delay <= 0 or not self.animated(stream):
+            stream.write(text + end)
+            stream.flush()
+            return
+
+        duration = min(len(text) * delay, self.max_duration)
+        frames = max(1, min(len(text), math.ceil(duration * self.fps)))
+        interval = duration / frames
+        started = self.clock()
+        shown = 0
+        for frame in range(1, frames + 1):
+            upto = len(text) * frame // frames
+            stream.write(text[shown:upto] + (end if frame == frames else ""))
+            stream.flush()
+            shown = upto
+            if frame < frames:
+                # Sleep to the frame deadline rather than a fixed step so slow writes don't add up
+                remaining = started + frame * interval - self.clock()
+                if remaining > 0:
+                    self.sleep(remaining)
+
+
+_default_renderer = TerminalRenderer()
+
+
+def typing_animation(text: str, delay: float = 0.02):
+    """Simulate typing animation"""
+    _default_renderer.type(text, delay)
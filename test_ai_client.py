@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Shared AI client tests (against a local fake endpoint)
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from ai_client import AIClient
+
+
+class FakeCompletions(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        FakeCompletions.connections += 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": " Octopuses have three hearts. "}}]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    FakeCompletions.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_is_lazy_and_reuses_connections(endpoint):
+    client = AIClient(api_key="test-key", base_url=endpoint, model="fake-model")
+    assert not client.stats()["connected"]
+
+    messages = [{"role": "user", "content": "One fact"}]
+    assert [client.complete(messages) for _ in range(5)] == ["Octopuses have three hearts."] * 5
+    assert FakeCompletions.connections == 1
+    assert client.stats()["requests"] == 5
+    client.close()
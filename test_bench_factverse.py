@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Benchmark regression gate tests
+"""
+
+import json
+
+from bench_factverse import compare_results, main, time_load, write_corpus
+
+
+def report(**values):
+    return {"meta": {}, "results": {
+        name: {"value": value, "unit": "facts/s" if name == "save_fact" else "s",
+               "better": "higher" if name == "save_fact" else "lower"}
+        for name, value in values.items()}}
+
+
+def test_compare_flags_regressions_in_either_direction():
+    baseline = report(select=1.0, load=1.0, save_fact=1000.0, dropped=1.0)
+    current = report(select=1.5, load=0.5, save_fact=700.0, added=1.0)
+    rows = {name: (change, status) for name, _, _, change, status in compare_results(baseline, current, 0.25)}
+    assert set(rows) == {"select", "load", "save_fact"}
+    assert rows["select"][1] == "regression"
+    assert rows["load"][1] == "improved"
+    # 30% fewer facts per second is a ~43% slowdown
+    assert rows["save_fact"][1] == "regression" and round(rows["save_fact"][0], 2) == 0.43
+    assert compare_results(baseline, report(select=1.2, load=1.0, save_fact=900.0), 0.25)[-1][-1] == "ok"
+
+
+def test_compare_command_exit_code(tmp_path):
+    for name, values in (("base", report(select=1.0)), ("slow", report(select=2.0)), ("same", report(select=1.1))):
+        (tmp_path / f"{name}.json").write_text(json.dumps(values))
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "slow.json")]) == 1
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "same.json")]) == 0
+
+
+def test_generated_corpus_loads(tmp_path):
+    seconds, store = time_load(write_corpus(str(tmp_path / "facts.json"), 1000), repeats=1)
+    assert seconds > 0
+    assert sum(store.counts().values()) == 1000
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+FactVerse - AI circuit breaker tests
+"""
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing():
+    raise ConnectionError("provider down")
+
+
+def test_opens_after_consecutive_failures_and_short_circuits():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, base_delay=2.0, clock=clock, rng=lambda: 1.0)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+    assert breaker.state == OPEN
+    assert not breaker.allow() and breaker.retry_in() == 2.0
+    with pytest.raises(CircuitOpenError):
+        breaker.call(failing)
+    assert breaker.stats()["short_circuits"] == 2
+
+
+def test_half_open_probe_reopens_with_longer_cooldown_then_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=1.0, clock=clock, rng=lambda: 1.0)
+    breaker.record_failure()
+    clock.now = 1.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.retry_in() == 2.0
+
+    clock.now = 3.0
+    assert breaker.call(lambda: "fact") == "fact"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["transitions"] == {OPEN: 2, HALF_OPEN: 2, CLOSED: 1}
+
+
+def test_backoff_is_jittered_and_capped():
+    assert backoff_delay(0, base=1.0, rng=lambda: 0.0) == 0.5
+    assert backoff_delay(3, base=1.0, rng=lambda: 1.0) == 8.0
+    assert backoff_delay(20, base=1.0, cap=30.0, rng=lambda: 1.0) == 30.0
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+FactVerse - AI generator deadline and prefetch tests
+"""
+
+import json
+import time
+import threading
+
+from circuit_breaker import CircuitBreaker
+from fact_ai_generator import AIFactGenerator
+from fact_cache import FactCache
+from fact_store import FactStore
+from seen_filter import SeenFilter
+
+
+def make_generator(tmp_path, answer_after: float):
+    facts = tmp_path / "facts.json"
+    facts.write_text(json.dumps({"fun": ["Bananas are berries."]}), encoding='utf-8')
+    generator = AIFactGenerator(prefetch_workers=0, cache=FactCache(str(tmp_path / "cache.db")))
+    generator.local_facts = FactStore(str(facts))
+    generator.seen = SeenFilter(str(tmp_path / "seen.bin"))
+    generator.openai_available = True
+    answered = threading.Event()
+
+    def slow_ai_fact(category):
+        time.sleep(answer_after)
+        answered.set()
+        return "Octopuses have three hearts."
+
+    generator.generate_ai_fact = slow_ai_fact
+    return generator, answered
+
+
+def test_deadline_falls_back_to_local_and_salvages_late_answer(tmp_path):
+    generator, answered = make_generator(tmp_path, answer_after=0.3)
+    started = time.perf_counter()
+    assert generator.generate_fact("fun", deadline_ms=50) == ("Bananas are berries.", "LOCAL")
+    assert time.perf_counter() - started < 0.25
+
+    assert answered.wait(5)
+    for _ in range(100):  # the done-callback runs just after the answer returns
+        if generator.deadline_salvaged:
+            break
+        time.sleep(0.01)
+    assert generator.generate_fact("fun", deadline_ms=50) == ("Octopuses have three hearts.", "AI")
+    assert generator.get_status()["deadline"] == {"timeouts": 1, "salvaged": 1}
+
+
+def test_fast_answer_within_deadline(tmp_path):
+    generator, _ = make_generator(tmp_path, answer_after=0.0)
+    assert generator.generate_fact("fun", deadline_ms=1000) == ("Octopuses have three hearts.", "AI")
+    assert generator.deadline_timeouts == 0
+
+
+class FakeClient:
+    """Numbered facts; prefetch threads block until the gate opens"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, messages, **kwargs):
+        prefetching = threading.current_thread().name.startswith("fact-prefetch")
+        if prefetching:
+            self.gate.wait(5)
+        with self._lock:
+            self.calls += 1
+            return f"{'Prefetched' if prefetching else 'Inline'} fact number {self.calls} is true."
+
+    def stats(self):
+        return {"requests": self.calls}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_prefetch_hit_miss_refill_and_stop(tmp_path):
+    facts = tmp_path / "facts.json"
+    facts.write_text(json.dumps({"fun": ["Bananas are berries."]}), encoding='utf-8')
+    client = FakeClient()
+    generator = AIFactGenerator(prefetch_depth=2, prefetch_workers=0, cache=FactCache(str(tmp_path / "cache.db")),
+                                breaker=CircuitBreaker(), client=client)
+    generator.local_facts = FactStore(str(facts))
+    generator.seen = SeenFilter(str(tmp_path / "seen.bin"))
+    generator.prefetch_workers = 2
+    generator.start_prefetch()
+    threads = list(generator._prefetch_threads)
+    assert len(threads) == 2
+
+    # Empty queue: the request goes to the API inline
+    fact, source = generator.generate_fact("fun")
+    assert source == "AI" and fact.startswith("Inline")
+    assert (generator.prefetch_hits, generator.prefetch_misses) == (0, 1)
+
+    # Every category fills up to the target depth
+    client.gate.set()
+    queues = generator._prefetch_queues
+    wait_for(lambda: all(fact_queue.qsize() == 2 for fact_queue in queues.values()))
+
+    fact, source = generator.generate_fact("fun")
+    assert source == "AI" and fact.startswith("Prefetched")
+    assert generator.prefetch_hits == 1
+    wait_for(lambda: queues["fun"].qsize() == 2)
+    calls = client.calls
+    time.sleep(0.1)
+    assert client.calls == calls  # full queues: no more requests
+
+    generator.stop_prefetch()
+    assert generator._prefetch_threads == []
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_cache_pool_serves_several_facts_per_category(tmp_path):
+    cache = FactCache(str(tmp_path / "cache.db"))
+    client = FakeClient()
+    generator = AIFactGenerator(prefetch_workers=0, cache=cache, breaker=CircuitBreaker(), client=client)
+    generator.seen = SeenFilter(str(tmp_path / "seen.bin"))
+    first_session = [generator.generate_ai_fact("fun") for _ in range(3)]
+    assert len(set(first_session)) == 3 and client.calls == 3
+
+    # A new session (nothing seen yet) gets all three back from the cache
+    generator.seen = SeenFilter(str(tmp_path / "seen-2.bin"))
+    assert [generator.generate_ai_fact("fun") for _ in range(3)] == first_session
+    assert client.calls == 3
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Batched completion parsing tests
+"""
+
+from fact_batch import AdaptiveBatchSize, clean_batch, clean_fact
+
+
+def test_batch_items_are_validated_and_deduplicated():
+    answer = '''```json
+["\\"Octopuses have three hearts and blue blood.\\"", "Too short", 42,
+ "Bananas are berries, but strawberries aren't.", "octopuses have three hearts and blue blood."]
+```'''
+    facts, valid = clean_batch(answer, 5)
+    assert facts == ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."]
+    assert valid == 3
+    assert clean_batch('["Cut off mid-answer because the', 5) == ([], 0)
+    assert clean_fact('"Honey never spoils in a sealed jar."') == "Honey never spoils in a sealed jar."
+
+
+def test_batch_size_adapts_to_failure_rate():
+    sizer = AdaptiveBatchSize(initial=5, maximum=8)
+    for _ in range(5):
+        sizer.record(sizer.size, sizer.size)
+    assert sizer.size == 8
+    for _ in range(3):
+        sizer.record(sizer.size, 0)
+    assert sizer.size == 1
+    for _ in range(10):
+        sizer.record(sizer.size, sizer.size)
+    assert sizer.size > 1 and sizer.failure_rate < 0.2
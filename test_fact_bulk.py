@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Headless bulk generation tests
+"""
+
+import sys
+import json
+
+import pytest
+
+import fact_store
+from circuit_breaker import CircuitBreaker
+from fact_ai_generator import AIFactGenerator
+from fact_bulk import generate
+from fact_cache import FactCache
+from fact_store import FactStore
+from seen_filter import SeenFilter
+
+CORPUS = {
+    'hacking': ["Social engineering is often more effective than technical attacks."],
+    'fun': ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."],
+    'lazy': ["I put the 'Pro' in procrastination."]
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    return FactStore(str(facts_file), seed=1)
+
+
+def read_records(path) -> list:
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_local_count_and_category_order(store, tmp_path):
+    output = tmp_path / "facts.jsonl"
+    summary = generate("all", 7, str(output), store=store)
+    records = read_records(output)
+
+    assert summary["count"] == 7 and summary["sources"] == {"LOCAL": 7}
+    assert [record["category"] for record in records] == ['hacking', 'fun', 'lazy'] * 2 + ['hacking']
+    assert all(record["fact"] in CORPUS[record["category"]] for record in records)
+    assert set(records[0]) == {"fact", "category", "source", "latency_ms", "timestamp"}
+
+    with pytest.raises(ValueError):
+        generate("nope", 1, str(output), store=store)
+
+
+class FailingClient:
+    def complete(self, messages, **kwargs):
+        raise ConnectionError("API unreachable")
+
+    def stats(self):
+        return {}
+
+
+def test_stdout_stays_jsonl_when_the_ai_fails(store, tmp_path, capsys):
+    generator = AIFactGenerator(prefetch_workers=0, cache=FactCache(str(tmp_path / "cache.db")),
+                                breaker=CircuitBreaker(failure_threshold=100), client=FailingClient())
+    generator.local_facts = store
+    generator.seen = SeenFilter(str(tmp_path / "seen.bin"))
+
+    summary = generate("fun", 5, "-", parallel=2, generator=generator, store=store)
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert len(records) == 5 and summary["sources"] == {"LOCAL": 5}
+    assert "AI Error" in captured.err
+
+
+def test_main_no_ai_flag_before_the_subcommand(store, monkeypatch, capsys):
+    import main
+
+    monkeypatch.setattr(fact_store, '_shared_store', store)
+    monkeypatch.setattr(main, 'AIFactGenerator', None)  # calling it would fail the test
+    monkeypatch.setattr(sys, 'argv', ["main.py", "--no-ai", "generate", "fun", "-n", "3"])
+    main.main()
+    captured = capsys.readouterr()
+    assert [json.loads(line)["source"] for line in captured.out.splitlines()] == ["LOCAL"] * 3
+    assert "3 facts" in captured.err
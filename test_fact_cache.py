@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+FactVerse - AI response cache tests
+"""
+
+import time
+import threading
+
+from fact_cache import FactCache, main
+
+
+def make_cache(tmp_path, **options):
+    return FactCache(str(tmp_path / "cache.db"), **options)
+
+
+def test_lru_evicts_by_entry_count_and_bytes(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("fun", "a", "first answer")
+    cache.put("fun", "b", "second answer")
+    cache.get("fun", "a")  # a becomes most recently used
+    cache.put("fun", "c", "third answer")
+    assert [key[1] for key in cache._memory] == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("fun", "b") == "second answer"  # still on disk
+    assert cache.stats()["disk_hits"] == 1
+
+    cache = make_cache(tmp_path, max_entries=None, max_bytes=10)
+    cache.put("fun", "x", "12345")
+    cache.put("fun", "y", "123456")
+    assert list(cache._memory) == [("fun", "y")]
+    assert cache.stats()["memory_bytes"] == 6
+
+
+def test_ttl_expiry_and_stale_refresh(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05, serve_stale=False)
+    cache.put("fun", "p", "old answer")
+    assert cache.get("fun", "p") == "old answer"
+    time.sleep(0.1)
+    assert cache.get("fun", "p") is None
+    assert cache.stats()["expired"] == 1
+
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.put("fun", "p", "old answer")
+    time.sleep(0.1)
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return "new answer"
+
+    assert cache.get("fun", "p", refresh=refresh) == "old answer"
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert cache.get("fun", "p") == "new answer"
+    assert cache.stats()["stale_served"] == 1
+
+
+def test_pool_serves_each_answer_once_then_reuses_the_oldest_slot(tmp_path):
+    cache = make_cache(tmp_path)
+    shown = set()
+
+    def accept(answer):
+        if answer in shown:
+            return False
+        shown.add(answer)
+        return True
+
+    for n in range(3):  # nothing accepted: each miss points at the next empty slot
+        answer, key = cache.get_pooled("fun", "p", lambda answer: False, pool_size=3)
+        assert answer is None
+        cache.put("fun", key, f"answer {n}")
+    assert [cache.get_pooled("fun", "p", accept, pool_size=3)[0] for _ in range(3)] == \
+        ["answer 0", "answer 1", "answer 2"]
+    assert cache.get_pooled("fun", "p", accept, pool_size=3) == (None, "p")
+    assert cache.get_pooled("fun", "p", accept, pool_size=3) == (None, "p #1")
+
+
+def test_stale_pool_slots_share_one_refresh(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    for slot in range(3):
+        cache.put("fun", cache.pool_key("p", slot), f"answer {slot}")
+    time.sleep(0.1)
+    release = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        return "fresh answer"
+
+    answer, _ = cache.get_pooled("fun", "p", lambda answer: False, pool_size=3, refresh=refresh)
+    assert answer is None and cache.stats()["stale_served"] == 3
+    release.set()
+    for _ in range(100):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 1
+
+
+def test_disk_totals_are_kept_without_scanning(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("fun", "a", "first answer")
+    cache.put("fun", "a", "replaced")
+    cache.put("lazy", "b", "second answer")
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    stats = cache.stats()
+    assert statements == []
+    assert (stats["disk_entries"], stats["disk_bytes"]) == (2, len("replaced") + len("second answer"))
+
+    assert cache.prune(expired_only=False, category="fun") == 1
+    assert (cache.stats()["disk_entries"], cache.stats()["disk_bytes"]) == (1, len("second answer"))
+    cache.close()
+    reopened = make_cache(tmp_path).stats()
+    assert (reopened["disk_entries"], reopened["disk_bytes"]) == (1, len("second answer"))
+
+
+def test_cli_stats_and_prune(tmp_path, capsys):
+    cache = make_cache(tmp_path)
+    cache.put("fun", "a", "first answer")
+    cache.put("lazy", "b", "second answer")
+    cache._db.execute("UPDATE ai_cache SET created_at = created_at - 7200 WHERE category = 'fun'")
+    cache._db.commit()
+    cache.close()
+    db = str(tmp_path / "cache.db")
+
+    assert main(["--db", db, "stats"]) == 0
+    output = capsys.readouterr().out
+    assert "Entries: 2" in output and "Expired: 1" in output
+
+    assert main(["--db", db, "prune"]) == 0
+    assert "Removed 1" in capsys.readouterr().out
+    assert main(["--db", db, "prune", "--all"]) == 0
+    assert "Removed 1" in capsys.readouterr().out
+    assert FactCache(db).stats()["disk_entries"] == 0
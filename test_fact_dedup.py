@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Near-duplicate index tests (offline, fixture corpus)
+"""
+
+import json
+import threading
+
+from fact_dedup import LazyCorpusIndex, NearDuplicateIndex
+
+FIXTURE_CORPUS = {
+    'hacking': [
+        "Most black-hat hackers start learning before the age of 16.",
+        "Two-factor authentication can prevent 99.9% of automated attacks.",
+        "Social engineering is often more effective than technical attacks."
+    ],
+    'fun': [
+        "Honey never spoils - archaeologists have found edible honey in ancient Egyptian tombs.",
+        "Bananas are berries, but strawberries aren't.",
+        "Octopuses have three hearts and blue blood."
+    ]
+}
+
+
+def build_index(tmp_path, **kwargs):
+    corpus_file = tmp_path / "facts.json"
+    corpus_file.write_text(json.dumps(FIXTURE_CORPUS), encoding='utf-8')
+    index = NearDuplicateIndex(**kwargs)
+    assert index.load_corpus(str(corpus_file)) == 6
+    return index
+
+
+def test_paraphrases_of_corpus_are_flagged(tmp_path):
+    index = build_index(tmp_path)
+    assert index.find_duplicate("Octopuses have 3 hearts and blue blood!") == "Octopuses have three hearts and blue blood."
+    assert index.is_duplicate("Bananas are berries but strawberries are not.")
+    assert index.is_duplicate("Two factor authentication prevents 99.9% of automated attacks.")
+
+
+def test_new_facts_pass_and_are_remembered(tmp_path):
+    index = build_index(tmp_path)
+    fact = "The Eiffel Tower can grow more than 15 cm taller in summer."
+    assert index.add_if_new(fact)
+    assert not index.add_if_new("The Eiffel Tower can grow more than 15cm taller in the summer!")
+    assert len(index) == 7
+
+
+def test_threshold_is_tunable(tmp_path):
+    strict = build_index(tmp_path, threshold=0.95)
+    loose = build_index(tmp_path, threshold=0.5)
+    paraphrase = "Honey never spoils; archaeologists found edible honey in ancient Egyptian tombs."
+    assert not strict.is_duplicate(paraphrase)
+    assert loose.is_duplicate(paraphrase)
+
+
+def test_lookups_in_a_large_index(tmp_path):
+    # Lookup speed is tracked by the dedup_check case of bench_factverse.py suite
+    index = build_index(tmp_path)
+    for i in range(2000):
+        index.add(f"Synthetic fact number {i} about topic {i * 7919 % 1000} and item {i * 31}.")
+    assert not index.is_duplicate("A completely unrelated sentence about deep sea volcanoes.")
+    assert index.is_duplicate("Octopuses have 3 hearts and blue blood!")
+    assert index.is_duplicate("Synthetic fact number 1234 about topic 846 and item 38254!")
+
+
+class GatedCorpus(dict):
+    """A corpus whose categories can't be read until the gate opens"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.gate = threading.Event()
+
+    def __getitem__(self, category):
+        self.gate.wait(5)
+        return super().__getitem__(category)
+
+
+def test_corpus_index_builds_in_the_background():
+    corpus = GatedCorpus(FIXTURE_CORPUS)
+    index = LazyCorpusIndex(corpus)
+    paraphrase = "Octopuses have 3 hearts and blue blood!"
+    assert not index.is_duplicate('fun', paraphrase)  # returns at once while 'fun' is indexed
+    assert index.indexed_categories() == []
+    corpus.gate.set()
+    assert index.wait('fun', 5)
+    assert index.is_duplicate('fun', paraphrase)
+    assert index.indexed_categories() == ['fun']
+
+
+def test_corpus_index_samples_large_categories():
+    facts = [f"Corpus fact {i} about a distinct subject number {i * 7919}." for i in range(10)]
+    index = LazyCorpusIndex({'fun': facts}, max_facts=3, background=False)
+    assert index.is_duplicate('fun', facts[4])
+    assert len(index._indexes['fun']) == 3  # facts 0, 4 and 8
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Metrics registry tests
+"""
+
+import threading
+
+from fact_metrics import MetricsRegistry, merge_metrics
+
+
+def test_text_exposition_format(tmp_path):
+    registry = MetricsRegistry()
+    served = registry.counter("facts_total", "Facts served", ("category", "source"))
+    latency = registry.histogram("draw_seconds", "Draw latency", buckets=(0.001, 0.01))
+    registry.gauge("hit_ratio", "Cache hit ratio", lambda: 0.75)
+    served.inc("fun", "AI")
+    served.inc("fun", "AI")
+    served.inc('say "hi"', "LOCAL")
+    for value in (0.0005, 0.005, 0.5):
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'facts_total{category="fun",source="AI"} 2' in text
+    assert 'facts_total{category="say \\"hi\\"",source="LOCAL"} 1' in text
+    assert 'draw_seconds_bucket{le="0.001"} 1' in text
+    assert 'draw_seconds_bucket{le="0.01"} 2' in text
+    assert 'draw_seconds_bucket{le="+Inf"} 3' in text
+    assert "draw_seconds_count 3" in text
+    assert "# TYPE hit_ratio gauge\nhit_ratio 0.75" in text
+
+    path = tmp_path / "factverse.prom"
+    registry.write(str(path))
+    assert path.read_text(encoding='utf-8') == text
+
+
+def test_recording_from_many_threads_loses_nothing():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("event_seconds", "Event latency")
+
+    def record():
+        for _ in range(10000):
+            counter.inc()
+            histogram.observe(0.002)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 80000
+    assert histogram.snapshot()["count"] == 80000
+
+
+def test_finished_threads_fold_into_the_total():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("event_seconds", "Event latency")
+
+    def record():
+        counter.inc()
+        histogram.observe(0.002)
+
+    for _ in range(200):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+    assert counter.value() == 200
+    assert histogram.snapshot()["count"] == 200
+    assert len(counter._children[()]._shards) <= 1
+
+
+def test_merging_worker_outputs():
+    outputs = {}
+    for worker, (served, ratio) in enumerate(((2, 0.5), (3, 0.25))):
+        registry = MetricsRegistry()
+        registry.counter("facts_total", "Facts", ("category",)).labels("fun").inc(served)
+        registry.histogram("draw_seconds", "Draws", buckets=(0.01,)).observe(0.001 * served)
+        registry.gauge("hit_ratio", "Hits", lambda ratio=ratio: ratio)
+        outputs[str(worker)] = registry.render()
+
+    text = merge_metrics(outputs)
+    assert 'facts_total{category="fun"} 5' in text
+    assert 'draw_seconds_bucket{le="0.01"} 2' in text and "draw_seconds_count 2" in text
+    assert 'hit_ratio{worker="0"} 0.5' in text and 'hit_ratio{worker="1"} 0.25' in text
+    assert "hit_ratio" not in merge_metrics(outputs, gauge_label=None)
+    assert merge_metrics({"all": text}, gauge_label=None).count("# TYPE") == 2
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Shuffle-bag sampler tests
+"""
+
+import random
+
+from fact_corpus import FactList
+from fact_sampler import DynamicAliasTable, FactSampler, ShuffleBag
+
+FACTS = [f"Fact number {i}" for i in range(7)]
+
+
+def test_every_fact_is_dealt_once_per_round():
+    sampler = FactSampler(seed=42)
+    for _ in range(5):
+        deal = [sampler.choose('fun', FACTS) for _ in FACTS]
+        assert sorted(deal) == sorted(FACTS)
+
+
+def test_no_repeat_across_reshuffle_boundary():
+    for seed in range(200):
+        bag = ShuffleBag(3, random.Random(seed))
+        draws = [bag.draw() for _ in range(30)]
+        assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_seeded_sampler_is_reproducible():
+    first = FactSampler(seed=7)
+    second = FactSampler(seed=7)
+    assert [first.choose('fun', FACTS) for _ in range(20)] == [second.choose('fun', FACTS) for _ in range(20)]
+
+
+def test_changed_category_gets_a_fresh_bag():
+    sampler = FactSampler(seed=1)
+    sampler.choose('fun', FACTS)
+    resized = FACTS + ["Fact number 7"]
+    assert sorted(sampler.choose('fun', resized) for _ in resized) == sorted(resized)
+
+
+def test_weighted_draws_follow_weights():
+    facts = FactList(["rare", "common"], weights=[1.0, 9.0])
+    sampler = FactSampler(seed=3)
+    draws = [sampler.choose('fun', facts) for _ in range(20000)]
+    assert 0.87 < draws.count("common") / len(draws) < 0.93
+
+
+def test_weight_change_needs_no_rebuild():
+    facts = FactList(["a", "b"], weights=[1.0, 1.0 + 1e-9])
+    other = FactList(["c", "d"], weights=[2.0, 1.0])
+    sampler = FactSampler(seed=3)
+    sampler.choose('fun', facts)
+    sampler.choose('lazy', other)
+    assert sampler.table_builds == 2
+
+    sampler.set_weight('fun', facts, 0, 0.0)
+    assert {sampler.choose('fun', facts) for _ in range(200)} == {"b"}
+    sampler.choose('lazy', other)
+    assert sampler.table_builds == 2
+
+
+def test_incremental_weights_match_the_current_weights():
+    weights = [1.0] * 100
+    table = DynamicAliasTable(list(weights), random.Random(5))
+    for index, weight in [(0, 30.0), (1, 0.0), (2, 0.5), (3, 20.0), (0, 10.0), (3, 1.0)]:
+        assert not table.set(index, weight)
+        weights[index] = weight
+    draws = [table.draw() for _ in range(200000)]
+    total = sum(weights)
+    for index in range(5):
+        expected = weights[index] / total
+        assert abs(draws.count(index) / len(draws) - expected) < 0.01 + expected * 0.1
+    assert table.rebuilds == 1
+
+    # Enough changes and the base table is rebuilt from the current weights
+    rebuilt = [table.set(index, 2.0) for index in range(10, 40)]
+    assert any(rebuilt) and table.rebuilds == 2
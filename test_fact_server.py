@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+FactVerse - HTTP API tests (local facts, ephemeral port)
+"""
+
+import json
+import socket
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+from fact_server import FactServer
+from fact_store import FactStore
+from fact_writer import SavedFactWriter
+
+CORPUS = {'fun': ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."]}
+
+
+@pytest.fixture
+def server(tmp_path):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    fact_server = FactServer(FactStore(str(facts_file), seed=1),
+                             writer=SavedFactWriter(str(tmp_path / "saved_facts.txt"), fsync="never"))
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(fact_server.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield fact_server
+
+    async def drop_connections():
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+    asyncio.run_coroutine_threadsafe(drop_connections(), loop).result(1.0)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(1.0)
+    fact_server.close()
+
+
+def get(conn, path):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_facts_endpoints(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port)
+    status, body = get(conn, "/facts/fun")
+    assert status == 200 and body["fact"] in CORPUS['fun'] and body["source"] == "LOCAL"
+
+    status, body = get(conn, "/facts/fun?n=2")
+    assert status == 200 and sorted(item["fact"] for item in body["facts"]) == sorted(CORPUS['fun'])
+
+    assert get(conn, "/facts/nope")[0] == 404
+    assert get(conn, "/facts/fun?n=0")[0] == 400
+
+
+def test_status_endpoint_reuses_connection(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port)
+    for _ in range(3):
+        status, body = get(conn, "/status")
+    assert status == 200
+    assert body["categories"] == ['fun']
+    assert body["server"]["requests"] == 3
+
+
+def test_metrics_endpoint_counts_served_facts(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port)
+    get(conn, "/facts/fun?n=3")
+    conn.request("GET", "/metrics")
+    response = conn.getresponse()
+    text = response.read().decode('utf-8')
+    assert response.status == 200 and response.getheader("Content-Type").startswith("text/plain")
+    assert "# TYPE factverse_facts_total counter" in text
+    served = [line for line in text.splitlines() if line.startswith('factverse_facts_total{category="fun",source="LOCAL"}')]
+    assert served and int(served[0].split()[-1]) >= 3
+
+
+def test_save_endpoint(server, tmp_path):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port)
+    body = json.dumps({"fact": CORPUS['fun'][0], "category": "fun", "source": "LOCAL"})
+    conn.request("POST", "/saved", body, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    assert response.status == 200 and json.loads(response.read()) == {"saved": True}
+    conn.request("POST", "/saved", "{}")
+    response = conn.getresponse()
+    assert response.status == 400 and "fact" in json.loads(response.read())["error"]
+    assert get(conn, "/saved")[0] == 405
+
+    server.writer.flush()
+    saved = (tmp_path / "saved_facts.txt").read_text(encoding='utf-8')
+    assert "[DB:fun]" in saved and CORPUS['fun'][0] in saved
+
+
+def test_invalid_content_length_is_a_bad_request(server):
+    for length in ("abc", "-5"):
+        with socket.create_connection(("127.0.0.1", server.port), timeout=2) as sock:
+            sock.sendall(f"POST /saved HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n".encode('latin-1'))
+            response = b""
+            while chunk := sock.recv(4096):
+                response += chunk
+        assert response.startswith(b"HTTP/1.1 400 Bad Request")
+        assert b"Connection: close" in response and b"Invalid Content-Length" in response
+    assert server.responses[400] == 2
+
+
+def test_oversized_body_is_refused_unread(server):
+    with socket.create_connection(("127.0.0.1", server.port), timeout=2) as sock:
+        sock.sendall(b"POST /saved HTTP/1.1\r\nHost: x\r\nContent-Length: 1000000000\r\n\r\n")
+        response = b""
+        while chunk := sock.recv(4096):
+            response += chunk
+    assert response.startswith(b"HTTP/1.1 413 Payload Too Large")
+    assert b"Connection: close" in response
+    assert server.responses[413] == 1
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Shared fact store tests
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+import fact_corpus
+import fact_store
+import seen_filter
+
+CORPUS = {
+    'hacking': ["Social engineering is often more effective than technical attacks."],
+    'fun': ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."]
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    monkeypatch.setenv('FACTVERSE_FACTS', str(facts_file))
+    monkeypatch.setenv('FACTVERSE_CACHE_DB', str(tmp_path / "cache.db"))
+    monkeypatch.setattr(seen_filter, '_shared_filter', seen_filter.SeenFilter(str(tmp_path / "seen.bin")))
+    monkeypatch.setattr(fact_store, '_shared_store', None)
+
+    parses = []
+    real_load = fact_store.load_corpus
+    monkeypatch.setattr(fact_store, 'load_corpus', lambda path: parses.append(path) or real_load(path))
+    shared = fact_store.get_store()
+    shared.parses = parses
+    return shared
+
+
+def test_store_is_lazy_and_indexed(store):
+    assert store.parses == []
+    assert store.counts() == {'hacking': 1, 'fun': 2}
+    assert store.get('fun', 1) == "Bananas are berries, but strawberries aren't."
+    assert store.random_fact('fun') in CORPUS['fun']
+    assert store.random_fact('missing') is None
+    assert len(store.parses) == 1
+
+
+def test_file_is_parsed_once_per_process(store):
+    import main
+    import main_simple
+    from fact_ai_generator import AIFactGenerator
+
+    app = main.FactVerse()
+    generator = app.ai_generator or AIFactGenerator(prefetch_workers=0)
+    facts = main_simple.load_facts()
+
+    assert app.facts is store and generator.local_facts is store and facts is store
+    app.get_fact('2')
+    generator.get_local_fact('hacking')
+    main_simple.get_random_fact(facts, '1')
+    assert len(store.parses) == 1
+
+
+def test_compiled_corpus_is_preferred(tmp_path):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    fact_corpus.compile_facts(str(facts_file))
+
+    store = fact_store.FactStore(str(facts_file))
+    assert isinstance(store.facts("fun"), fact_corpus.CategoryView)
+    assert list(store.facts('fun')) == CORPUS['fun']
+
+
+def test_reload_swaps_only_changed_categories(tmp_path):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    store = fact_store.FactStore(str(facts_file))
+    hacking, fun = store.facts('hacking'), store.facts('fun')
+
+    assert store.reload() == []
+    edited = dict(CORPUS, fun=CORPUS['fun'] + ["A jiffy is an actual unit of time."], lazy=["Why take a chance?"])
+    facts_file.write_text(json.dumps(edited), encoding='utf-8')
+    os.utime(facts_file, ns=(1, 1))
+
+    assert sorted(store.reload()) == ['fun', 'lazy']
+    assert store.facts('hacking') is hacking
+    assert store.facts('fun') is not fun and len(store.facts('fun')) == 3
+    assert store.stats()['reloads'] == 1 and len(store.stats()['reload_ms']) == 1
+
+
+def count_decodes(monkeypatch) -> list:
+    """Record the index of every fact decoded from a compiled corpus"""
+    decoded = []
+    real_fact_at = fact_corpus.CompiledCorpus._fact_at
+    monkeypatch.setattr(fact_corpus.CompiledCorpus, '_fact_at',
+                        lambda corpus, index: decoded.append(index) or real_fact_at(corpus, index))
+    return decoded
+
+
+def test_compiled_categories_are_read_on_access(tmp_path, monkeypatch):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    fact_corpus.compile_facts(str(facts_file))
+    decoded = count_decodes(monkeypatch)
+
+    store = fact_store.FactStore(str(facts_file))
+    assert store.counts() == {'hacking': 1, 'fun': 2}
+    assert decoded == []
+    assert store.get('fun', 1) == CORPUS['fun'][1]
+    assert decoded == [2]  # hacking's fact and fun's first were never decoded
+
+
+def test_ai_startup_does_not_read_the_corpus(store, tmp_path, monkeypatch):
+    fact_corpus.compile_facts(store.path)
+    decoded = count_decodes(monkeypatch)
+    monkeypatch.delitem(sys.modules, 'factverse_ai_pure', raising=False)
+    import factverse_ai_pure
+
+    assert decoded == [] and factverse_ai_pure.corpus_facts.indexed_categories() == []
+    assert factverse_ai_pure.corpus_facts.wait('fun', 5)
+    assert not factverse_ai_pure.is_new_fact('fun', "Octopuses have 3 hearts and blue blood!")
+    assert factverse_ai_pure.corpus_facts.indexed_categories() == ['fun']
+    assert sorted(decoded) == [1, 2]
+
+
+class ScriptedClient:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    def complete(self, messages, **kwargs):
+        return self.answers.pop(0)
+
+
+def test_ai_caches_only_facts_that_pass_dedup(store, monkeypatch):
+    monkeypatch.delitem(sys.modules, 'factverse_ai_pure', raising=False)
+    import factverse_ai_pure
+    from circuit_breaker import CircuitBreaker
+
+    monkeypatch.setattr(factverse_ai_pure, 'breaker', CircuitBreaker())
+    monkeypatch.setattr(factverse_ai_pure, 'client', ScriptedClient(
+        "Honey never spoils.", "Honey never spoils.", "Wombat droppings are cube shaped."))
+    assert factverse_ai_pure.generate_ai_fact('fun') == "Honey never spoils."
+    assert factverse_ai_pure.generate_ai_fact('fun') == "Wombat droppings are cube shaped."
+
+    cached = factverse_ai_pure.response_cache._db.execute("SELECT response FROM ai_cache").fetchall()
+    assert sorted(row[0] for row in cached) == ["Honey never spoils.", "Wombat droppings are cube shaped."]
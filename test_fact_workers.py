@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Pre-fork worker mode tests (real processes, ephemeral port)
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+import http.client
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork mode needs os.fork")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS = {'fun': ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."]}
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request(method, path, json.dumps(body) if body else None)
+    response = conn.getresponse()
+    data = response.read().decode('utf-8')
+    conn.close()
+    return response.status, data
+
+
+def metric(port, name):
+    lines = [line for line in request(port, "GET", "/metrics")[1].splitlines() if line.startswith(name)]
+    return float(lines[0].split()[-1]) if lines else 0.0
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@pytest.fixture
+def workers(tmp_path):
+    (tmp_path / "facts.json").write_text(json.dumps(CORPUS), encoding='utf-8')
+    env = dict(os.environ, FACTVERSE_FACTS=str(tmp_path / "facts.json"),
+               FACTVERSE_SEEN_FILE=str(tmp_path / "seen.bin"), FACTVERSE_METRICS_FILE=str(tmp_path / "metrics.prom"))
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPT_DIR, "main.py"), "--serve", "--workers", "2", "--no-ai", "--port", "0"],
+        cwd=tmp_path, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        start_new_session=True)
+    port = None
+    for line in process.stdout:
+        if "listening on" in line:
+            port = int(line.split("http://127.0.0.1:")[1].split()[0])
+            break
+    yield process, port
+    if process.poll() is None:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def test_workers_share_the_socket_restart_and_aggregate(workers, tmp_path):
+    process, port = workers
+    assert port and (tmp_path / "facts.bin").exists()  # compiled once, mapped by every worker
+    for _ in range(10):
+        status, body = request(port, "GET", "/facts/fun")
+        assert status == 200 and json.loads(body)["fact"] in CORPUS['fun']
+
+    # Sum across both workers, written by each at most a second ago
+    served = 'factverse_facts_total{category="fun",source="LOCAL"}'
+    assert wait_for(lambda: metric(port, served) == 10)
+
+    pid = json.loads(request(port, "GET", "/status")[1])["server"]["pid"]
+    os.kill(pid, signal.SIGKILL)
+    assert wait_for(lambda: metric(port, "factverse_worker_restarts_total") == 1)
+    assert wait_for(lambda: metric(port, "factverse_workers_alive") == 2)
+    assert request(port, "GET", "/facts/fun")[0] == 200
+
+    # A signal to the whole group (as from a service manager) still flushes saves
+    assert request(port, "POST", "/saved", {"fact": CORPUS['fun'][0], "category": "fun"})[0] == 200
+    os.killpg(process.pid, signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+    assert CORPUS['fun'][0] in (tmp_path / "saved_facts.txt").read_text(encoding='utf-8')
+    assert "factverse_worker_restarts_total 1" in (tmp_path / "metrics.prom").read_text(encoding='utf-8')
+
+
+def test_supervisor_recompiles_an_edited_corpus_once_for_every_worker(workers, tmp_path):
+    process, port = workers
+    edited = {'fun': ["Wombat droppings are cube shaped."]}
+    (tmp_path / "facts.json").write_text(json.dumps(edited), encoding='utf-8')
+
+    def serves_edited_facts():
+        return all(json.loads(request(port, "GET", "/facts/fun")[1])["fact"] in edited['fun'] for _ in range(10))
+    assert wait_for(serves_edited_facts)
+    assert os.path.getmtime(tmp_path / "facts.bin") >= os.path.getmtime(tmp_path / "facts.json")
+
+    store = json.loads(request(port, "GET", "/status")[1])["store"]
+    assert store["reloads"] == 1 and not store["watching"]
+    os.killpg(process.pid, signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
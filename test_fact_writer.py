@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Batched saved-facts writer tests
+"""
+
+import re
+import multiprocessing
+
+from fact_writer import SavedFactWriter, iter_saved_lines, list_segments
+
+LINE = re.compile(r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\] \[(AI|DB)\] .+$")
+
+
+def test_saves_are_batched_and_flushed(tmp_path):
+    path = tmp_path / "saved_facts.txt"
+    writer = SavedFactWriter(str(path), batch_size=50, flush_interval=10.0, fsync="never")
+    for i in range(120):
+        writer.save(f"Fact {i}", "AI" if i % 2 else "DB")
+    assert writer.flush()
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 120 and all(LINE.match(line) for line in lines)
+    assert writer.stats["batches"] == 3
+    writer.close()
+
+
+def _write_many(path, worker):
+    writer = SavedFactWriter(path, batch_size=16, flush_interval=0.01, fsync="never")
+    for i in range(300):
+        writer.save(f"worker {worker} fact {i} " + "x" * 200)
+    writer.close()
+
+
+def test_processes_share_the_file_without_interleaving(tmp_path):
+    path = str(tmp_path / "saved_facts.txt")
+    workers = [multiprocessing.Process(target=_write_many, args=(path, n)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert len(lines) == 1200 and all(LINE.match(line) for line in lines)
+
+
+def test_rotated_segments_are_compressed_and_read_newest_first(tmp_path):
+    path = str(tmp_path / "saved_facts.txt")
+    writer = SavedFactWriter(path, batch_size=10, flush_interval=0.01, fsync="never",
+                             max_bytes=2000, compression="gzip")
+    for i in range(300):
+        writer.save(f"Fact {i}")
+    writer.close()
+
+    segments = list_segments(path)
+    assert len(segments) == writer.stats["rotations"] > 1
+    assert all(name.endswith(".gz") for _, name in segments)
+    lines = list(iter_saved_lines(path))
+    assert [line.rsplit(" ", 1)[1] for line in lines] == [str(i) for i in reversed(range(300))]
+    assert list(iter_saved_lines(path, newest_first=False)) == lines[::-1]
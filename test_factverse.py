@@ -4,9 +4,11 @@ FactVerse - Simple Test Version
 Made by w7nx_z
 """
 
-import random
 import time
 
+from fact_sampler import FactSampler
+from terminal_renderer import typing_animation
+
 # Hardcoded facts for testing
 FACTS = {
     'hacking': [
@@ -46,12 +48,8 @@ FACTS = {
     ]
 }
 
-def typing_animation(text, delay=0.02):
-    """Simulate typing animation"""
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
+# Deals every fact once before repeating
+sampler = FactSampler()
 
 def show_banner():
     """Display hacker-style banner"""
@@ -104,7 +102,7 @@ def get_fact(choice):
     
     category = categories.get(choice)
     if category and category in FACTS:
-        fact = random.choice(FACTS[category])
+        fact = sampler.choose(category, FACTS[category])
         return fact, category_names[category]
     return "No facts available.", "Unknown"
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Fake AI server tests
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from fact_batch import batch_prompt, clean_batch
+from fake_ai_server import FakeAIServer, parse_latency
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(**options):
+        server = FakeAIServer(**options)
+        servers.append(server)
+        return server, server.start_in_thread()
+    yield start
+    for server in servers:
+        server.close()
+
+
+def ask(base_url: str, prompt: str = "Generate an amazing and surprising fun fact") -> tuple:
+    """(status, content or error body, headers) for one completion"""
+    body = json.dumps({"model": "any", "messages": [{"role": "user", "content": prompt}]}).encode('utf-8')
+    request = urllib.request.Request(f"{base_url}/chat/completions", body, {"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            answer = json.load(response)
+            return response.status, answer["choices"][0]["message"]["content"], response.headers
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e), e.headers
+
+
+def test_seeded_servers_give_the_same_answers(fake_server):
+    _, first = fake_server(seed=7, duplicate_rate=0.3)
+    _, second = fake_server(seed=7, duplicate_rate=0.3)
+    answers = [ask(first)[1] for _ in range(10)]
+    assert answers == [ask(second)[1] for _ in range(10)]
+    assert all(answer.startswith("Fake fun fact") for answer in answers)
+    assert len(set(answers)) < 10  # some repeats at a 30% duplicate rate
+
+
+def test_errors_and_rate_limits(fake_server):
+    server, base_url = fake_server(rate_limit_rate=1.0, retry_after=2)
+    status, error, headers = ask(base_url)
+    assert status == 429 and error["error"]["code"] == "rate_limit_exceeded"
+    assert headers["Retry-After"] == "2"
+
+    server, base_url = fake_server(error_rate=1.0)
+    assert ask(base_url)[0] == 500
+    assert server.stats["errors"] == 1
+
+    server, base_url = fake_server(max_rps=2)
+    assert [ask(base_url)[0] for _ in range(3)] in ([200, 200, 429], [200, 200, 200])
+
+
+def test_batches_and_malformed_answers(fake_server):
+    prompt = batch_prompt("Generate an amazing and surprising fun fact", 4)
+    _, base_url = fake_server(seed=1)
+    facts, valid = clean_batch(ask(base_url, prompt)[1], 4)
+    assert len(facts) == valid == 4
+
+    _, base_url = fake_server(seed=1, malformed_rate=1.0)
+    assert clean_batch(ask(base_url, prompt)[1], 4) == ([], 0)
+    assert len(ask(base_url)[1]) < 40
+
+
+def test_latency_specs():
+    assert parse_latency("fixed:250")(None) == 0.25
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:10")
+
+
+def test_generator_against_fake_server(fake_server, tmp_path):
+    pytest.importorskip("openai")
+    from ai_client import AIClient
+    from fact_ai_generator import AIFactGenerator
+    from fact_cache import FactCache
+    from fact_store import FactStore
+    from seen_filter import SeenFilter
+
+    facts = tmp_path / "facts.json"
+    facts.write_text(json.dumps({"fun": ["Bananas are berries."]}), encoding='utf-8')
+    server, base_url = fake_server(seed=3)
+    generator = AIFactGenerator(prefetch_workers=0, cache=FactCache(str(tmp_path / "cache.db")),
+                                breaker=CircuitBreaker(failure_threshold=2),
+                                client=AIClient(api_key="fake", base_url=base_url, model="fake"))
+    generator.local_facts = FactStore(str(facts))
+    generator.seen = SeenFilter(str(tmp_path / "seen.bin"))
+    fact, source = generator.generate_fact("fun")
+    assert source == "AI" and fact.startswith("Fake fun fact")
+
+    # Fragments like "Sure!" are not served as facts
+    server.malformed_rate = 1.0
+    assert generator.generate_fact("fun") == ("Bananas are berries.", "LOCAL")
+    server.malformed_rate = 0.0
+
+    # A failing provider trips the breaker and answers come from the local corpus
+    server.error_rate = 1.0
+    sources = [generator.generate_fact("fun")[1] for _ in range(4)]
+    assert sources == ["LOCAL"] * 4
+    assert generator.breaker.state == "open"
+    assert server.stats["errors"] == 2
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Load generator tests (short runs against the API and in-process)
+"""
+
+import csv
+import json
+import asyncio
+import threading
+
+import pytest
+
+from fact_server import FactServer
+from fact_store import FactStore
+from fact_writer import SavedFactWriter
+from load_generator import HTTPTarget, LoadGenerator, LocalTarget, percentile, write_csv
+
+CORPUS = {'fun': ["Octopuses have three hearts and blue blood.", "Bananas are berries, but strawberries aren't."],
+          'lazy': ["Sloths can hold their breath longer than dolphins."]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps(CORPUS), encoding='utf-8')
+    return FactStore(str(facts_file), seed=1)
+
+
+@pytest.fixture
+def api(store, tmp_path):
+    fact_server = FactServer(store, writer=SavedFactWriter(str(tmp_path / "saved_facts.txt"), fsync="never"))
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(fact_server.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield fact_server
+
+    async def drop_connections():
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+    asyncio.run_coroutine_threadsafe(drop_connections(), loop).result(1.0)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(1.0)
+    fact_server.close()
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 99), percentile(values, 100)) == (50, 99, 100)
+    assert percentile([], 50) is None
+
+
+def test_closed_loop_against_api(api, tmp_path):
+    load = LoadGenerator(HTTPTarget(f"127.0.0.1:{api.port}"), users=4, duration=1.0,
+                         think_ms=1, save_rate=0.5, interval=0.5, seed=1)
+    assert sorted(load.categories) == ['fun', 'lazy']
+    report = load.run()
+    summary = report["summary"]
+    assert summary["fact"]["requests"] > 10 and summary["save"]["requests"] > 0
+    assert summary["all"]["error_rate"] == 0.0
+    assert summary["all"]["p50_ms"] <= summary["all"]["p95_ms"] <= summary["all"]["p99_ms"]
+    assert api.responses == {200: summary["all"]["requests"] + 1}  # + the /status lookup
+
+    write_csv(report, str(tmp_path / "windows.csv"))
+    with open(tmp_path / "windows.csv", newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert [row["operation"] for row in rows[:3]] == ["all", "fact", "save"]
+    assert sum(int(row["requests"]) for row in rows if row["operation"] == "all") == summary["all"]["requests"]
+
+
+def test_open_loop_in_process(store, tmp_path):
+    writer = SavedFactWriter(str(tmp_path / "saved_facts.txt"), fsync="never")
+    load = LoadGenerator(LocalTarget(store=store, writer=writer), users=4, rate=100, duration=1.0,
+                         think_ms=0, gets=2, save_rate=1.0, seed=2)
+    summary = load.run()["summary"]
+    assert 40 <= summary["sessions"] <= 200
+    assert summary["save"]["requests"] == summary["fact"]["requests"]
+    writer.flush()
+    assert len((tmp_path / "saved_facts.txt").read_text(encoding='utf-8').splitlines()) == summary["save"]["requests"]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Saved facts store tests
+"""
+
+from fact_writer import SavedFactWriter
+from saved_store import SavedFactStore
+
+# Every format saved_facts.txt has held: untagged, [DB], glued by a literal \n, [AI:category]
+LEGACY_LOG = (
+    "[2025-07-31 21:17:48] Success is walking from failure to failure with no loss of enthusiasm.\n"
+    "[2025-07-31 23:15:37] [DB] I'm not lazy, I'm just highly motivated to do nothing.\n"
+    "[2025-07-31 23:17:05] [DB] I put the 'Pro' in procrastination.\\n"
+    "[2025-07-31 23:24:01] [DB] Two-factor authentication can prevent 99.9% of automated attacks.\\n"
+)
+
+
+def make_store(tmp_path, text=LEGACY_LOG):
+    log = tmp_path / "saved_facts.txt"
+    log.write_text(text, encoding='utf-8')
+    return SavedFactStore(str(tmp_path / "saved_facts.db"), str(log)), log
+
+
+def test_import_parses_every_historical_format(tmp_path):
+    store, _ = make_store(tmp_path)
+    assert store.import_file() == 4
+    assert store.import_file() == 0
+
+    stats = store.stats()
+    assert stats["total"] == 4
+    assert stats["by_source"] == {"untagged": 1, "DB": 3}
+    assert [row[3] for row in store.search("procrastination")] == ["I put the 'Pro' in procrastination."]
+
+
+def test_sync_picks_up_appended_lines_only(tmp_path):
+    store, log = make_store(tmp_path, "")
+    with open(log, 'a', encoding='utf-8') as file:
+        file.write("[2026-01-01 10:00:00] [AI:fun] Octopuses have three hearts.\n[2026-01-01 10:00")
+    assert store.sync() == 1
+    with open(log, 'a', encoding='utf-8') as file:
+        file.write(":05] [DB:lazy] Hard work never killed anybody.\n")
+    assert store.sync() == 1
+
+    rows = store.list(since="2026-01-01")
+    assert [(row[1], row[2]) for row in rows] == [("DB", "lazy"), ("AI", "fun")]
+    assert store.list(category="fun")[0][3] == "Octopuses have three hearts."
+
+
+def test_sync_follows_rotation_into_segments(tmp_path):
+    store, log = make_store(tmp_path, "")
+    writer = SavedFactWriter(str(log), batch_size=5, flush_interval=0.01, fsync="never", max_bytes=500)
+    for i in range(10):
+        writer.save(f"Before sync {i}", timestamp="2026-01-01 10:00:00")
+    writer.flush()
+    assert store.sync() == 10
+    # Lines written after the sync are rotated into a segment before the next one
+    for i in range(40):
+        writer.save(f"After sync {i}", timestamp="2026-01-01 10:00:01")
+    writer.close()
+    assert store.sync() == 40
+    assert store.sync() == 0
+    assert store.stats()["total"] == 50
+
+
+def test_search_treats_punctuation_literally(tmp_path):
+    store, _ = make_store(tmp_path)
+    store.import_file()
+    assert [row[3] for row in store.search("I'm not lazy")] == ["I'm not lazy, I'm just highly motivated to do nothing."]
+    assert len(store.search("two-factor")) == 1
+    assert len(store.search("99.9%")) == 1
+    assert len(store.search('"Pro" in')) == 1
+    assert len(store.search("procrast*")) == 1
+    assert store.search("   ") == []
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Cross-session seen filter tests
+"""
+
+import os
+import json
+import multiprocessing
+
+from fact_store import FactStore
+from seen_filter import SeenFilter
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    seen = SeenFilter(path, initial_capacity=4)
+    facts = [f"Fact number {i} is remembered." for i in range(10)]
+    for fact in facts:
+        assert seen.add("fun", fact)
+    seen.save()
+
+    restored = SeenFilter(path, initial_capacity=4)
+    assert all(restored.seen("fun", fact) for fact in facts)
+    assert not restored.seen("lazy", facts[0])
+    assert restored.stats() == seen.stats()
+    assert not restored.add("fun", facts[0])
+
+
+def test_false_positive_rate_stays_under_target(tmp_path):
+    seen = SeenFilter(str(tmp_path / "seen.bin"), error_rate=0.01, initial_capacity=500)
+    for i in range(5000):
+        seen.add("fun", f"Seen fact {i}")
+    assert seen.stats()["slices"] > 1
+    false_positives = sum(seen.seen("fun", f"Unseen fact {i}") for i in range(50000))
+    # The design sits just under the target (~0.94% here); allow for sampling noise
+    assert false_positives / 50000 <= seen.error_rate * 1.2
+
+
+def test_slices_grow_then_stay_bounded(tmp_path):
+    seen = SeenFilter(str(tmp_path / "seen.bin"), initial_capacity=10, max_slices=3, growth=2)
+    for i in range(10):
+        seen.add("fun", f"Fact {i}")
+    assert seen.stats()["slices"] == 1
+    for i in range(10, 70):  # fills 10 + 20 + 40
+        seen.add("fun", f"Fact {i}")
+    assert [bloom.capacity for bloom in seen._slices] == [10, 20, 40]
+    size = seen.stats()["bytes"]
+
+    for i in range(70, 150):  # two more slices, the oldest two dropped
+        seen.add("fun", f"Fact {i}")
+    assert [bloom.capacity for bloom in seen._slices] == [40, 40, 40]
+    assert seen.stats()["bytes"] <= 3 * len(seen._slices[-1].bits) < 2 * size
+    assert not seen.seen("fun", "Fact 0")  # forgotten with its slice
+    assert seen.seen("fun", "Fact 149")
+
+
+def test_category_counts(tmp_path):
+    seen = SeenFilter(str(tmp_path / "seen.bin"))
+    seen.add("fun", "Octopuses have three hearts.")
+    seen.add("fun", "Octopuses have three hearts!")  # same after normalizing
+    seen.add("fun", "Bananas are berries.")
+    seen.add("lazy", "Octopuses have three hearts.")
+    assert seen.stats()["category_counts"] == {"fun": 2, "lazy": 1}
+    seen.clear()
+    assert seen.stats()["category_counts"] == {}
+
+
+def test_exhausted_category_does_not_repeat_back_to_back(tmp_path):
+    facts = [f"Small category fact number {i}." for i in range(5)]
+    facts_file = tmp_path / "facts.json"
+    facts_file.write_text(json.dumps({"fun": facts}), encoding='utf-8')
+    for seed in range(300):
+        seen = SeenFilter(str(tmp_path / "seen.bin"))
+        for fact in facts:  # every fact shown in an earlier session
+            seen.add("fun", fact)
+        store = FactStore(str(facts_file), seed=seed)
+        draws = [store.random_fact("fun", seen) for _ in range(12)]
+        assert all(a != b for a, b in zip(draws, draws[1:])), f"seed {seed}: {draws}"
+
+
+def test_saves_from_several_processes_are_merged(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    first, second = SeenFilter(path), SeenFilter(path)
+    first.add("fun", "Octopuses have three hearts.")
+    second.add("fun", "Bananas are berries.")
+    first.save()
+    second.save()
+    merged = SeenFilter(path)
+    assert merged.seen("fun", "Octopuses have three hearts.") and merged.seen("fun", "Bananas are berries.")
+
+    merged.clear()
+    merged.save()
+    assert not SeenFilter(path).seen("fun", "Bananas are berries.")
+
+
+def _add_and_save(path: str, worker: int):
+    seen = SeenFilter(path, initial_capacity=20)
+    for i in range(50):
+        seen.add("fun", f"Worker {worker} fact {i}")
+    seen.save()
+
+
+def test_concurrent_worker_saves_keep_every_fact(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    SeenFilter(path).save()
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    workers = [context.Process(target=_add_and_save, args=(path, worker)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    seen = SeenFilter(path, initial_capacity=20)
+    assert all(seen.seen("fun", f"Worker {worker} fact {i}") for worker in range(4) for i in range(50))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_repeated_sessions_count_each_fact_once(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    for session in range(8):
+        seen = SeenFilter(path)
+        for i in range(5):
+            seen.add("fun", f"Session {session} fact {i}")
+        seen.save()
+        seen.add("fun", f"Session {session} late fact")  # a second save in the same session
+        seen.save()
+    stats = SeenFilter(path).stats()
+    assert stats["items"] == 48 and stats["slices"] == 1
+    assert stats["category_counts"] == {"fun": 48}
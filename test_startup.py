@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Startup tasks tests
+"""
+
+import threading
+
+from startup import StartupTasks
+
+
+def test_progress_tracks_real_completion():
+    gate = threading.Event()
+
+    def fail():
+        raise RuntimeError("no network")
+
+    startup = StartupTasks([("facts", lambda: 42), ("ai", gate.wait), ("cache", fail)]).start()
+    assert startup.wait_for_progress(0, timeout=5) == 1
+    assert not startup.wait(0.05) and startup.progress == 1 / 3
+
+    gate.set()
+    assert startup.wait(5)
+    assert startup.progress == 1.0
+    assert startup.results["facts"] == 42
+    assert isinstance(startup.errors["cache"], RuntimeError)
+    assert startup.elapsed >= 0.05
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+FactVerse - Terminal renderer tests
+"""
+
+from terminal_renderer import TerminalRenderer
+
+
+class FakeTerminal:
+    def __init__(self, tty=True):
+        self.tty = tty
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return self.tty
+
+
+def test_long_text_is_written_in_bounded_frames():
+    terminal, now = FakeTerminal(), [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    renderer = TerminalRenderer(terminal, fps=30, max_duration=1.0, sleep=sleep, clock=lambda: now[0])
+    fact = "Octopuses have three hearts and blue blood. " * 40  # ~1800 chars: 36 s at 20 ms per character
+
+    renderer.type(fact, delay=0.02)
+    assert "".join(terminal.writes) == fact + "\n"
+    assert len(terminal.writes) <= 30
+    assert now[0] <= 1.0
+
+
+def test_no_animation_without_a_tty():
+    terminal, slept = FakeTerminal(tty=False), []
+    TerminalRenderer(terminal, sleep=slept.append).type("Bananas are berries.")
+    assert terminal.writes == ["Bananas are berries.\n"]
+    assert not slept